@@ -0,0 +1,6 @@
+"""
+HTTP API over the core engines, so compute can run (and scale) on its own
+nodes while Streamlit replicas act as thin clients. See api/server.py for the
+service; the client the pipeline uses when API_BASE_URL is set lives in
+services/analysis_api.py, so core never imports this package.
+"""
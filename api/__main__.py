@@ -0,0 +1,9 @@
+import argparse
+import uvicorn
+
+parser = argparse.ArgumentParser(description="TradeGlance analysis API.")
+parser.add_argument("--host", default="0.0.0.0")
+parser.add_argument("--port", type=int, default=8000)
+args = parser.parse_args()
+
+uvicorn.run("api.server:app", host=args.host, port=args.port)
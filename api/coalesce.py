@@ -0,0 +1,52 @@
+"""
+Response cache with request coalescing for the API's event loop.
+A hit is served from memory; a miss starts one computation per key and every
+concurrent request for the same key awaits that same task, so ten users
+opening the same forecast cost one Prophet fit. Failures are not cached.
+Not thread-safe: use from a single event loop.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class Coalescer:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # key -> (expires, value)
+        self._inflight = {}  # key -> Task
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    async def get(self, key, ttl_seconds: float, compute):
+        """Cached value for `key`, or the result of `await compute()` shared by concurrent callers."""
+        hit = self._cache.get(key)
+        if hit is not None:
+            if hit[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return hit[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, ttl_seconds, t))
+        else:
+            self.stats["coalesced"] += 1
+        # A caller that disconnects must not cancel the work the others are waiting on
+        return await asyncio.shield(task)
+
+    def _finish(self, key, ttl_seconds: float, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._cache[key] = (time.monotonic() + ttl_seconds, task.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._cache)
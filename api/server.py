@@ -0,0 +1,156 @@
+"""
+Analysis API
+Async HTTP service exposing market data, indicators, forecasts, sentiment and
+backtests from `core`. Downloads run on threads, CPU-bound engine work
+(Prophet, FinBERT, indicators, the SMA optimizer) on a process pool, so the
+event loop stays free while models fit. Responses are cached per key and
+concurrent identical requests share one computation.
+
+    python -m api --port 8000
+    uvicorn api.server:app --port 8000
+"""
+
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
+from api import workers
+from core.codec import encode_series
+from api.coalesce import Coalescer
+from core.market import fetch_ohlcv, to_price_frame
+from core.market_calendar import expires_in
+from core.series import PriceSeries
+from core.logger import get_logger, setup_logging
+import config
+
+logger = get_logger(__name__)
+
+state = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    # spawn: forking a process that already runs threads (uvicorn, torch) is unsafe
+    state["pool"] = ProcessPoolExecutor(
+        max_workers=config.API_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    state["cache"] = Coalescer(max_entries=config.API_CACHE_MAX_ENTRIES)
+    logger.info(f"Analysis API started with {config.API_PROCESS_WORKERS} compute processes")
+    yield
+    state["pool"].shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="TradeGlance Analysis API", lifespan=lifespan)
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+async def _in_pool(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(state["pool"], fn, *args)
+
+
+def _market_ttl(ticker: str) -> float:
+    """Until the market calendar says new prices can exist."""
+    return expires_in(ticker, config.MARKET_DATA_REFRESH_SECONDS)
+
+
+async def _cached(key, compute, ttl_seconds: float = None) -> Response:
+    """Serves the encoded body for `key`, computing it at most once at a time."""
+    cache = state["cache"]
+    try:
+        body = await cache.get(key, ttl_seconds or config.API_CACHE_TTL_SECONDS, compute)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"API {key} failed: {e}")
+        raise HTTPException(status_code=502, detail=f"{key[0]} failed: {e}")
+    return Response(content=body, media_type="application/json")
+
+
+def _series_body(df, what: str, ticker: str) -> bytes:
+    """Encoded series; an empty result is a 404 so the cache never keeps it."""
+    if df is None or df.empty:
+        raise HTTPException(status_code=404, detail=f"No {what} for {ticker}")
+    return _json(encode_series(PriceSeries.from_frame(df)))
+
+
+async def _ohlcv(ticker: str, period: str):
+    async def download():
+        df = await asyncio.to_thread(fetch_ohlcv, ticker, period)
+        if df.empty:
+            raise HTTPException(status_code=404, detail=f"No market data for {ticker}")
+        return df
+    return await state["cache"].get(("ohlcv_frame", ticker, period), _market_ttl(ticker), download)
+
+
+# ---- endpoints ---------------------------------------------------------
+
+@app.get("/health")
+async def health():
+    cache = state["cache"]
+    return {"status": "ok", "workers": config.API_PROCESS_WORKERS, "cache_entries": len(cache), **cache.stats}
+
+
+@app.get("/v1/ohlcv/{ticker}")
+async def ohlcv(ticker: str, period: str = "1y"):
+    ticker = ticker.upper()
+
+    async def compute():
+        return _json(encode_series(PriceSeries.from_frame(await _ohlcv(ticker, period))))
+    return await _cached(("ohlcv", ticker, period), compute, _market_ttl(ticker))
+
+
+@app.get("/v1/market/{ticker}")
+async def market(ticker: str):
+    """Prices plus indicator columns."""
+    ticker = ticker.upper()
+
+    async def compute():
+        df = await _in_pool(workers.compute_market_data, await _ohlcv(ticker, "1y"))
+        return _series_body(df, "market data", ticker)
+    return await _cached(("market", ticker), compute, _market_ttl(ticker))
+
+
+@app.get("/v1/forecast/{ticker}")
+async def forecast(ticker: str, days: int = 30, mode: str = "additive", scale: float = 0.05,
+                   daily: bool = True, weekly: bool = True, yearly: bool = True):
+    ticker = ticker.upper()
+    args = (days, mode, scale, daily, weekly, yearly)
+
+    async def compute():
+        prices = to_price_frame(await _ohlcv(ticker, "1y"))
+        df = await _in_pool(workers.compute_forecast, prices, *args)
+        return _series_body(df, "forecast", ticker)
+    return await _cached(("forecast", ticker) + args, compute, expires_in(ticker, config.FORECAST_REFRESH_SECONDS))
+
+
+@app.get("/v1/sentiment/{ticker}")
+async def sentiment(ticker: str):
+    ticker = ticker.upper()
+
+    async def compute():
+        score, label, detailed = await _in_pool(workers.compute_sentiment, ticker)
+        if label.startswith("Error"):
+            raise HTTPException(status_code=502, detail=f"sentiment failed: {label}")
+        if not detailed:
+            # The client treats 404 as neutral, as the local engine does without headlines
+            raise HTTPException(status_code=404, detail=f"No headlines for {ticker}")
+        return _json({"score": score, "label": label, "detailed": detailed})
+    return await _cached(("sentiment", ticker), compute)
+
+
+@app.get("/v1/backtest/{ticker}")
+async def backtest(ticker: str):
+    ticker = ticker.upper()
+
+    async def compute():
+        result = await _in_pool(workers.compute_backtest, await _ohlcv(ticker, "1y"))
+        if not result:
+            raise HTTPException(status_code=404, detail=f"Not enough data to backtest {ticker}")
+        return _json(result)
+    return await _cached(("backtest", ticker), compute, _market_ttl(ticker))
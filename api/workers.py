@@ -0,0 +1,51 @@
+"""
+CPU-bound engine calls run in the API's process pool. Top-level functions
+with plain arguments so they pickle; each worker process keeps its own
+model caches (the FinBERT pipeline loads once per worker).
+"""
+
+import pandas as pd
+from core.market import to_price_frame
+from core.indicators import add_all_indicators
+from core.forecast import ForecastEngine
+from core.sentiment import SentimentEngine
+from core.optimizer import backtest_sma_strategy
+
+
+def compute_market_data(ohlcv: pd.DataFrame) -> pd.DataFrame:
+    """Prices (ds, y, OHLV) plus indicator columns, as pipeline.load_market_data."""
+    df = to_price_frame(ohlcv)
+    return add_all_indicators(df) if not df.empty else df
+
+
+def compute_forecast(prices: pd.DataFrame, days, mode, scale, daily, weekly, yearly) -> pd.DataFrame:
+    engine = ForecastEngine(
+        days=days,
+        seasonality_mode=mode,
+        changepoint_prior_scale=scale,
+        daily_seasonality=daily,
+        weekly_seasonality=weekly,
+        yearly_seasonality=yearly
+    )
+    return engine.predict(prices)
+
+
+def compute_sentiment(ticker: str):
+    """(score, label, detailed) from SentimentEngine.analyze."""
+    return SentimentEngine().analyze(ticker)
+
+
+def compute_backtest(ohlcv: pd.DataFrame) -> dict:
+    """SMA crossover backtest plus buy-and-hold, JSON-ready."""
+    # The backtest aligns signals positionally, so hand it a plain RangeIndex
+    ohlcv = ohlcv.reset_index(drop=True)
+    result = backtest_sma_strategy(ohlcv)
+    if not result:
+        return {}
+    close = ohlcv['Close']
+    return {
+        'best_params': result['best_params'],
+        'return': float(result['return']),
+        'buy_hold_return': float(close.iloc[-1] / close.iloc[0] - 1),
+        'equity_curve': [float(v) for v in result['equity_curve'].fillna(0)],
+    }
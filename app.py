@@ -4,11 +4,51 @@ from ui.landing import render_landing_page
 from ui.analysis import render_analysis_page
 from ui.sentiment import render_sentiment_page
 from ui.chatbot import render_chatbot_page
+from ui.screener import render_screener_page
 from core.logger import setup_logging
+from core.pipeline import warm_ticker, refresh_universe
+from core.scheduler import PrefetchScheduler, IntervalScheduler, SessionCloseScheduler, rank_tickers, universe_tickers
+from services.trade_stream import get_trade_stream
+from core.assistant import run_chat_maintenance
+from db.sqlite import init_db
+import config
 
 # Initialize Logging
 setup_logging()
 
+@st.cache_resource
+def start_prefetch_scheduler():
+    """One prefetch thread per server process, shared by all sessions."""
+    init_db()
+    if not config.PREFETCH_ENABLED:
+        return None
+    return PrefetchScheduler(warm_ticker).start()
+
+@st.cache_resource
+def start_universe_builder():
+    """
+    Rebuilds the shared universe matrix after each session's close, when its
+    bars are final. Every server process runs one; the build lock and the
+    freshness check in refresh_universe make it a no-op in all but one.
+    """
+    if not config.PREFETCH_ENABLED:
+        return None
+    return SessionCloseScheduler(lambda: refresh_universe(universe_tickers()), name="universe-builder").start()
+
+@st.cache_resource
+def start_chat_maintenance():
+    """Periodic checkpoint pruning, incremental vacuum and WAL truncation for chatbot.db."""
+    return IntervalScheduler(
+        run_chat_maintenance, config.CHAT_MAINTENANCE_MINUTES * 60, name="chat-maintenance"
+    ).start()
+
+@st.cache_resource
+def start_trade_stream():
+    """Live trades for the most requested tickers, kept in memory for all sessions."""
+    if not config.TRADE_STREAM_ENABLED or not config.FINNHUB_API_KEY:
+        return None
+    return get_trade_stream().subscribe(rank_tickers()).start()
+
 # -----------------------------------------------------------------------------
 # 1. PAGE CONFIGURATION
 # -----------------------------------------------------------------------------
@@ -44,6 +84,11 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+start_prefetch_scheduler()
+start_universe_builder()
+start_chat_maintenance()
+start_trade_stream()
+
 # -----------------------------------------------------------------------------
 # 2. NAVIGATION (Sidebar or Top)
 # -----------------------------------------------------------------------------
@@ -66,8 +111,8 @@ with st.sidebar:
     
     selected_page = option_menu(
         menu_title=None,
-        options=["Home", "Market Analysis", "Sentiment Hub", "AI Agent"],
-        icons=["house-fill", "graph-up-arrow", "newspaper", "robot"],
+        options=["Home", "Market Analysis", "Stock Screener", "Sentiment Hub", "AI Agent"],
+        icons=["house-fill", "graph-up-arrow", "funnel", "newspaper", "robot"],
         default_index=0,
         styles={
             "container": {"padding": "0"},
@@ -100,6 +145,9 @@ if selected_page == "Home":
 elif selected_page == "Market Analysis":
     render_analysis_page()
 
+elif selected_page == "Stock Screener":
+    render_screener_page()
+
 elif selected_page == "Sentiment Hub":
     render_sentiment_page()
 
@@ -0,0 +1,5 @@
+"""
+Headless bulk analysis: runs the core engines over a ticker list without a
+Streamlit session and streams one record per ticker to JSONL or Parquet.
+See batch/run.py.
+"""
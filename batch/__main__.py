@@ -0,0 +1,3 @@
+from batch.run import main
+
+main()
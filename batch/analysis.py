@@ -0,0 +1,167 @@
+"""
+Per-ticker batch workload. Calls the core engines directly (not the
+Streamlit-cached pipeline) so a worker keeps nothing in memory between
+tickers, and flattens the results into one record with a fixed schema.
+"""
+
+import time
+import pandas as pd
+from core.market import fetch_ohlcv, to_price_frame
+from core.indicators import add_all_indicators
+from core.forecast import ForecastEngine
+from core.sentiment import SentimentEngine
+from core.optimizer import backtest_sma_strategy
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+STAGES = ("indicators", "forecast", "sentiment", "backtest")
+
+# Output columns and their types ("string", "float", "int"), in order
+FIELDS = {
+    "ticker": "string",
+    "status": "string",  # ok / partial / error
+    "errors": "string",  # "stage: message" entries joined with "; "
+    "as_of": "string",
+    "bars": "int",
+    "last_close": "float",
+    "change_1d_pct": "float",
+    "change_1m_pct": "float",
+    "rsi_14": "float",
+    "macd": "float",
+    "macd_signal": "float",
+    "sma_20": "float",
+    "sma_50": "float",
+    "forecast_days": "int",
+    "forecast_date": "string",
+    "forecast": "float",
+    "forecast_lower": "float",
+    "forecast_upper": "float",
+    "forecast_change_pct": "float",
+    "sentiment_score": "float",
+    "sentiment_label": "string",
+    "headlines": "int",
+    "sma_fast": "int",
+    "sma_slow": "int",
+    "sma_return_pct": "float",
+    "buy_hold_return_pct": "float",
+    "elapsed_s": "float",
+}
+
+
+def _float(value, digits: int = 4):
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), digits)
+
+
+def _pct_change(close: pd.Series, periods: int):
+    if len(close) <= periods:
+        return None
+    return _float((close.iloc[-1] / close.iloc[-1 - periods] - 1) * 100)
+
+
+def _indicators(ohlcv: pd.DataFrame) -> dict:
+    df = add_all_indicators(to_price_frame(ohlcv))
+    last = df.iloc[-1]
+    return {
+        "rsi_14": _float(last.get("RSI_14")),
+        "macd": _float(last.get("MACD_12_26_9")),
+        "macd_signal": _float(last.get("MACDs_12_26_9")),
+        "sma_20": _float(last.get("SMA_20")),
+        "sma_50": _float(last.get("SMA_50")),
+    }
+
+
+def _forecast(ohlcv: pd.DataFrame, days: int) -> dict:
+    prices = to_price_frame(ohlcv)
+    forecast = ForecastEngine(days=days).predict(prices)
+    if forecast.empty:
+        raise ValueError("Not enough data to forecast")
+    end = forecast.iloc[-1]
+    price = float(prices["y"].iloc[-1])
+    return {
+        "forecast_days": days,
+        "forecast_date": str(pd.Timestamp(end["ds"]).date()),
+        "forecast": _float(end["yhat"]),
+        "forecast_lower": _float(end["yhat_lower"]),
+        "forecast_upper": _float(end["yhat_upper"]),
+        "forecast_change_pct": _float((end["yhat"] / price - 1) * 100),
+    }
+
+
+def _sentiment(ticker: str) -> dict:
+    score, label, detailed = SentimentEngine().analyze(ticker)
+    if label.startswith("Error"):
+        raise RuntimeError(label)
+    return {
+        "sentiment_score": _float(score),
+        # Drop the emoji suffix ("Bullish 📈" -> "Bullish")
+        "sentiment_label": label.split()[0],
+        "headlines": len(detailed),
+    }
+
+
+def _backtest(ohlcv: pd.DataFrame) -> dict:
+    # The backtest aligns signals positionally, so hand it a plain RangeIndex
+    ohlcv = ohlcv.reset_index(drop=True)
+    result = backtest_sma_strategy(ohlcv)
+    if not result or not result.get("best_params"):
+        raise ValueError("Not enough data to backtest")
+    close = ohlcv["Close"]
+    return {
+        "sma_fast": result["best_params"]["fast_sma"],
+        "sma_slow": result["best_params"]["slow_sma"],
+        "sma_return_pct": _float(result["return"] * 100),
+        "buy_hold_return_pct": _float((close.iloc[-1] / close.iloc[0] - 1) * 100),
+    }
+
+
+def analyze_ticker(ticker: str, period: str = "1y", forecast_days: int = 30, stages=STAGES) -> dict:
+    """
+    Runs the requested stages for one ticker. A failing stage is recorded in
+    `errors` and leaves its columns empty; the other stages still run.
+    """
+    started = time.perf_counter()
+    record = dict.fromkeys(FIELDS)
+    record["ticker"] = ticker
+    errors = []
+
+    try:
+        ohlcv = fetch_ohlcv(ticker, period=period)
+    except Exception as e:
+        ohlcv = pd.DataFrame()
+        errors.append(f"prices: {e}")
+
+    if ohlcv.empty:
+        if not errors:
+            errors.append("prices: no data")
+    else:
+        close = ohlcv["Close"]
+        record.update(
+            as_of=str(ohlcv.index[-1].date()),
+            bars=len(ohlcv),
+            last_close=_float(close.iloc[-1]),
+            change_1d_pct=_pct_change(close, 1),
+            change_1m_pct=_pct_change(close, 21),
+        )
+        steps = {
+            "indicators": lambda: _indicators(ohlcv),
+            "forecast": lambda: _forecast(ohlcv, forecast_days),
+            "sentiment": lambda: _sentiment(ticker),
+            "backtest": lambda: _backtest(ohlcv),
+        }
+        for stage in stages:
+            try:
+                record.update(steps[stage]())
+            except Exception as e:
+                logger.error(f"Batch {stage} failed for {ticker}: {e}")
+                errors.append(f"{stage}: {e}")
+
+    if ohlcv.empty:
+        record["status"] = "error"
+    else:
+        record["status"] = "partial" if errors else "ok"
+    record["errors"] = "; ".join(errors) or None
+    record["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return record
@@ -0,0 +1,121 @@
+"""
+Bulk analysis without a browser session.
+
+Runs price download, indicators, forecast, news sentiment and the SMA
+optimizer for every ticker on a pool of workers and appends one record per
+ticker to the output as soon as that ticker finishes.
+
+    python -m batch AAPL MSFT NVDA --output report.jsonl
+    python -m batch --file tickers.txt --workers 8 --output nightly.parquet
+    python -m batch --file tickers.txt --skip forecast,sentiment --output quick.jsonl
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from batch.analysis import FIELDS, STAGES, analyze_ticker
+from batch.writers import open_writer
+from core.scheduler import parse_tickers
+from core.logger import setup_logging
+import config
+
+
+def read_tickers(args) -> list:
+    """Tickers from the command line and/or a file (one per line or comma separated; # comments)."""
+    text = "\n".join(args.tickers)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            text += "\n" + f.read()
+    return parse_tickers(text)
+
+
+def run_batch(tickers: list, writer, workers: int = 4, executor: str = "process", **options) -> dict:
+    """
+    Analyzes `tickers` on `workers` workers and writes each record as it
+    completes. At most 2 x workers tickers are in flight, so memory stays flat
+    however long the list is. Returns status counts.
+    """
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    counts = {"ok": 0, "partial": 0, "error": 0}
+    pending = iter(tickers)
+    started = time.monotonic()
+
+    with pool_cls(max_workers=workers) as pool:
+        in_flight = {}
+
+        def fill():
+            while len(in_flight) < 2 * workers:
+                ticker = next(pending, None)
+                if ticker is None:
+                    return
+                in_flight[pool.submit(analyze_ticker, ticker, **options)] = ticker
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # Worker crashed (e.g. out of memory); still account for the ticker
+                    record = dict.fromkeys(FIELDS, None) | {"ticker": ticker, "status": "error", "errors": f"worker: {e}"}
+                writer.write(record)
+                counts[record["status"]] += 1
+                finished = sum(counts.values())
+                print(
+                    f"[{finished}/{len(tickers)}] {ticker}: {record['status']} "
+                    f"({time.monotonic() - started:.0f}s elapsed)",
+                    file=sys.stderr,
+                )
+            fill()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bulk analysis for TradeGlance.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to analyze")
+    parser.add_argument("--file", help="File with tickers (one per line or comma separated)")
+    parser.add_argument("--output", required=True, help="Output file: .jsonl or .parquet (needs pyarrow)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Override the format implied by --output")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel workers")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Processes run forecasts in parallel but each loads its own sentiment model")
+    parser.add_argument("--period", default=config.DEFAULT_PERIOD, help="Price history to download")
+    parser.add_argument("--forecast-days", type=int, default=30, help="Forecast horizon")
+    parser.add_argument("--skip", default="", help=f"Comma-separated stages to skip ({', '.join(STAGES)})")
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args)
+    if not tickers:
+        parser.error("No tickers given (pass them as arguments or with --file)")
+
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    unknown = skip - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages in --skip: {', '.join(sorted(unknown))}")
+    stages = tuple(s for s in STAGES if s not in skip)
+    if "sentiment" in stages and not config.FINNHUB_API_KEY:
+        print("FINNHUB_API_KEY is not set; skipping sentiment", file=sys.stderr)
+        stages = tuple(s for s in stages if s != "sentiment")
+
+    setup_logging()
+    writer = open_writer(args.output, args.format)
+    print(f"Analyzing {len(tickers)} tickers on {args.workers} {args.executor} workers "
+          f"(stages: {', '.join(stages) or 'prices only'})", file=sys.stderr)
+    try:
+        counts = run_batch(
+            tickers, writer, workers=args.workers, executor=args.executor,
+            period=args.period, forecast_days=args.forecast_days, stages=stages,
+        )
+    finally:
+        writer.close()
+
+    print(f"Done: {counts['ok']} ok, {counts['partial']} partial, {counts['error']} failed -> {args.output}",
+          file=sys.stderr)
+    return counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Streaming result sinks. Records are written as they arrive, so a run over
+thousands of tickers never holds more than one Parquet row group in memory.
+"""
+
+import json
+import os
+from batch.analysis import FIELDS
+
+
+class JsonlWriter:
+    """One JSON object per line, flushed after every record."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Buffers `row_group_size` records, then appends them as one row group.
+    Needs pyarrow (pip install pyarrow).
+    """
+
+    def __init__(self, path: str, row_group_size: int = 500):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow (or write .jsonl)")
+
+        types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64()}
+        self._pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in FIELDS.items()])
+        self.path = path
+        self.row_group_size = row_group_size
+        self._rows = []
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, record: dict):
+        self._rows.append(record)
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def open_writer(path: str, fmt: str = None):
+    """Writer for `path`; the format defaults to the file extension."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt == "parquet":
+        return ParquetWriter(path)
+    if fmt in ("jsonl", "ndjson", "json"):
+        return JsonlWriter(path)
+    raise ValueError(f"Unknown output format '{fmt}' (use .jsonl or .parquet)")
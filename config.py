@@ -30,6 +30,72 @@ DEFAULT_TICKER = "AAPL"
 DEFAULT_PERIOD = "1y"
 DEFAULT_FORECAST_DAYS = 14
 
+# Tickers offered in the Analysis page quick-select and always prefetched
+TOP_STOCKS = ["AAPL", "MSFT", "GOOGL", "TSLA", "AMZN", "NVDA", "META", "SPY", "BTC-USD", "ETH-USD"]
+
+# Background Prefetch (warms shared caches ahead of market open)
+PREFETCH_ENABLED = str(get_secret("PREFETCH_ENABLED", "true")).lower() == "true"
+PREFETCH_TOP_N = int(get_secret("PREFETCH_TOP_N", "50"))
+PREFETCH_LOOKBACK_DAYS = int(get_secret("PREFETCH_LOOKBACK_DAYS", "7"))
+PREFETCH_TIME = get_secret("PREFETCH_TIME", "09:00")  # Exchange local time (America/New_York)
+
+# Forecast auto-tuning
+TUNING_TTL_HOURS = float(get_secret("TUNING_TTL_HOURS", "24"))
+TUNING_TIME_BUDGET = float(get_secret("TUNING_TIME_BUDGET", "60"))  # Seconds per ticker
+
+# Shared memory-mapped price matrix behind the screener (core/universe.py)
+UNIVERSE_DIR = get_secret("UNIVERSE_DIR", os.path.join("data", "universe"))
+# Tickers in the matrix, independent of the prefetch list: a file (one per line or comma
+# separated, # comments) plus an optional comma-separated list. Searched tickers are added.
+# Sized for up to ~5,000 tickers: a year of bars and indicators is ~20 KB per ticker
+UNIVERSE_TICKERS_FILE = get_secret("UNIVERSE_TICKERS_FILE", os.path.join("assets", "universe_tickers.txt"))
+UNIVERSE_TICKERS = get_secret("UNIVERSE_TICKERS", "")
+UNIVERSE_DOWNLOAD_WORKERS = int(get_secret("UNIVERSE_DOWNLOAD_WORKERS", "8"))
+
+# Market-calendar freshness (core/market_calendar.py): while the market is open cached
+# results are refreshed at these intervals; after the close they live until the next open
+MARKET_DATA_REFRESH_SECONDS = float(get_secret("MARKET_DATA_REFRESH_SECONDS", "300"))
+FORECAST_REFRESH_SECONDS = float(get_secret("FORECAST_REFRESH_SECONDS", "3600"))
+QUOTE_REFRESH_SECONDS = float(get_secret("QUOTE_REFRESH_SECONDS", "60"))
+
+# Shared result cache (core/cache.py): memory, disk or redis
+CACHE_BACKEND = get_secret("CACHE_BACKEND", "memory")
+CACHE_DIR = get_secret("CACHE_DIR", os.path.join("data", "cache"))
+CACHE_REDIS_URL = get_secret("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_MB = float(get_secret("CACHE_MAX_MB", "256"))  # memory / disk backends
+CACHE_TTLS = get_secret("CACHE_TTLS", "market=3600,forecast=3600,sentiment=3600,agent_tools=900,quotes=60")
+
+# Chat history storage (chatbot.db)
+CHAT_CHECKPOINTS_KEEP = int(get_secret("CHAT_CHECKPOINTS_KEEP", "5"))  # Per thread
+CHAT_COMPRESS_CHECKPOINTS = str(get_secret("CHAT_COMPRESS_CHECKPOINTS", "true")).lower() == "true"
+CHAT_MAINTENANCE_MINUTES = float(get_secret("CHAT_MAINTENANCE_MINUTES", "30"))
+
+# Assistant web search
+SEARCH_TIMEOUT_SECONDS = float(get_secret("SEARCH_TIMEOUT_SECONDS", "8"))
+SEARCH_MAX_CONCURRENCY = int(get_secret("SEARCH_MAX_CONCURRENCY", "4"))  # Per server process
+SEARCH_CACHE_TTL_MINUTES = float(get_secret("SEARCH_CACHE_TTL_MINUTES", "15"))
+SEARCH_MAX_TOKENS = int(get_secret("SEARCH_MAX_TOKENS", "600"))  # Result budget sent to the model
+
+# External service endpoints (override to point at local stand-ins, see loadtest/)
+YAHOO_BASE_URL = get_secret("YAHOO_BASE_URL", "")  # Empty: download through yfinance
+FINNHUB_BASE_URL = get_secret("FINNHUB_BASE_URL", "")  # Empty: finnhub client default
+ALPHAVANTAGE_BASE_URL = get_secret("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co")
+GEMINI_BASE_URL = get_secret("GEMINI_BASE_URL", "")  # Empty: Google default endpoint
+TRADE_STREAM_URL = get_secret("TRADE_STREAM_URL", "wss://ws.finnhub.io")
+
+# Real-time trades (Finnhub websocket) kept in memory for last price / intraday bars
+TRADE_STREAM_ENABLED = str(get_secret("TRADE_STREAM_ENABLED", "false")).lower() == "true"
+TRADE_STREAM_MAX_AGE_SECONDS = float(get_secret("TRADE_STREAM_MAX_AGE_SECONDS", "60"))  # Older prices fall back to REST
+
+# Analysis API (api/). Set API_BASE_URL on UI nodes to compute remotely instead of in-process
+API_BASE_URL = get_secret("API_BASE_URL", "")
+API_TIMEOUT_SECONDS = float(get_secret("API_TIMEOUT_SECONDS", "120"))  # Covers a cold Prophet fit
+API_PROCESS_WORKERS = int(get_secret("API_PROCESS_WORKERS", str(os.cpu_count() or 2)))  # Server side
+API_CACHE_TTL_SECONDS = float(get_secret("API_CACHE_TTL_SECONDS", "3600"))
+API_CACHE_MAX_ENTRIES = int(get_secret("API_CACHE_MAX_ENTRIES", "1024"))
+
+SENTIMENT_MODEL = get_secret("SENTIMENT_MODEL", "ProsusAI/finbert")  # HF id or local path
+
 # API Keys (from Streamlit secrets or .env)
 FINNHUB_API_KEY = get_secret("FINNHUB_API_KEY", "")
 GOOGLE_API_KEY = get_secret("GOOGLE_API_KEY", "")
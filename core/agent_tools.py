@@ -0,0 +1,252 @@
+"""
+Agent Tools
+Market-analysis summaries for the assistant, computed locally from the same
+cached pipeline the Analysis page uses. Each function answers a whole
+question ("is NVDA overbought?", "what does the forecast say?") in one call
+and returns a small dict instead of raw frames, so the model needs a single
+tool round trip and few tokens.
+"""
+
+import numpy as np
+import pandas as pd
+from core import pipeline
+from core.portfolio import PortfolioOptimizer
+from core.cache import cached
+from core.market_calendar import expires_in
+from core.logger import get_logger
+from db import sqlite as db
+import config
+
+logger = get_logger(__name__)
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+CROSS_LOOKBACK = 5  # Trading days in which a MACD cross counts as "recent"
+MAX_HEADLINES = 3
+MAX_PORTFOLIO_ASSETS = 10
+MIN_PORTFOLIO_BARS = 60  # Common daily bars needed for a usable covariance
+
+
+def _succeeded(result: dict) -> bool:
+    return "error" not in result
+
+
+def _market_ttl(ticker: str, *args, **kwargs) -> float:
+    return expires_in(normalize_ticker(ticker), config.MARKET_DATA_REFRESH_SECONDS)
+
+
+def _forecast_ttl(ticker: str, *args, **kwargs) -> float:
+    return expires_in(normalize_ticker(ticker), config.FORECAST_REFRESH_SECONDS)
+
+
+def normalize_ticker(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+def _round(value, digits: int = 2):
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), digits)
+
+
+def _pct_change(close: pd.Series, periods: int):
+    if len(close) <= periods:
+        return None
+    return _round((close.iloc[-1] / close.iloc[-1 - periods] - 1) * 100)
+
+
+@cached("agent_tools", should_cache=_succeeded, ttl=_market_ttl)
+def technical_summary(ticker: str) -> dict:
+    """Price action, trend, RSI and MACD state from the cached indicator frame."""
+    ticker = normalize_ticker(ticker)
+    df = pipeline.load_market_data(ticker)
+    if df.empty or len(df) < 2:
+        return {"ticker": ticker, "error": "No market data available"}
+
+    last = df.iloc[-1]
+    close = df['y']
+    price = float(last['y'])
+
+    rsi = _round(last.get('RSI_14'), 1)
+    if rsi is None:
+        rsi_state = "unknown"
+    elif rsi >= RSI_OVERBOUGHT:
+        rsi_state = "overbought"
+    elif rsi <= RSI_OVERSOLD:
+        rsi_state = "oversold"
+    else:
+        rsi_state = "neutral"
+
+    hist = df['MACDh_12_26_9'].to_numpy()
+    signs = np.sign(hist[-(CROSS_LOOKBACK + 1):])
+    crossed = bool(len(signs) > 1 and np.any(signs[1:] * signs[:-1] < 0))
+    macd_state = "bullish" if hist[-1] > 0 else "bearish"
+
+    sma20, sma50 = last.get('SMA_20'), last.get('SMA_50')
+    if pd.notna(sma20) and pd.notna(sma50):
+        trend = "uptrend" if price > sma20 > sma50 else "downtrend" if price < sma20 < sma50 else "mixed"
+    else:
+        trend = "unknown"
+
+    year = close.iloc[-252:]
+    return {
+        "ticker": ticker,
+        "as_of": str(pd.Timestamp(last['ds']).date()),
+        "price": _round(price),
+        "change_pct": {"1d": _pct_change(close, 1), "5d": _pct_change(close, 5), "1m": _pct_change(close, 21)},
+        "sma_20": _round(sma20),
+        "sma_50": _round(sma50),
+        "trend": trend,
+        "rsi_14": rsi,
+        "rsi_state": rsi_state,
+        "macd": _round(last.get('MACD_12_26_9'), 3),
+        "macd_signal": _round(last.get('MACDs_12_26_9'), 3),
+        "macd_state": macd_state + (" (crossed in the last 5 days)" if crossed else ""),
+        "high_52w": _round(year.max()),
+        "low_52w": _round(year.min()),
+        "from_high_pct": _round((price / year.max() - 1) * 100),
+    }
+
+
+def _forecast_params(ticker: str) -> dict:
+    """Tuned params when a fresh tuning exists; never starts a tuning run from a chat turn."""
+    try:
+        return db.get_tuned_params(ticker, max_age_hours=config.TUNING_TTL_HOURS) or {}
+    except Exception as e:
+        logger.error(f"Could not read tuned params for {ticker}: {e}")
+        return {}
+
+
+@cached("agent_tools", should_cache=_succeeded, ttl=_forecast_ttl)
+def forecast_summary(ticker: str, days: int = 30) -> dict:
+    """Prophet forecast at the end of the horizon, with its confidence band."""
+    ticker = normalize_ticker(ticker)
+    days = int(min(max(days, 1), 365))
+    s = pipeline.DEFAULT_FORECAST_SETTINGS
+    params = _forecast_params(ticker)
+
+    forecast = pipeline.generate_forecast(
+        ticker, days,
+        params.get("seasonality_mode", s["mode"]),
+        params.get("changepoint_prior_scale", s["scale"]),
+        params.get("daily_seasonality", s["daily"]),
+        params.get("weekly_seasonality", s["weekly"]),
+        params.get("yearly_seasonality", s["yearly"]),
+    )
+    history = pipeline.load_market_data(ticker)
+    if forecast.empty or history.empty:
+        return {"ticker": ticker, "error": "Not enough data to forecast"}
+
+    price = float(history['y'].iloc[-1])
+    future = forecast[forecast['ds'] > history['ds'].iloc[-1]]
+    end = (future if not future.empty else forecast).iloc[-1]
+    return {
+        "ticker": ticker,
+        "horizon_days": days,
+        "model": "tuned" if params else "default",
+        "last_close": _round(price),
+        "target_date": str(pd.Timestamp(end['ds']).date()),
+        "forecast": _round(end['yhat']),
+        "lower_80": _round(end['yhat_lower']),
+        "upper_80": _round(end['yhat_upper']),
+        "expected_change_pct": _round((end['yhat'] / price - 1) * 100),
+    }
+
+
+@cached("agent_tools", should_cache=_succeeded)
+def sentiment_summary(ticker: str) -> dict:
+    """FinBERT score over recent headlines plus the label counts and a few examples."""
+    ticker = normalize_ticker(ticker)
+    score, label, detailed = pipeline.load_sentiment(ticker)
+    counts = {"positive": 0, "negative": 0, "neutral": 0}
+    for _, result in detailed:
+        label_ = result.get("label", "neutral")
+        counts[label_] = counts.get(label_, 0) + 1
+
+    # Most confident headlines first
+    ranked = sorted(detailed, key=lambda item: item[1].get("score", 0), reverse=True)
+    return {
+        "ticker": ticker,
+        "score": _round(score),
+        "label": label,
+        "headlines": len(detailed),
+        "counts": counts,
+        "examples": [
+            {"headline": headline[:120], "sentiment": result.get("label")}
+            for headline, result in ranked[:MAX_HEADLINES]
+        ],
+    }
+
+
+@cached("agent_tools", should_cache=_succeeded, ttl=_market_ttl)
+def backtest_summary(ticker: str) -> dict:
+    """Best SMA crossover over the last year against buy-and-hold, and today's signal."""
+    ticker = normalize_ticker(ticker)
+    result = pipeline.run_sma_backtest(ticker)
+    if not result or not result.get('best_params'):
+        return {"ticker": ticker, "error": "Not enough data to backtest"}
+
+    fast, slow = result['best_params']['fast_sma'], result['best_params']['slow_sma']
+    close = pipeline.load_ohlcv(ticker)['Close']
+    in_market = bool(close.rolling(fast).mean().iloc[-1] > close.rolling(slow).mean().iloc[-1])
+    return {
+        "ticker": ticker,
+        "fast_sma": fast,
+        "slow_sma": slow,
+        "strategy_return_pct": _round(result['return'] * 100),
+        "buy_hold_return_pct": _round(result['buy_hold_return'] * 100),
+        "current_signal": "long" if in_market else "flat",
+    }
+
+
+def _portfolio_key(tickers) -> tuple:
+    return tuple(sorted(dict.fromkeys(normalize_ticker(t) for t in tickers)))
+
+
+@cached(
+    "agent_tools",
+    key=lambda tickers: ("portfolio", _portfolio_key(tickers)),
+    should_cache=_succeeded,
+    ttl=lambda tickers: min(_market_ttl(t) for t in _portfolio_key(tickers)),
+)
+def portfolio_summary(tickers: list) -> dict:
+    """
+    Long-only minimum-variance, risk-parity and mean-variance weights over the
+    last year of daily closes, with each portfolio's annualized return and risk.
+    """
+    tickers = list(dict.fromkeys(normalize_ticker(t) for t in tickers))
+    if not 2 <= len(tickers) <= MAX_PORTFOLIO_ASSETS:
+        return {"error": f"Give between 2 and {MAX_PORTFOLIO_ASSETS} tickers"}
+
+    closes = {}
+    for ticker in tickers:
+        df = pipeline.load_ohlcv(ticker)
+        if df.empty:
+            return {"error": f"No price data for {ticker}"}
+        # Dates only: crypto and equity bars carry different times of day
+        closes[ticker] = df['Close'].groupby(df.index.normalize()).last()
+    # Days every asset traded (crypto weekends drop out next to equities)
+    prices = pd.DataFrame(closes).dropna()
+    if len(prices) < MIN_PORTFOLIO_BARS:
+        return {"error": f"Only {len(prices)} common trading days; need {MIN_PORTFOLIO_BARS}"}
+
+    optimizer = PortfolioOptimizer(prices)
+    portfolios = {
+        "min_variance": optimizer.min_variance(long_only=True),
+        "risk_parity": optimizer.risk_parity(),
+        "mean_variance": optimizer.mean_variance(risk_aversion=3.0, long_only=True),
+    }
+    return {
+        "tickers": tickers,
+        "days": len(prices),
+        "portfolios": {
+            name: {
+                "weights_pct": {t: _round(w * 100, 1) for t, w in result['weights'].items()},
+                "expected_return_pct": _round(result['return'] * 100),
+                "volatility_pct": _round(result['volatility'] * 100),
+                "sharpe": _round(result['sharpe']),
+            }
+            for name, result in portfolios.items()
+        },
+        "note": "Historical estimates from one year of daily returns; not a forecast.",
+    }
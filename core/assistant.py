@@ -1,12 +1,12 @@
 import os
 import sqlite3
 import requests
+from datetime import datetime
 from typing import TypedDict, Annotated, List, Optional
 from dotenv import load_dotenv
 
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
@@ -18,6 +18,16 @@ except ImportError:
 from langgraph.checkpoint.memory import MemorySaver
 
 from core.logger import get_logger
+from core.cache import cached
+from core.market_calendar import expires_in
+from core.expressions import evaluate, format_result
+from core.response_cache import ResponseCache
+from core.titles import TitleWorker
+from core.web_search import get_web_search
+from core import agent_tools
+from services.trade_stream import get_trade_stream
+from core.context import build_context, fold_boundary, summarize
+from db import checkpoints, chat_history
 
 logger = get_logger(__name__)
 
@@ -37,42 +47,52 @@ if not config.GOOGLE_API_KEY:
 else:
     os.environ["GOOGLE_API_KEY"] = config.GOOGLE_API_KEY
 
-model = ChatGoogleGenerativeAI(model='gemini-2.5-flash')
+# A custom endpoint (e.g. the loadtest stand-in) is reached over REST
+gemini_options = (
+    {'client_options': {'api_endpoint': config.GEMINI_BASE_URL}, 'transport': 'rest'}
+    if config.GEMINI_BASE_URL else {}
+)
+model = ChatGoogleGenerativeAI(model='gemini-2.5-flash', **gemini_options)
 
 # Define State
 class ChatState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
+    # Rolling summary of messages[:summarized]; see core.context
+    summary: str
+    summarized: int
 
 # -------------------------------------------------
 # TOOLS
 # -------------------------------------------------
 
-# Try to initialize DuckDuckGo search, but don't crash if unavailable
-try:
-    search_tool = DuckDuckGoSearchRun()
-    logger.info("DuckDuckGo search tool initialized successfully")
-except Exception as e:
-    logger.warning(f"DuckDuckGo search tool unavailable: {e}")
-    # Create a dummy tool that returns an error message
-    @tool
-    def search_tool(query: str) -> str:
-        """Search the web for information (currently unavailable)."""
-        return "Web search is temporarily unavailable. Please try asking without requiring external search."
+@tool
+def search_tool(query: str) -> str:
+    """
+    Search the web for recent news and information not covered by the other tools.
+    Results are cached briefly and trimmed; the search gives up after a few seconds.
+    """
+    return get_web_search().search(query)
 
 @tool
 def calculator_tool(expression: str) -> str:
     """
     Advanced calculator supporting mathematical, statistical, and financial operations.
+    Lists are arrays: arithmetic and functions apply element-wise, so a whole
+    series can be processed in one call.
     
     Supported functions:
-    - Basic: +, -, *, /, **, %, //
+    - Basic: +, -, *, /, **, %, //, comparisons
     - Math: sqrt, pow, abs, round, ceil, floor
     - Trigonometry: sin, cos, tan, asin, acos, atan, radians, degrees
     - Logarithms: log, log10, log2, exp
-    - Statistics: mean, median, sum, min, max
+    - Statistics / series: mean, median, std, var, sum, min, max, cumsum, cumprod, returns(values)
     - Financial: compound_interest(principal, rate, time, n=1), 
                  future_value(pv, rate, periods),
-                 present_value(fv, rate, periods)
+                 present_value(fv, rate, periods),
+                 npv(rate, cashflows), irr(cashflows),
+                 pmt(rate, periods, principal),
+                 amortization(principal, rate, periods) -> rows of [payment, interest, principal, balance],
+                 cagr(values, years=None)
     - Constants: pi, e
     
     Examples:
@@ -80,73 +100,12 @@ def calculator_tool(expression: str) -> str:
     - "sin(radians(90))" -> 1.0
     - "mean([100, 200, 300])" -> 200.0
     - "compound_interest(1000, 0.05, 10)" -> 1628.89
+    - "returns([100, 105, 99])" -> [0.05, -0.057143]
+    - "npv(0.08, [-1000, 300, 400, 500])" -> 17.63
+    - "cagr([100, 112, 125, 140])" -> 0.118689
     """
-    import math
-    import statistics
-    
-    def compound_interest(principal: float, rate: float, time: float, n: float = 1) -> float:
-        """Calculate compound interest: A = P(1 + r/n)^(nt)"""
-        return principal * (1 + rate / n) ** (n * time)
-    
-    def future_value(pv: float, rate: float, periods: float) -> float:
-        """Calculate future value: FV = PV * (1 + r)^n"""
-        return pv * (1 + rate) ** periods
-    
-    def present_value(fv: float, rate: float, periods: float) -> float:
-        """Calculate present value: PV = FV / (1 + r)^n"""
-        return fv / (1 + rate) ** periods
-    
     try:
-        # Allowed functions and constants
-        allowed_names = {
-            # Basic math
-            "abs": abs,
-            "round": round,
-            "pow": pow,
-            "sum": sum,
-            "min": min,
-            "max": max,
-            
-            # Math module functions
-            "sqrt": math.sqrt,
-            "ceil": math.ceil,
-            "floor": math.floor,
-            "exp": math.exp,
-            "log": math.log,
-            "log10": math.log10,
-            "log2": math.log2,
-            
-            # Trigonometry
-            "sin": math.sin,
-            "cos": math.cos,
-            "tan": math.tan,
-            "asin": math.asin,
-            "acos": math.acos,
-            "atan": math.atan,
-            "radians": math.radians,
-            "degrees": math.degrees,
-            
-            # Statistics
-            "mean": statistics.mean,
-            "median": statistics.median,
-            
-            # Financial
-            "compound_interest": compound_interest,
-            "future_value": future_value,
-            "present_value": present_value,
-            
-            # Constants
-            "pi": math.pi,
-            "e": math.e,
-        }
-        
-        code = compile(expression, "<string>", "eval")
-        for name in code.co_names:
-            if name not in allowed_names:
-                raise NameError(f"Function '{name}' is not allowed. Use help to see supported functions.")
-        
-        result = eval(code, {"__builtins__": {}}, allowed_names)
-        return f"{result:.6f}" if isinstance(result, float) else str(result)
+        return format_result(evaluate(expression))
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -155,12 +114,33 @@ def get_stock_price(symbol: str) -> dict:
     """
     Fetch latest stock price for a given symbol (e.g., 'AAPL', 'TSLA') using Alpha Vantage.
     """
+    # Streamed trades answer from memory without spending Alpha Vantage quota
+    live = get_trade_stream().last_price(symbol, config.TRADE_STREAM_MAX_AGE_SECONDS) if config.TRADE_STREAM_ENABLED else None
+    if live:
+        price, ts = live
+        return {
+            "symbol": symbol,
+            "price": f"{price:.4f}",
+            "timestamp": datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S"),
+            "source": "live trades",
+        }
+
+    return fetch_quote(symbol)
+
+@cached(
+    "quotes",
+    key=lambda symbol: ("alphavantage", symbol.upper()),
+    ttl=lambda symbol: expires_in(symbol, config.QUOTE_REFRESH_SECONDS),
+    should_cache=lambda result: "error" not in result,
+)
+def fetch_quote(symbol: str) -> dict:
+    """Latest 5-minute close from Alpha Vantage, shared through the result cache to save quota."""
     api_key = config.ALPHAVANTAGE_API_KEY
     if not api_key:
         return {"error": "ALPHAVANTAGE_API_KEY not found in environment."}
 
     url = (
-        f"https://www.alphavantage.co/query"
+        f"{config.ALPHAVANTAGE_BASE_URL.rstrip('/')}/query"
         f"?function=TIME_SERIES_INTRADAY"
         f"&symbol={symbol}"
         f"&interval=5min"
@@ -181,23 +161,112 @@ def get_stock_price(symbol: str) -> dict:
         elif "Global Quote" in data:
              return data["Global Quote"]
         else:
-            return {"error": "Could not fetch data", "raw": data}
+            # Rate-limit and error responses carry a single message; never pass the raw payload on
+            detail = data.get("Note") or data.get("Information") or data.get("Error Message")
+            return {"error": "Could not fetch data", "detail": str(detail)[:200] if detail else None}
             
     except Exception as e:
         return {"error": str(e)}
 
-tools = [search_tool, get_stock_price, calculator_tool]
+@tool
+def analyze_technicals(ticker: str) -> dict:
+    """
+    Technical snapshot of a ticker (e.g. 'NVDA', 'BTC-USD') from local data:
+    price and recent % changes, SMA 20/50 trend, RSI-14 with overbought/oversold
+    state, MACD state and recent crossovers, 52-week range.
+    Use this for questions like "is NVDA overbought?" instead of web search.
+    """
+    try:
+        return agent_tools.technical_summary(ticker)
+    except Exception as e:
+        logger.error(f"analyze_technicals failed for {ticker}: {e}")
+        return {"error": str(e)}
+
+@tool
+def forecast_price(ticker: str, days: int = 30) -> dict:
+    """
+    Prophet price forecast for a ticker `days` ahead (1-365): forecast value,
+    80% confidence band and expected % change from the last close.
+    """
+    try:
+        return agent_tools.forecast_summary(ticker, days)
+    except Exception as e:
+        logger.error(f"forecast_price failed for {ticker}: {e}")
+        return {"error": str(e)}
+
+@tool
+def news_sentiment(ticker: str) -> dict:
+    """
+    FinBERT sentiment of the last week's news headlines for a ticker:
+    score (-1 to +1), Bullish/Neutral/Bearish label, counts and example headlines.
+    """
+    try:
+        return agent_tools.sentiment_summary(ticker)
+    except Exception as e:
+        logger.error(f"news_sentiment failed for {ticker}: {e}")
+        return {"error": str(e)}
+
+@tool
+def backtest_sma(ticker: str) -> dict:
+    """
+    Backtests SMA crossover strategies on the last year of prices and returns
+    the best fast/slow pair, its return versus buy-and-hold, and today's signal.
+    """
+    try:
+        return agent_tools.backtest_summary(ticker)
+    except Exception as e:
+        logger.error(f"backtest_sma failed for {ticker}: {e}")
+        return {"error": str(e)}
+
+@tool
+def optimize_portfolio(tickers: List[str]) -> dict:
+    """
+    Portfolio weights for 2-10 tickers (e.g. ['AAPL', 'MSFT', 'SPY']) from the
+    last year of daily returns: long-only minimum-variance, risk-parity and
+    mean-variance allocations with expected return, volatility and Sharpe.
+    """
+    try:
+        return agent_tools.portfolio_summary(tickers)
+    except Exception as e:
+        logger.error(f"optimize_portfolio failed for {tickers}: {e}")
+        return {"error": str(e)}
+
+tools = [
+    search_tool, get_stock_price, calculator_tool,
+    analyze_technicals, forecast_price, news_sentiment, backtest_sma,
+    optimize_portfolio,
+]
 model_with_tools = model.bind_tools(tools)
 
 # -------------------------------------------------
 # NODES & GRAPH
 # -------------------------------------------------
 
+def context_node(state: ChatState):
+    """
+    Runs once per user turn: folds turns older than the verbatim window into
+    the running summary. Messages stay in the checkpoint; only the
+    `summarized` marker moves forward.
+    """
+    messages = state['messages']
+    summarized = state.get('summarized', 0)
+    boundary = fold_boundary(messages, summarized)
+    if boundary <= summarized:
+        return {}
+    try:
+        summary = summarize(model, state.get('summary', ''), messages[summarized:boundary])
+        logger.info(f"Folded {boundary - summarized} messages into the conversation summary")
+        return {'summary': summary, 'summarized': boundary}
+    except Exception as e:
+        # Keep sending the full window until summarization succeeds
+        logger.error(f"Error summarizing conversation: {e}")
+        return {}
+
 def chat_node(state: ChatState):
     """
     LLM node that handles conversation and tool invocation requests.
     """
-    messages = state['messages']
+    messages = build_context(state['messages'], state.get('summary', ''), state.get('summarized', 0))
     try:
         response = model_with_tools.invoke(messages)
         return {'messages': [response]}
@@ -223,24 +292,32 @@ def init_db():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    chat_history.init_schema(conn)
     conn.commit()
     conn.close()
 
 if SqliteSaver:
     init_db()
+    try:
+        checkpoints.enable_incremental_vacuum(db_path)
+    except Exception as e:
+        logger.error(f"Could not enable incremental vacuum: {e}")
     conn = sqlite3.connect(db_path, check_same_thread=False)
-    checkpointer = SqliteSaver(conn=conn)
+    serde = checkpoints.ZlibSerializer() if config.CHAT_COMPRESS_CHECKPOINTS else None
+    checkpointer = SqliteSaver(conn=conn, serde=serde)
 else:
     logger.warning("SqliteSaver not available. Using MemorySaver.")
     checkpointer = MemorySaver()
 
 # Build Graph
 graph = StateGraph(ChatState)
+graph.add_node('context', context_node)
 graph.add_node('chat_node', chat_node)
 tool_node = ToolNode(tools)
 graph.add_node('tools', tool_node)
 
-graph.add_edge(START, 'chat_node')
+graph.add_edge(START, 'context')
+graph.add_edge('context', 'chat_node')
 graph.add_conditional_edges('chat_node', tools_condition)
 graph.add_edge('tools', 'chat_node')
 graph.add_edge('chat_node', END)
@@ -301,19 +378,83 @@ def get_all_chats():
         logger.error(f"Error listing chats: {e}")
         return []
 
+def list_chats(limit: int = 20, cursor: tuple = None):
+    """
+    One page of chat threads, most recent first.
+    Returns ([(id, title), ...], next_cursor).
+    """
+    try:
+        return chat_history.list_threads(db_path, limit=limit, cursor=cursor)
+    except Exception as e:
+        logger.error(f"Error listing chats: {e}")
+        return [], None
+
+def search_chats(query: str, limit: int = 20):
+    """Full-text search over chat titles and message text."""
+    try:
+        return chat_history.search_threads(db_path, query, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching chats: {e}")
+        return []
+
+def _message_text(content) -> str:
+    if isinstance(content, list):
+        return "".join(
+            block.get('text', '') if isinstance(block, dict) else str(block) for block in content
+        )
+    return str(content)
+
+def save_chat_turn(thread_id: str, user_input: str, answer: str):
+    """Indexes one user / assistant exchange for listing, search and paging."""
+    try:
+        chat_history.add_messages(db_path, thread_id, [('user', user_input), ('assistant', answer)])
+    except Exception as e:
+        logger.error(f"Error saving chat turn for {thread_id}: {e}")
+
+def load_chat_messages(thread_id: str, limit: int = 30, before_id: int = None):
+    """
+    A page of a thread's messages, oldest first, plus whether older ones exist.
+    Threads created before the message index existed are backfilled once
+    from their checkpoint.
+    """
+    try:
+        if before_id is None and not chat_history.has_messages(db_path, thread_id):
+            state = chatbot.get_state(config={'configurable': {'thread_id': thread_id}})
+            backfill = [
+                ('user' if isinstance(m, HumanMessage) else 'assistant', _message_text(m.content))
+                for m in state.values.get('messages', [])
+                if isinstance(m, (HumanMessage, AIMessage))
+            ]
+            chat_history.add_messages(db_path, thread_id, backfill, touch=False)
+        return chat_history.load_messages(db_path, thread_id, limit=limit, before_id=before_id)
+    except Exception as e:
+        logger.error(f"Error loading messages for {thread_id}: {e}")
+        return [], False
+
 def delete_chat(thread_id: str):
-    """Deletes a chat thread from the index."""
+    """Deletes a chat thread: its title plus all of its checkpoints and writes."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM chat_titles WHERE thread_id = ?", (thread_id,))
-        conn.commit()
+        conn = sqlite3.connect(db_path, timeout=30)
+        with conn:
+            conn.execute("DELETE FROM chat_titles WHERE thread_id = ?", (thread_id,))
+            chat_history.delete_messages(conn, thread_id)
+            checkpoints.delete_thread(conn, thread_id)
         conn.close()
         return True
     except Exception as e:
         logger.error(f"Error deleting chat {thread_id}: {e}")
         return False
 
+def run_chat_maintenance():
+    """Checkpoint retention and space reclamation for chatbot.db."""
+    if not SqliteSaver:
+        return {}
+    try:
+        return checkpoints.run_maintenance(db_path, keep=config.CHAT_CHECKPOINTS_KEEP)
+    except Exception as e:
+        logger.error(f"Chat maintenance failed: {e}")
+        return {}
+
 def generate_chat_title(thread_id: str, messages: List[BaseMessage]):
     """
     Generates a short title based on the first user message.
@@ -338,3 +479,59 @@ def generate_chat_title(thread_id: str, messages: List[BaseMessage]):
         # Fallback to first few words
         fallback = " ".join(user_msg.split()[:4]) + "..."
         update_chat_title(thread_id, fallback)
+
+title_worker = TitleWorker(model, update_chat_title)
+
+def queue_chat_title(thread_id: str, first_message: str):
+    """
+    Non-blocking title generation: a heuristic title is stored right away
+    and the LLM title follows from the background worker.
+    """
+    if not first_message:
+        return
+    try:
+        title_worker.submit(thread_id, first_message)
+    except Exception as e:
+        logger.error(f"Error queueing title for {thread_id}: {e}")
+
+# -------------------------------------------------
+# RESPONSE CACHE
+# -------------------------------------------------
+
+response_cache = ResponseCache()
+
+def get_cached_response(prompt: str, is_first_turn: bool):
+    """
+    Cached answer for a standalone question, or None.
+    Follow-ups depend on the conversation so they are never served from cache.
+    """
+    if not is_first_turn:
+        return None
+    try:
+        return response_cache.get(prompt)
+    except Exception as e:
+        logger.error(f"Response cache lookup failed: {e}")
+        return None
+
+def cache_response(prompt: str, answer: str, messages: List[BaseMessage], is_first_turn: bool):
+    """
+    Stores the answer to a standalone question. The TTL depends on whether
+    any live-data tool was used to produce it (see core.response_cache).
+    """
+    if not is_first_turn or not answer or answer.startswith(("⚠️", "Error")):
+        return
+    # Only this turn's tool calls matter: everything after the last user message
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+    tools_used = [m.name for m in messages[last_human + 1:] if isinstance(m, ToolMessage)]
+    response_cache.put(prompt, answer, tools_used=tools_used)
+
+def record_cached_turn(thread_id: str, prompt: str, answer: str):
+    """Writes a cache-served turn into the thread's checkpoint so history stays complete."""
+    try:
+        chatbot.update_state(
+            {'configurable': {'thread_id': thread_id}},
+            {'messages': [HumanMessage(content=prompt), AIMessage(content=answer)]},
+            as_node='chat_node',
+        )
+    except Exception as e:
+        logger.error(f"Error recording cached turn for {thread_id}: {e}")
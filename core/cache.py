@@ -0,0 +1,463 @@
+"""
+Result Cache
+Shared cache for engine results (market data, forecasts, sentiment, agent
+tool answers) behind a pluggable backend:
+    memory  per-process LRU bounded by bytes
+    disk    files under a directory, shared by every process on the host
+    redis   any server speaking the Redis protocol, shared by every replica
+Values are encoded as tagged JSON (core/codec.py) and zlib-compressed above
+1 KB; each namespace has its own TTL. Nothing read from a shared store is
+ever unpickled, so write access to the disk directory or Redis does not
+grant code execution in the app. A backend failure is logged and treated as a miss, so the cache can
+never take an engine call down with it.
+Framework independent.
+"""
+
+import functools
+import hashlib
+import os
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+from core.codec import encode_value, decode_value
+from core.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "tg2"  # Bump when cached value shapes or the encoding change
+COMPRESS_MIN_BYTES = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+# ---- serialization -----------------------------------------------------
+
+def dumps(value) -> bytes:
+    data = encode_value(value)
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data, 6)
+    return b"j" + data
+
+
+def loads(blob: bytes):
+    if blob[:1] == b"z":
+        return decode_value(zlib.decompress(blob[1:]))
+    if blob[:1] == b"j":
+        return decode_value(blob[1:])
+    raise ValueError(f"Unknown cache blob format {blob[:1]!r}")
+
+
+# ---- backends ----------------------------------------------------------
+# get(key) -> bytes | None, set(key, blob, ttl_seconds), delete(key), clear()
+
+class MemoryBackend:
+    """LRU bounded by the total size of the stored blobs."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (expires, blob)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, blob: bytes, ttl_seconds: float):
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.time() + ttl_seconds, blob)
+            self.size += len(blob)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DiskBackend:
+    """
+    One file per key: 8-byte expiry (epoch ms) followed by the blob. Writes
+    are atomic renames; reads refresh the mtime so eviction drops the least
+    recently used files once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.size = sum(stat.st_size for stat, _ in self._files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if int.from_bytes(data[:8], "little") <= time.time() * 1000:
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data[8:]
+
+    def set(self, key: str, blob: bytes, ttl_seconds: float):
+        path = self._path(key)
+        expires = int((time.time() + ttl_seconds) * 1000).to_bytes(8, "little")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(expires + blob)
+        with self._lock:
+            old = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+            self.size += len(blob) + 8 - old
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _files(self) -> list:
+        """(stat, path) of every cache file, oldest first."""
+        files = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                try:
+                    files.append((entry.stat(), entry.path))
+                except OSError:
+                    pass  # Removed by another process meanwhile
+        return sorted(files, key=lambda f: f[0].st_mtime)
+
+    def _evict(self):
+        # Other processes share the directory, so re-measure it instead of trusting self.size
+        files = self._files()
+        self.size = sum(stat.st_size for stat, _ in files)
+        target = self.max_bytes * 0.9
+        for stat, path in files:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                self.size -= stat.st_size
+            except OSError:
+                pass
+
+    def delete(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for _, path in self._files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.size = 0
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend:
+    """
+    Minimal RESP2 client (GET / SET PX / DEL / SCAN), one connection per
+    thread. Size-based eviction is the server's job: run it with
+    `maxmemory` and `maxmemory-policy allkeys-lru`. After a connection
+    failure the backend stays off for `retry_seconds` instead of making
+    every call wait for a timeout.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0, retry_seconds: float = 30):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+            if self.password:
+                self._call("AUTH", self.password)
+            if self.db:
+                self._call("SELECT", str(self.db))
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"Unexpected reply {line[:20]!r}")
+
+    def _call(self, *parts):
+        sock, reader = self._connection()
+        chunks = [f"*{len(parts)}\r\n".encode()]
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode()
+            chunks.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        sock.sendall(b"".join(chunks))
+        return self._read_reply(reader)
+
+    def command(self, *parts):
+        """Runs one command; None (a miss) while the server is unreachable."""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self._call(*parts)
+        except (OSError, ConnectionError) as e:
+            self._close()
+            self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning(f"Redis cache unavailable at {self.host}:{self.port}, retrying in {self.retry_seconds:.0f}s: {e}")
+            return None
+
+    def get(self, key: str):
+        return self.command("GET", key)
+
+    def set(self, key: str, blob: bytes, ttl_seconds: float):
+        self.command("SET", key, blob, "PX", str(max(int(ttl_seconds * 1000), 1)))
+
+    def delete(self, key: str):
+        self.command("DEL", key)
+
+    def clear(self):
+        """Deletes this app's keys only (the server may be shared)."""
+        cursor = "0"
+        while True:
+            reply = self.command("SCAN", cursor, "MATCH", f"{KEY_PREFIX}:*", "COUNT", "500")
+            if not reply:
+                return
+            cursor, keys = reply[0].decode(), reply[1]
+            if keys:
+                self.command("DEL", *keys)
+            if cursor == "0":
+                return
+
+
+# ---- cache -------------------------------------------------------------
+
+def _worth_caching(value) -> bool:
+    """Skips None and empty results (failed downloads, no headlines) so they are retried."""
+    if value is None:
+        return False
+    try:
+        return len(value) > 0
+    except TypeError:
+        return True
+
+
+class ResultCache:
+    def __init__(self, backend, ttls: dict = None, default_ttl: float = DEFAULT_TTL_SECONDS):
+        """
+        ttls: namespace -> seconds; namespaces not listed use `default_ttl`.
+        """
+        self.backend = backend
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+        # One computation per key at a time within this process
+        self._key_locks = {}
+        self._locks_lock = threading.Lock()
+
+    def ttl(self, namespace: str) -> float:
+        return self.ttls.get(namespace, self.default_ttl)
+
+    @staticmethod
+    def make_key(namespace: str, key) -> str:
+        text = key if isinstance(key, str) else repr(key)
+        if len(text) > 120:
+            text = hashlib.sha1(text.encode()).hexdigest()
+        return f"{KEY_PREFIX}:{namespace}:{text}"
+
+    def _read(self, namespace: str, key, default):
+        try:
+            blob = self.backend.get(self.make_key(namespace, key))
+            if blob is not None:
+                return loads(blob)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache read failed for {namespace}/{key}: {e}")
+        return default
+
+    def get(self, namespace: str, key, default=None):
+        missing = object()
+        value = self._read(namespace, key, missing)
+        if value is missing:
+            self.stats["misses"] += 1
+            return default
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, namespace: str, key, value, ttl_seconds: float = None):
+        try:
+            self.backend.set(self.make_key(namespace, key), dumps(value), ttl_seconds or self.ttl(namespace))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache write failed for {namespace}/{key}: {e}")
+
+    def delete(self, namespace: str, key):
+        try:
+            self.backend.delete(self.make_key(namespace, key))
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {namespace}/{key}: {e}")
+
+    def _key_lock(self, full_key: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._key_locks.get(full_key)
+            if lock is None:
+                if len(self._key_locks) > 1024:
+                    self._key_locks = {k: v for k, v in self._key_locks.items() if v.locked()}
+                lock = self._key_locks[full_key] = threading.Lock()
+            return lock
+
+    def get_or_compute(self, namespace: str, key, compute, should_cache=_worth_caching, ttl_seconds=None):
+        """
+        Cached value, or `compute()` stored when `should_cache(result)` is true.
+        ttl_seconds: number, or callable() evaluated when the result is stored;
+                     defaults to the namespace TTL.
+        """
+        missing = object()
+        value = self.get(namespace, key, missing)
+        if value is not missing:
+            return value
+        with self._key_lock(self.make_key(namespace, key)):
+            # Another thread may have filled it while this one waited
+            value = self._read(namespace, key, missing)
+            if value is not missing:
+                self.stats["misses"] -= 1
+                self.stats["hits"] += 1
+                return value
+            value = compute()
+            if should_cache(value):
+                self.set(namespace, key, value, ttl_seconds() if callable(ttl_seconds) else ttl_seconds)
+            return value
+
+
+def parse_ttls(text: str) -> dict:
+    """'market=3600,forecast=21600' -> {'market': 3600.0, 'forecast': 21600.0}"""
+    ttls = {}
+    for item in (text or "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def create_backend(kind: str = None):
+    kind = (kind or config.CACHE_BACKEND).lower()
+    max_bytes = int(config.CACHE_MAX_MB * 1024 * 1024)
+    if kind == "memory":
+        return MemoryBackend(max_bytes)
+    if kind == "disk":
+        return DiskBackend(config.CACHE_DIR, max_bytes)
+    if kind == "redis":
+        return RedisBackend(config.CACHE_REDIS_URL)
+    if kind in ("", "none", "off"):
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND '{kind}' (memory, disk, redis or none)")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_cache_ready = False
+
+
+def get_cache():
+    """Process-wide ResultCache from config, or None when caching is off."""
+    global _cache, _cache_ready
+    with _cache_lock:
+        if not _cache_ready:
+            try:
+                backend = create_backend()
+                _cache = ResultCache(backend, parse_ttls(config.CACHE_TTLS)) if backend else None
+            except Exception as e:
+                logger.error(f"Result cache disabled: {e}")
+                _cache = None
+            _cache_ready = True
+        return _cache
+
+
+def cached(namespace: str, key=None, should_cache=_worth_caching, ttl=None):
+    """
+    Decorator: serves `fn(*args, **kwargs)` from the shared cache.
+    key: optional callable(*args, **kwargs) -> key; defaults to the arguments.
+    ttl: optional callable(*args, **kwargs) -> seconds, e.g. until the market
+         can next produce new data; defaults to the namespace TTL.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return fn(*args, **kwargs)
+            k = key(*args, **kwargs) if key else (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            ttl_seconds = (lambda: ttl(*args, **kwargs)) if ttl else None
+            return cache.get_or_compute(namespace, k, lambda: fn(*args, **kwargs), should_cache, ttl_seconds)
+        return wrapper
+    return decorate
@@ -0,0 +1,117 @@
+"""
+Series Codec
+JSON wire format for PriceSeries, shared by the analysis API server
+(api/server.py) and its client (services/analysis_api.py). Series travel as
+columns (int64 epoch-ns dates plus one list per column), the same layout the
+pipeline caches, so the client rebuilds a PriceSeries without a DataFrame
+round trip. NaN is sent as null.
+
+encode_value / decode_value serialize cached results (core/cache.py) the same
+way: plain JSON with tagged tuples, numeric arrays and PriceSeries. Unlike
+pickle, decoding bytes from a shared store can only ever build data.
+Framework independent.
+"""
+
+import base64
+import json
+import numpy as np
+from core.series import PriceSeries
+
+
+def _values(values: np.ndarray) -> list:
+    if values.dtype.kind == "f":
+        missing = np.isnan(values)
+        if missing.any():
+            out = values.astype(object)
+            out[missing] = None
+            return out.tolist()
+    return values.tolist()
+
+
+def encode_series(series: PriceSeries) -> dict:
+    return {
+        "dates": series.dates.tolist(),
+        "columns": {name: _values(values) for name, values in series.columns.items()},
+    }
+
+
+def decode_series(payload: dict, dtype=np.float32) -> PriceSeries:
+    dates = np.asarray(payload.get("dates") or [], dtype=np.int64)
+    columns = {
+        name: np.array(values, dtype=np.float64).astype(dtype, copy=False)
+        for name, values in (payload.get("columns") or {}).items()
+    }
+    return PriceSeries(dates, columns)
+
+
+# ---- cached values -----------------------------------------------------
+
+# Array dtypes decode_value will build; anything else (objects) is rejected
+_ARRAY_KINDS = "biuf"
+_TAGS = ("__tuple__", "__array__", "__series__", "__dict__")
+
+
+def _encode_array(values: np.ndarray) -> dict:
+    if values.dtype.kind not in _ARRAY_KINDS:
+        raise TypeError(f"Cannot encode {values.dtype} arrays")
+    values = np.ascontiguousarray(values)
+    return {"__array__": values.dtype.str, "shape": list(values.shape),
+            "data": base64.b64encode(values.tobytes()).decode("ascii")}
+
+
+def _decode_array(payload: dict) -> np.ndarray:
+    dtype = np.dtype(payload["__array__"])
+    if dtype.kind not in _ARRAY_KINDS:
+        raise ValueError(f"Refusing to decode {dtype} arrays")
+    # Read-only view over the decoded bytes, no copy
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=dtype).reshape(payload["shape"])
+
+
+def _encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, PriceSeries):
+        return {"__series__": {"dates": _encode_array(value.dates),
+                               "columns": {name: _encode_array(v) for name, v in value.columns.items()}}}
+    if isinstance(value, np.ndarray):
+        return _encode_array(value)
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not any(k in _TAGS for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__dict__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    raise TypeError(f"Cannot encode {type(value).__name__} values")
+
+
+def _decode_object(obj: dict):
+    if "__tuple__" in obj:
+        return tuple(obj["__tuple__"])
+    if "__array__" in obj:
+        return _decode_array(obj)
+    if "__series__" in obj:
+        series = obj["__series__"]
+        return PriceSeries(series["dates"], series["columns"])
+    if "__dict__" in obj:
+        return {_hashable(k): v for k, v in obj["__dict__"]}
+    return obj
+
+
+def _hashable(key):
+    return tuple(_hashable(k) for k in key) if isinstance(key, list) else key
+
+
+def encode_value(value) -> bytes:
+    """
+    UTF-8 JSON for None, bools, numbers, strings, lists, tuples, dicts,
+    numeric NumPy arrays and PriceSeries; raises TypeError for anything else.
+    """
+    return json.dumps(_encode(value), separators=(",", ":")).encode("utf-8")
+
+
+def decode_value(data: bytes):
+    return json.loads(data, object_hook=_decode_object)
@@ -0,0 +1,120 @@
+"""
+Chat Context
+Bounds what the chat model sees on each turn. The last few turns are sent
+verbatim, older turns are folded into a running summary kept in the graph
+state, and tool payloads are trimmed to compact forms. The full message
+history stays in the checkpoint so the UI can still show it.
+"""
+
+import json
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
+
+# Turns (a user message plus everything up to the next one) sent verbatim
+KEEP_TURNS = 6
+# Fold only once this many turns are waiting, so the summarizer runs every few turns, not every turn
+FOLD_EVERY = 4
+# Tool output limits: current turn vs. earlier turns in the window
+TOOL_RESULT_MAX_CHARS = 4000
+OLD_TOOL_RESULT_MAX_CHARS = 600
+SUMMARY_MAX_CHARS = 2000
+# Per-message limit when feeding old turns to the summarizer
+SUMMARY_INPUT_MAX_CHARS = 1500
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a financial assistant. "
+    "Update the summary with the new messages below. Keep tickers, numbers, dates, user preferences "
+    "and open questions; drop pleasantries. Reply with the summary only, at most 200 words.\n\n"
+    "Current summary:\n{summary}\n\nNew messages:\n{transcript}"
+)
+
+
+def turn_starts(messages: list, start: int = 0) -> list:
+    """Indices of every HumanMessage from `start` on; turns are cut only at these boundaries."""
+    return [i for i in range(start, len(messages)) if isinstance(messages[i], HumanMessage)]
+
+
+def fold_boundary(messages: list, summarized: int) -> int:
+    """
+    Index up to which messages should be folded into the summary, or
+    `summarized` when there is nothing worth folding yet.
+    """
+    starts = turn_starts(messages, summarized)
+    if len(starts) <= KEEP_TURNS + FOLD_EVERY:
+        return summarized
+    return starts[-KEEP_TURNS]
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    # Gemini may return a list of content parts
+    return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]} ... [truncated {len(text) - limit} chars]"
+
+
+def compact_tool_content(content, limit: int) -> str:
+    """
+    Compact form of a tool result: JSON payloads are re-serialized without
+    whitespace and stripped of bulky raw fields before truncation.
+    """
+    text = _text(content)
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        return truncate(text, limit)
+    if isinstance(data, dict):
+        data.pop("raw", None)
+    return truncate(json.dumps(data, separators=(",", ":"), default=str), limit)
+
+
+def transcript(messages: list) -> str:
+    """Plain-text rendering of messages for the summarizer."""
+    lines = []
+    for m in messages:
+        if isinstance(m, HumanMessage):
+            lines.append(f"User: {truncate(_text(m.content), SUMMARY_INPUT_MAX_CHARS)}")
+        elif isinstance(m, ToolMessage):
+            lines.append(f"Tool {m.name}: {compact_tool_content(m.content, OLD_TOOL_RESULT_MAX_CHARS)}")
+        elif isinstance(m, AIMessage):
+            text = _text(m.content).strip()
+            calls = ", ".join(c["name"] for c in getattr(m, "tool_calls", None) or [])
+            if text:
+                lines.append(f"Assistant: {truncate(text, SUMMARY_INPUT_MAX_CHARS)}")
+            elif calls:
+                lines.append(f"Assistant called: {calls}")
+    return "\n".join(lines)
+
+
+def summarize(llm, summary: str, messages: list) -> str:
+    """Folds `messages` into `summary` with one LLM call."""
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(empty)", transcript=transcript(messages))
+    response = llm.invoke([HumanMessage(content=prompt)])
+    return truncate(_text(response.content).strip(), SUMMARY_MAX_CHARS)
+
+
+def build_context(messages: list, summary: str = "", summarized: int = 0) -> list[BaseMessage]:
+    """
+    Messages to send to the model: the summary (if any) followed by every
+    message not yet folded, with tool payloads compacted. Tool results from
+    earlier turns get a tighter limit than the ones from the current turn.
+    """
+    window = messages[summarized:]
+    starts = turn_starts(window)
+    current_turn = starts[-1] if starts else 0
+
+    context = []
+    if summary:
+        context.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+    for i, m in enumerate(window):
+        if isinstance(m, ToolMessage):
+            limit = TOOL_RESULT_MAX_CHARS if i >= current_turn else OLD_TOOL_RESULT_MAX_CHARS
+            compact = compact_tool_content(m.content, limit)
+            if compact != m.content:
+                m = m.model_copy(update={"content": compact})
+        context.append(m)
+    return context
@@ -0,0 +1,75 @@
+"""
+Downsampling
+Shape-preserving decimation for chart series so long histories ship a few
+thousand points to the browser instead of every bar.
+Framework independent.
+"""
+
+import numpy as np
+
+
+def minmax_indices(y, n_out: int) -> np.ndarray:
+    """
+    Keeps the min and max of each bucket (plus first/last point).
+    Spikes survive, which matters for histograms and volume.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = max((n_out - 2) // 2, 1)
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(int)
+    keep = [0]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        chunk = y[start:stop]
+        if stop <= start or np.isnan(chunk).all():
+            continue
+        lo = start + int(np.nanargmin(chunk))
+        hi = start + int(np.nanargmax(chunk))
+        keep.extend(sorted((lo, hi)))
+    keep.append(n - 1)
+    return np.unique(np.asarray(keep))
+
+
+def lttb_indices(y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over evenly spaced samples.
+    Returns the indices of the points to keep, always including both ends.
+    NaN points (e.g. indicator warm-up) are skipped.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out or n_out < 3:
+        return valid
+
+    x = valid.astype(float)
+    v = y[valid]
+    n = len(v)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average of the next bucket is the third triangle vertex
+        nxt_start, nxt_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        if nxt_stop <= nxt_start:
+            nxt_start, nxt_stop = n - 1, n
+        cx = x[nxt_start:nxt_stop].mean()
+        cy = v[nxt_start:nxt_stop].mean()
+
+        bx = x[start:stop]
+        by = v[start:stop]
+        area = np.abs((x[a] - cx) * (by - v[a]) - (x[a] - bx) * (cy - v[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return valid[keep]
+
+
+def downsample_indices(y, n_out: int, method: str = "lttb") -> np.ndarray:
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    return lttb_indices(y, n_out)
@@ -0,0 +1,329 @@
+"""
+Expression Evaluator
+Safe, array-aware evaluator behind the assistant's calculator tool.
+Expressions are parsed once, checked against an AST whitelist and cached as
+compiled code; the function namespace is built once at import.
+Lists are NumPy arrays under the hood, so whole series can be processed in a
+single call (e.g. "cagr([100, 112, 125, 140])").
+Examples in the docstrings double as regression checks:
+python -m doctest core/expressions.py
+Framework independent.
+"""
+
+import ast
+import math
+from functools import lru_cache
+import numpy as np
+
+MAX_EXPONENT = 10_000
+MAX_INT_BITS = 10_000  # Exact integer powers stay below ~3,000 digits
+MAX_PERIODS = 1_200  # 100 years of monthly payments
+MAX_EXPRESSION_LENGTH = 2_000
+MAX_OUTPUT_ITEMS = 60
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions outside the allowed grammar."""
+
+
+# -------------------------------------------------
+# FINANCIAL FUNCTIONS
+# -------------------------------------------------
+
+def compound_interest(principal, rate, time, n=1):
+    """A = P(1 + r/n)^(nt)"""
+    return np.asarray(principal, dtype=float) * (1 + np.asarray(rate, dtype=float) / n) ** (n * np.asarray(time, dtype=float))
+
+def future_value(pv, rate, periods):
+    """FV = PV * (1 + r)^n"""
+    return np.asarray(pv, dtype=float) * (1 + np.asarray(rate, dtype=float)) ** np.asarray(periods, dtype=float)
+
+def present_value(fv, rate, periods):
+    """PV = FV / (1 + r)^n"""
+    return np.asarray(fv, dtype=float) / (1 + np.asarray(rate, dtype=float)) ** np.asarray(periods, dtype=float)
+
+def npv(rate, cashflows):
+    """Net present value; the first cash flow is at t=0."""
+    flows = np.asarray(cashflows, dtype=float)
+    return float(np.sum(flows / (1 + rate) ** np.arange(len(flows))))
+
+def irr(cashflows):
+    """Internal rate of return (real root of the NPV polynomial closest to 0)."""
+    flows = np.asarray(cashflows, dtype=float)
+    # NPV = sum(c_t * x^t) with x = 1 / (1 + r); np.roots wants the highest power first
+    roots = np.roots(flows[::-1])
+    real = roots[np.isreal(roots)].real
+    real = real[real > 0]
+    if len(real) == 0:
+        raise ExpressionError("IRR has no real solution for these cash flows")
+    rates = 1 / real - 1
+    return float(rates[np.argmin(np.abs(rates))])
+
+def pmt(rate, periods, principal):
+    """Level payment that repays `principal` over `periods` at `rate` per period."""
+    if rate == 0:
+        return principal / periods
+    return principal * rate / (1 - (1 + rate) ** -periods)
+
+def amortization(principal, rate, periods):
+    """
+    Schedule as a (periods x 4) array: payment, interest, principal paid, balance.
+
+    >>> amortization(1000, 0.01, 3e9)  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ExpressionError: Amortization supports 1 to 1200 periods
+    """
+    periods = int(periods)
+    if not 1 <= periods <= MAX_PERIODS:
+        raise ExpressionError(f"Amortization supports 1 to {MAX_PERIODS} periods")
+    payment = pmt(rate, periods, principal)
+    k = np.arange(1, periods + 1)
+    growth = (1 + rate) ** k
+    balance = principal * growth - (payment * (growth - 1) / rate if rate else payment * k)
+    prev_balance = np.concatenate([[principal], balance[:-1]])
+    interest = prev_balance * rate
+    return np.column_stack([np.full(periods, payment), interest, payment - interest, np.maximum(balance, 0)])
+
+def cagr(values, years=None):
+    """
+    Compound annual growth rate of a series. `years` defaults to one per step.
+    """
+    values = np.asarray(values, dtype=float)
+    years = len(values) - 1 if years is None else years
+    if years <= 0 or values[0] <= 0:
+        raise ExpressionError("CAGR needs at least two positive values")
+    return float((values[-1] / values[0]) ** (1 / years) - 1)
+
+def returns(values):
+    """Simple period-over-period returns of a series."""
+    values = np.asarray(values, dtype=float)
+    return values[1:] / values[:-1] - 1
+
+def _reduce(reducer, args):
+    # One argument reduces the array itself; several reduce across the arguments
+    if len(args) == 1:
+        return reducer(np.asarray(args[0], dtype=float))
+    if not args:
+        raise ExpressionError("Expected at least one argument")
+    return reducer(np.stack(np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))), axis=0)
+
+def max_(*args):
+    """
+    Largest value: max(3, 5) compares the arguments, max([1, 9, 4]) reduces the list.
+
+    >>> format_result(evaluate("max(3, 5)"))
+    '5.000000'
+    >>> format_result(evaluate("max([1, 9, 4])"))
+    '9.000000'
+    >>> format_result(evaluate("max([1, 9], [4, 2])"))
+    '[4., 9.]'
+    """
+    return _reduce(np.max, args)
+
+def min_(*args):
+    """
+    Smallest value, with the same argument rules as max.
+
+    >>> format_result(evaluate("min(2, 7)"))
+    '2.000000'
+    >>> format_result(evaluate("min([8, 3, 5])"))
+    '3.000000'
+    """
+    return _reduce(np.min, args)
+
+def sum_(*args):
+    """
+    Total of a list, or of the arguments when given several.
+
+    >>> format_result(evaluate("sum([1, 2, 3])"))
+    '6.000000'
+    >>> format_result(evaluate("sum(1, 2, 3)"))
+    '6.000000'
+    """
+    return _reduce(np.sum, args)
+
+def log(x, base=None):
+    """
+    Natural logarithm, or the logarithm in `base` when given.
+
+    >>> format_result(evaluate("log(100, 10)"))
+    '2.000000'
+    >>> format_result(evaluate("log(e)"))
+    '1.000000'
+    """
+    x = np.asarray(x, dtype=float)
+    if base is None:
+        return np.log(x)
+    return np.log(x) / np.log(np.asarray(base, dtype=float))
+
+def _safe_pow(base, exponent):
+    """
+    ** with bounded cost. Python ints are exact and unbounded, so an integer
+    power whose result would exceed MAX_INT_BITS is rejected before it is
+    computed; float powers overflow to an error instead of running on.
+
+    >>> format_result(evaluate("2**10"))
+    '1024'
+    >>> evaluate("(9**9999)**9999")  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ExpressionError: Result of ** is too large
+    >>> evaluate("9.0**9999")  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ExpressionError: Result of ** is too large
+    """
+    if np.any(np.abs(np.asarray(exponent, dtype=float)) > MAX_EXPONENT):
+        raise ExpressionError(f"Exponent larger than {MAX_EXPONENT} is not allowed")
+    if isinstance(base, (list, np.ndarray)):
+        return np.power(np.asarray(base, dtype=float), exponent)
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if abs(base).bit_length() * exponent > MAX_INT_BITS:
+            raise ExpressionError("Result of ** is too large")
+    try:
+        return base ** exponent
+    except OverflowError:
+        raise ExpressionError("Result of ** is too large") from None
+
+
+ALLOWED_NAMES = {
+    # Basic math
+    "abs": np.abs,
+    "round": np.round,
+    "pow": _safe_pow,
+    "sum": sum_,
+    "min": min_,
+    "max": max_,
+
+    # Math functions (element-wise on arrays)
+    "sqrt": np.sqrt,
+    "ceil": np.ceil,
+    "floor": np.floor,
+    "exp": np.exp,
+    "log": log,
+    "log10": np.log10,
+    "log2": np.log2,
+
+    # Trigonometry
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "radians": np.radians,
+    "degrees": np.degrees,
+
+    # Statistics / series
+    "mean": np.mean,
+    "median": np.median,
+    "std": np.std,
+    "var": np.var,
+    "cumsum": np.cumsum,
+    "cumprod": np.cumprod,
+    "returns": returns,
+
+    # Financial
+    "compound_interest": compound_interest,
+    "future_value": future_value,
+    "present_value": present_value,
+    "npv": npv,
+    "irr": irr,
+    "pmt": pmt,
+    "amortization": amortization,
+    "cagr": cagr,
+
+    # Constants
+    "pi": math.pi,
+    "e": math.e,
+
+    # Internal
+    "__pow__": _safe_pow,
+    "__array__": np.asarray,
+}
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+_CMP_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class _Validator(ast.NodeTransformer):
+    """
+    Rejects anything outside the whitelist and rewrites ** into a guarded
+    call and list literals into arrays so arithmetic on them is element-wise.
+    """
+
+    def generic_visit(self, node):
+        allowed = (
+            ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.keyword,
+            ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+        ) + _BIN_OPS + _UNARY_OPS + _CMP_OPS
+        if not isinstance(node, allowed):
+            raise ExpressionError(f"'{type(node).__name__}' is not allowed in expressions")
+        return super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id not in ALLOWED_NAMES or node.id.startswith("__"):
+            raise ExpressionError(f"Function '{node.id}' is not allowed. Use help to see supported functions.")
+        return node
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ExpressionError("Only numeric constants are allowed")
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name):
+            raise ExpressionError("Only direct function calls are allowed")
+        return self.generic_visit(node)
+
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="__pow__", ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node,
+            )
+        return node
+
+    def visit_List(self, node):
+        node = self.generic_visit(node)
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id="__array__", ctx=ast.Load()), args=[node], keywords=[]),
+            node,
+        )
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str):
+    """
+    Validates and compiles an expression. Results are cached, so repeated
+    expressions skip parsing and validation entirely.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid syntax: {e.msg}") from None
+    tree = ast.fix_missing_locations(_Validator().visit(tree))
+    return compile(tree, "<expression>", "eval")
+
+
+def evaluate(expression: str):
+    """Evaluates an expression and returns the raw result (number or array)."""
+    code = compile_expression(expression)
+    with np.errstate(all="ignore"):
+        return eval(code, {"__builtins__": {}}, ALLOWED_NAMES)
+
+
+def format_result(result) -> str:
+    if isinstance(result, np.ndarray):
+        if result.ndim == 0:
+            result = result.item()
+        else:
+            items = np.round(result, 6)
+            if result.ndim == 1 and len(result) > MAX_OUTPUT_ITEMS:
+                return f"{np.array2string(items[:MAX_OUTPUT_ITEMS], separator=', ')} ... ({len(result)} values)"
+            return np.array2string(items, separator=", ", threshold=MAX_OUTPUT_ITEMS * 4)
+    if isinstance(result, np.generic):
+        result = result.item()
+    return f"{result:.6f}" if isinstance(result, float) else str(result)
@@ -51,3 +51,66 @@ def add_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
     result_df['MACDh_12_26_9'] = hist
     
     return result_df
+
+def _panel_frames(prices: pd.DataFrame) -> dict:
+    """Indicator frames for (rows x tickers) prices with no gaps inside."""
+    panel = {'Close': prices}
+    panel['SMA_20'] = prices.rolling(window=20).mean()
+    panel['SMA_50'] = prices.rolling(window=50).mean()
+    panel['RSI_14'] = calculate_rsi(prices, window=14)
+
+    macd, signal, hist = calculate_macd(prices)
+    panel['MACD_12_26_9'] = macd
+    panel['MACDs_12_26_9'] = signal
+    panel['MACDh_12_26_9'] = hist
+    return panel
+
+def compute_indicator_panel(close: np.ndarray) -> dict:
+    """
+    Vectorized indicators for a whole universe at once.
+    Input is a (dates x tickers) close matrix; every output has the same shape
+    and uses the single-ticker column names (SMA_20, RSI_14, MACD_12_26_9, ...).
+
+    Each ticker's indicators are computed on its own bars only, exactly as
+    add_all_indicators would: tickers sharing the same calendar (the same
+    valid rows) are computed together on those rows, then scattered back.
+    Dates a ticker did not trade (e.g. weekends next to crypto) carry its
+    last value forward instead of feeding flat bars into the windows.
+
+    A mixed crypto/equity universe matches the single-ticker indicators:
+
+    >>> dates = pd.date_range("2024-01-01", periods=200)
+    >>> rng = np.random.default_rng(0)
+    >>> crypto = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates)))), index=dates)
+    >>> equity = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), index=dates)
+    >>> equity[dates.dayofweek >= 5] = np.nan
+    >>> panel = compute_indicator_panel(np.column_stack([crypto, equity]))
+    >>> checks = []
+    >>> for col, series in enumerate([crypto, equity]):
+    ...     single = add_all_indicators(pd.DataFrame({'y': series.dropna()}))
+    ...     rows = np.flatnonzero(series.notna().to_numpy())
+    ...     for name in ('SMA_20', 'SMA_50', 'RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9'):
+    ...         checks.append(np.allclose(panel[name][rows, col], single[name].to_numpy(), rtol=1e-4, equal_nan=True))
+    >>> all(checks)
+    True
+    """
+    values = np.asarray(close, dtype=np.float64)
+    valid = ~np.isnan(values)
+
+    calendars = {}  # valid-row mask -> ticker columns
+    for col in range(values.shape[1]):
+        calendars.setdefault(valid[:, col].tobytes(), []).append(col)
+
+    panel = {}
+    for cols in calendars.values():
+        rows = np.flatnonzero(valid[:, cols[0]])
+        if len(rows) == 0:
+            continue
+        frames = _panel_frames(pd.DataFrame(values[np.ix_(rows, cols)]))
+        for name, frame in frames.items():
+            if name not in panel:
+                panel[name] = np.full(values.shape, np.nan, dtype=np.float32)
+            panel[name][np.ix_(rows, cols)] = frame.to_numpy(dtype=np.float32)
+
+    # Carry each ticker's latest values over the dates only other tickers trade
+    return {name: pd.DataFrame(matrix).ffill().to_numpy(dtype=np.float32) for name, matrix in panel.items()}
@@ -0,0 +1,59 @@
+"""
+Job Runner
+Process-wide thread pool for heavy analysis work (price loads, forecasts).
+Jobs are keyed so concurrent sessions asking for the same work share one Future.
+Only running jobs are shared: a job is forgotten as soon as it finishes, so
+freshness is left to the cache layer the job reads through.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobRunner:
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs = {}  # key -> running Future
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs) -> Future:
+        """
+        Returns the running Future for `key`, or starts `fn(*args, **kwargs)`
+        if none is running. Finished results are never reused from here.
+        """
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None and not future.done():
+                return future
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._jobs[key] = future
+        # Registered outside the lock: a job that already finished runs its callback inline
+        future.add_done_callback(lambda f, k=key: self._finish(k, f))
+        return future
+
+    def get(self, key):
+        """Returns the running Future for `key` or None."""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _finish(self, key, future: Future):
+        with self._lock:
+            if self._jobs.get(key) is future:
+                del self._jobs[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Job {key} failed: {future.exception()}")
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_job_runner() -> JobRunner:
+    """Shared JobRunner for this process."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -1,35 +1,115 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
+import requests
+import config
 
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
 
-def fetch_price_data(ticker: str, period: str = "1y") -> pd.DataFrame:
+
+def _download_chart(ticker: str, period: str, interval: str = "1d") -> pd.DataFrame:
     """
-    Download historical prices and return Prophet-safe dataframe
+    Bars from a Yahoo-compatible chart endpoint at config.YAHOO_BASE_URL
+    (used to run against local stand-ins; production goes through yfinance).
+    Timestamps are returned in exchange-local wall time, like yfinance.
+    """
+    url = f"{config.YAHOO_BASE_URL.rstrip('/')}/v8/finance/chart/{ticker}"
+    r = requests.get(url, params={"range": period, "interval": interval}, timeout=10)
+    r.raise_for_status()
+    result = (r.json().get("chart", {}).get("result") or [{}])[0]
+    timestamps = result.get("timestamp") or []
+    if not timestamps:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    quote = result["indicators"]["quote"][0]
+    tz = result.get("meta", {}).get("exchangeTimezoneName") or "UTC"
+    index = pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(tz).tz_localize(None)
+    if interval.endswith(("d", "wk", "mo")):
+        index = index.normalize()
+    return pd.DataFrame({col: quote.get(col.lower()) for col in OHLCV_COLUMNS}, index=index)
+
+
+def fetch_ohlcv(ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+    """
+    Download historical bars once and return a compact OHLCV frame.
+    Intraday intervals (e.g. "5m") are limited by Yahoo to the last 60 days.
     Output:
-        ds (datetime)
-        y (float)
+        DatetimeIndex (tz-naive, exchange local time)
+        Open, High, Low, Close, Volume (float32)
     """
 
-    df = yf.download(ticker, period=period, progress=False)
+    if config.YAHOO_BASE_URL:
+        df = _download_chart(ticker, period, interval)
+    else:
+        df = yf.download(ticker, period=period, interval=interval, progress=False)
 
     # -------- FIX 1: flatten multi-index columns --------
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
 
-    df = df.reset_index()
+    if df.empty or "Close" not in df.columns:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
 
-    df.rename(
-        columns={
-            "Date": "ds",
-            "Close": "y"
-        },
-        inplace=True
-    )
-
-    # -------- FIX 2: ensure numeric --------
-    df["y"] = pd.to_numeric(df["y"], errors="coerce")
+    # -------- FIX 2: ensure numeric, compact dtype --------
+    columns = [c for c in OHLCV_COLUMNS if c in df.columns]
+    df = df[columns].apply(pd.to_numeric, errors="coerce").astype(np.float32)
 
     # -------- FIX 3: drop NaNs --------
-    df = df.dropna(subset=["y"])
+    df = df.dropna(subset=["Close"])
+
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = "Date"
+
+    return df
+
+
+def to_price_frame(ohlcv: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prophet-safe view of an OHLCV frame.
+    Output:
+        ds (datetime)
+        y (float, the Close)
+        Open, High, Low, Volume when available
+    """
+    if ohlcv.empty:
+        return pd.DataFrame(columns=["ds", "y"])
 
-    return df[["ds", "y"]]
+    data = {"ds": ohlcv.index.to_numpy(), "y": ohlcv["Close"].to_numpy()}
+    for col in ("Open", "High", "Low", "Volume"):
+        if col in ohlcv.columns:
+            data[col] = ohlcv[col].to_numpy()
+    return pd.DataFrame(data, copy=False)
+
+
+def fetch_price_data(ticker: str, period: str = "1y") -> pd.DataFrame:
+    """
+    Download historical prices and return Prophet-safe dataframe
+    Output:
+        ds (datetime)
+        y (float)
+        Open, High, Low, Volume (for candlestick / volume charts)
+    """
+    return to_price_frame(fetch_ohlcv(ticker, period=period))
+
+
+def load_universe():
+    """
+    Current memory-mapped universe matrix shared by all processes on the host,
+    or None if it has not been built yet.
+    """
+    from core.universe import open_universe  # core.universe imports this module
+    return open_universe(config.UNIVERSE_DIR)
+
+
+def load_universe_series(ticker: str, refresh_seconds: float = None):
+    """
+    Zero-copy PriceSeries for a ticker from the universe matrix.
+    Returns None when the ticker is not in it or, given `refresh_seconds`,
+    when newer bars than the matrix holds can exist (see UniverseMatrix.is_current).
+    """
+    universe = load_universe()
+    if universe is None or ticker not in universe:
+        return None
+    if refresh_seconds is not None and not universe.is_current(ticker, refresh_seconds):
+        return None
+    return universe.series(ticker)
@@ -0,0 +1,206 @@
+"""
+Market Calendar
+NYSE trading sessions (regular hours, weekends, exchange holidays including
+Good Friday, early closes) and 24/7 crypto, used to decide when cached market
+data can actually be stale. Each cache derives a `data_version` for a ticker
+that only changes when new data can exist: every `refresh_seconds` while the
+market is open, once after the close, and not at all overnight, on weekends
+or on holidays.
+Framework independent.
+"""
+
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+UTC = ZoneInfo("UTC")
+
+OPEN_TIME = time(9, 30)
+CLOSE_TIME = time(16, 0)
+EARLY_CLOSE_TIME = time(13, 0)
+
+# The final daily bar can take a few minutes to settle after the bell
+SETTLE = timedelta(minutes=15)
+
+
+def is_crypto(ticker: str) -> bool:
+    """Crypto pairs (BTC-USD, ETH-USD, ...) trade around the clock."""
+    return ticker.upper().endswith("-USD")
+
+
+# ---- holidays ----------------------------------------------------------
+
+def easter(year: int) -> date:
+    """Western (Gregorian) Easter Sunday, anonymous Gregorian algorithm."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=32)
+def nyse_holidays(year: int) -> frozenset:
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day on a Saturday is not made up on the Friday before
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+
+@lru_cache(maxsize=32)
+def nyse_early_closes(year: int) -> frozenset:
+    """1 pm closes: July 3rd, the day after Thanksgiving and Christmas Eve (on weekdays)."""
+    days = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    }
+    return frozenset(d for d in days if d.weekday() < 5 and d not in nyse_holidays(year))
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+
+def session(day: date):
+    """(open, close) as aware exchange-time datetimes, or None when closed all day."""
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE_TIME if day in nyse_early_closes(day.year) else CLOSE_TIME
+    return (
+        datetime.combine(day, OPEN_TIME, tzinfo=EXCHANGE_TZ),
+        datetime.combine(day, close, tzinfo=EXCHANGE_TZ),
+    )
+
+
+# ---- sessions ----------------------------------------------------------
+
+def _now(now: datetime = None) -> datetime:
+    return (now or datetime.now(UTC)).astimezone(EXCHANGE_TZ)
+
+
+def is_open(ticker: str = None, now: datetime = None) -> bool:
+    if ticker and is_crypto(ticker):
+        return True
+    now = _now(now)
+    hours = session(now.date())
+    return bool(hours) and hours[0] <= now < hours[1]
+
+
+def last_session(now: datetime = None):
+    """The most recent session that has opened (possibly the current one)."""
+    now = _now(now)
+    day = now.date()
+    for _ in range(15):
+        hours = session(day)
+        if hours and hours[0] <= now:
+            return hours
+        day -= timedelta(days=1)
+    raise ValueError(f"No NYSE session in the two weeks before {now}")
+
+
+def next_open(now: datetime = None) -> datetime:
+    """First session open strictly after `now`."""
+    now = _now(now)
+    day = now.date()
+    for _ in range(15):
+        hours = session(day)
+        if hours and hours[0] > now:
+            return hours[0]
+        day += timedelta(days=1)
+    raise ValueError(f"No NYSE session in the two weeks after {now}")
+
+
+def next_settle(now: datetime = None) -> datetime:
+    """First moment after `now` at which a session's final bar has settled (close + SETTLE)."""
+    now = _now(now)
+    day = now.date()
+    for _ in range(15):
+        hours = session(day)
+        if hours and hours[1] + SETTLE > now:
+            return hours[1] + SETTLE
+        day += timedelta(days=1)
+    raise ValueError(f"No NYSE session in the two weeks after {now}")
+
+
+# ---- cache freshness ---------------------------------------------------
+
+def data_version(ticker: str, refresh_seconds: float, now: datetime = None) -> str:
+    """
+    Identifier of the data that can exist for `ticker` at `now`. Equal
+    versions mean a cached result is still current; cached loaders take it
+    as an argument so they recompute exactly when it changes.
+    """
+    now = _now(now)
+    refresh = max(int(refresh_seconds), 1)
+    if is_crypto(ticker):
+        return f"24x7:{int(now.timestamp()) // refresh}"
+    opened, closed = last_session(now)
+    if now < closed + SETTLE:
+        return f"{opened.date()}:{int((now - opened).total_seconds()) // refresh}"
+    return f"{opened.date()}:closed"
+
+
+def expires_in(ticker: str, refresh_seconds: float, now: datetime = None) -> float:
+    """Seconds until `data_version` changes (at least 1)."""
+    now = _now(now)
+    refresh = max(int(refresh_seconds), 1)
+    if is_crypto(ticker):
+        return max(refresh - now.timestamp() % refresh, 1.0)
+    opened, closed = last_session(now)
+    if now < closed + SETTLE:
+        bucket = int((now - opened).total_seconds()) // refresh
+        boundary = min(opened + timedelta(seconds=(bucket + 1) * refresh), closed + SETTLE)
+    else:
+        boundary = next_open(now)
+    return max((boundary - now).total_seconds(), 1.0)
+
+
+def history_period(ticker: str, now: datetime = None) -> str:
+    """
+    Yahoo `period` that is sure to include the latest session: '1d' once
+    today's session has opened, otherwise '5d' (covers weekends and holidays).
+    """
+    if is_crypto(ticker):
+        return "1d"
+    now = _now(now)
+    opened, _ = last_session(now)
+    return "1d" if opened.date() == now.date() else "5d"
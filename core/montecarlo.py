@@ -0,0 +1,166 @@
+"""
+Monte Carlo Engine
+Simulates price paths (GBM or bootstrapped historical returns) in fixed-size
+chunks and reduces each chunk on the fly into per-day histograms and
+touch counts, so memory stays bounded no matter how many paths are run.
+The horizon is in calendar days like ForecastEngine's, simulated one step
+per trading session in it (every day for 24/7 crypto).
+Output is compatible with ui.charts.render_forecast_chart.
+Framework independent.
+"""
+
+import numpy as np
+import pandas as pd
+from core.market_calendar import is_crypto, is_trading_day
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MIN_DATA_POINTS = 30
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+class MonteCarloEngine:
+    def __init__(
+        self,
+        days: int = 30,
+        n_paths: int = 20000,
+        method: str = "gbm",
+        chunk_size: int = 2000,
+        n_bins: int = 1024,
+        seed: int = None,
+    ):
+        """
+        days: horizon in calendar days after the last bar, as for ForecastEngine.
+        method: "gbm" (lognormal with historical drift/volatility) or
+                "bootstrap" (resampled historical daily log returns).
+        chunk_size: paths held in memory at once; peak memory is roughly
+                    chunk_size * days * 8 bytes plus days * n_bins counters.
+        """
+        if method not in ("gbm", "bootstrap"):
+            raise ValueError(f"Unknown method '{method}'")
+        self.days = days
+        self.n_paths = n_paths
+        self.method = method
+        self.chunk_size = chunk_size
+        self.n_bins = n_bins
+        self.seed = seed
+
+    def _log_returns(self, df: pd.DataFrame) -> np.ndarray:
+        prices = pd.to_numeric(df['y'], errors='coerce').dropna().to_numpy(dtype=float)
+        prices = prices[prices > 0]
+        return np.diff(np.log(prices))
+
+    def horizon_dates(self, last, ticker: str = None) -> pd.DatetimeIndex:
+        """
+        Sessions in the `days` calendar days after `last`: NYSE trading days
+        (weekends and exchange holidays skipped), or every day for crypto,
+        matching the bars the historical returns were measured on.
+        """
+        last = pd.Timestamp(last).normalize()
+        dates = pd.date_range(last + pd.Timedelta(days=1), last + pd.Timedelta(days=self.days), freq="D")
+        if ticker and is_crypto(ticker):
+            return dates
+        return dates[[is_trading_day(d.date()) for d in dates]]
+
+    def simulate(self, df: pd.DataFrame, touch_levels=None, ticker: str = None) -> dict:
+        """
+        `ticker` picks the session calendar (crypto trades every day).
+
+        Returns:
+            forecast: DataFrame with ds, yhat (median), yhat_lower / yhat_upper
+                      (5th / 95th percentile) and p5..p95 columns
+            touch: {level: probability the price trades through level within the horizon}
+            paths: number of simulated paths
+        """
+        if df.empty or 'y' not in df.columns:
+            return {'forecast': pd.DataFrame(), 'touch': {}, 'paths': 0}
+
+        log_rets = self._log_returns(df)
+        if len(log_rets) < MIN_DATA_POINTS:
+            logger.warning(f"Not enough data points for Monte Carlo. Need {MIN_DATA_POINTS}, got {len(log_rets)}")
+            return {'forecast': pd.DataFrame(), 'touch': {}, 'paths': 0}
+
+        dates = self.horizon_dates(pd.to_datetime(df['ds'].iloc[-1]), ticker)
+        n_steps = len(dates)
+        if n_steps == 0:
+            return {'forecast': pd.DataFrame(), 'touch': {}, 'paths': 0}
+
+        logger.info(f"Running {self.n_paths} {self.method} Monte Carlo paths over {n_steps} sessions...")
+        rng = np.random.default_rng(self.seed)
+        s0 = float(df['y'].iloc[-1])
+        log_s0 = np.log(s0)
+        mu, sigma = log_rets.mean(), log_rets.std(ddof=1)
+        levels = np.asarray(sorted(touch_levels or []), dtype=float)
+
+        # Fixed log-price grid wide enough for +/- 8 sigma at the horizon; outliers land in the edge bins
+        spread = 8 * max(sigma, 1e-6) * np.sqrt(n_steps) + abs(mu) * n_steps
+        edges = np.linspace(log_s0 - spread, log_s0 + spread, self.n_bins + 1)
+        counts = np.zeros((n_steps, self.n_bins), dtype=np.int64)
+        touched = np.zeros(len(levels), dtype=np.int64)
+        day_offsets = np.arange(n_steps) * self.n_bins  # Row offsets into the flattened histogram
+
+        done = 0
+        while done < self.n_paths:
+            size = min(self.chunk_size, self.n_paths - done)
+            if self.method == "gbm":
+                steps = rng.normal(mu, sigma, size=(size, n_steps))
+            else:
+                steps = log_rets[rng.integers(0, len(log_rets), size=(size, n_steps))]
+            log_paths = log_s0 + np.cumsum(steps, axis=1)
+
+            # Reduce the chunk: per-day histogram of log prices
+            bins = np.clip(np.searchsorted(edges, log_paths, side="right") - 1, 0, self.n_bins - 1)
+            flat = (day_offsets + bins).ravel()
+            counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+
+            if len(levels):
+                log_levels = np.log(levels)
+                path_max = log_paths.max(axis=1)[:, None]
+                path_min = log_paths.min(axis=1)[:, None]
+                above = log_levels >= log_s0
+                hit = np.where(above, path_max >= log_levels, path_min <= log_levels)
+                touched += hit.sum(axis=0)
+
+            done += size
+
+        quantiles = self._quantiles(counts, edges, done)
+
+        forecast = pd.DataFrame({'ds': dates})
+        for p in PERCENTILES:
+            forecast[f'p{p}'] = np.exp(quantiles[p])
+        forecast['yhat'] = forecast['p50']
+        forecast['yhat_lower'] = forecast['p5']
+        forecast['yhat_upper'] = forecast['p95']
+
+        touch = {float(level): float(count / done) for level, count in zip(levels, touched)}
+        logger.info("Monte Carlo simulation finished.")
+        return {'forecast': forecast, 'touch': touch, 'paths': done}
+
+    def _quantiles(self, counts: np.ndarray, edges: np.ndarray, total: int) -> dict:
+        """Percentiles per day from the histograms, interpolated inside the bin."""
+        cdf = np.cumsum(counts, axis=1)
+        result = {}
+        for p in PERCENTILES:
+            target = total * p / 100
+            idx = np.minimum((cdf < target).sum(axis=1), self.n_bins - 1)
+            rows = np.arange(len(cdf))
+            below = np.where(idx > 0, cdf[rows, idx - 1], 0)
+            in_bin = np.maximum(counts[rows, idx], 1)
+            frac = np.clip((target - below) / in_bin, 0, 1)
+            result[p] = edges[idx] + frac * (edges[idx + 1] - edges[idx])
+        return result
+
+    def simulate_many(self, frames: dict, touch_pct=(0.05, 0.10)) -> dict:
+        """
+        Runs simulate() for {ticker: price frame}. Touch levels are set at
+        +/- each percentage of the latest price.
+        """
+        results = {}
+        for ticker, df in frames.items():
+            if df is None or df.empty:
+                continue
+            last = float(df['y'].iloc[-1])
+            levels = [last * (1 + p) for p in touch_pct] + [last * (1 - p) for p in touch_pct]
+            results[ticker] = self.simulate(df, touch_levels=levels, ticker=ticker)
+        return results
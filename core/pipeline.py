@@ -0,0 +1,339 @@
+"""
+Analysis Pipeline
+Cached entry points shared by the UI pages and the background prefetcher.
+Every caller goes through these functions so they all hit the same caches.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import streamlit as st
+from core.forecast import ForecastEngine
+from core.montecarlo import MonteCarloEngine
+from core.tuning import ForecastTuner
+from core.market import fetch_ohlcv, to_price_frame, load_universe, load_universe_series
+from core.resample import TimeframeBook, TIMEFRAMES
+from core.universe import build_universe_matrix, build_lock
+from core.indicators import add_all_indicators
+from core.sentiment import SentimentEngine
+from core.optimizer import backtest_sma_strategy
+from core.series import PriceSeries
+from core.cache import cached
+from core.market_calendar import EXCHANGE_TZ, data_version, expires_in, is_crypto
+from core.logger import get_logger
+from services.trade_stream import get_trade_stream
+from services.analysis_api import get_api_client
+from db import sqlite as db
+import config
+
+logger = get_logger(__name__)
+
+# Default "Advanced Tuning" values of the Analysis page
+DEFAULT_FORECAST_SETTINGS = {
+    "days": 30,
+    "mode": "additive",
+    "scale": 0.05,
+    "daily": True,
+    "weekly": True,
+    "yearly": True,
+}
+
+# History length stored in the shared universe matrix
+UNIVERSE_PERIOD = "1y"
+
+# Timeframes offered on the Analysis page. Intraday ones are derived from a
+# single 5m download (Yahoo keeps 60 days of it), daily and weekly ones from
+# the daily history.
+INTRADAY_TIMEFRAMES = ("5m", "15m", "1h")
+DAILY_TIMEFRAMES = ("1d", "1w")
+INTRADAY_PERIOD = "60d"
+
+# Price-shaped results are cached as PriceSeries with st.cache_resource:
+# one shared read-only copy per process, no pickling or copying on a hit.
+# The public loaders hand out zero-copy DataFrame views of them.
+# Below that, @cached shares results between processes and replicas
+# through the configured result cache (core/cache.py).
+#
+# Freshness follows the market calendar: cached loaders take a `version`
+# (core/market_calendar.data_version) that changes only when new data can
+# exist, so nothing is refetched overnight, on weekends or on holidays.
+# The local TTL only drops versions nobody asks for anymore.
+LOCAL_CACHE_SECONDS = 24 * 3600
+LOCAL_CACHE_ENTRIES = 1000
+
+
+def market_version(t) -> str:
+    return data_version(t, config.MARKET_DATA_REFRESH_SECONDS)
+
+def _market_ttl(t, *args, **kwargs) -> float:
+    return expires_in(t, config.MARKET_DATA_REFRESH_SECONDS)
+
+def _forecast_ttl(t, *args, **kwargs) -> float:
+    return expires_in(t, config.FORECAST_REFRESH_SECONDS)
+
+@st.cache_resource(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+@cached("market", ttl=_market_ttl)
+def load_ohlcv_series(t, period="1y", version=None) -> PriceSeries:
+    """
+    The one network download per ticker. Everything else is derived from it.
+    Tickers in a current universe matrix are read from the shared map instead.
+    """
+    try:
+        if period == UNIVERSE_PERIOD:
+            shared = load_universe_series(t, refresh_seconds=config.MARKET_DATA_REFRESH_SECONDS)
+            if shared is not None and len(shared):
+                return shared
+        if config.API_BASE_URL:
+            return get_api_client().ohlcv(t, period)
+        return PriceSeries.from_frame(fetch_ohlcv(t, period=period))
+    except Exception as e:
+        logger.error(f"Error downloading {t}: {e}")
+        return PriceSeries.empty()
+
+def load_ohlcv(t, period="1y") -> pd.DataFrame:
+    """OHLCV frame on a DatetimeIndex."""
+    return load_ohlcv_series(t, period, market_version(t)).to_frame(date_column=None)
+
+@st.cache_resource(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+@cached("market", ttl=_market_ttl)
+def load_market_series(t, version=None) -> PriceSeries:
+    try:
+        if config.API_BASE_URL:
+            return get_api_client().market_data(t)
+        df = to_price_frame(load_ohlcv(t))
+        if not df.empty:
+            df = add_all_indicators(df)
+        return PriceSeries.from_frame(df)
+    except Exception as e:
+        logger.error(f"Error loading market data for {t}: {e}")
+        return PriceSeries.empty()
+
+def load_market_data(t) -> pd.DataFrame:
+    """Prices (ds, y, OHLV) plus indicator columns."""
+    return load_market_series(t, market_version(t)).to_frame()
+
+def exchange_timezone(t) -> str:
+    """Wall-clock timezone bars are bucketed in (crypto trades around the clock in UTC)."""
+    return "UTC" if is_crypto(t) else EXCHANGE_TZ.key
+
+@st.cache_resource(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+def load_intraday_book(t, version=None) -> TimeframeBook:
+    """
+    One 5m download per ticker, aggregated into every intraday timeframe.
+    The book is shared and later extended in place from the trade stream.
+    """
+    book = TimeframeBook(INTRADAY_TIMEFRAMES)
+    try:
+        bars = fetch_ohlcv(t, period=INTRADAY_PERIOD, interval=INTRADAY_TIMEFRAMES[0])
+        if not bars.empty:
+            # The newest bar may still be forming; the book never revises a bar
+            now = pd.Timestamp.now(tz=exchange_timezone(t)).tz_localize(None)
+            width = pd.Timedelta(TIMEFRAMES[INTRADAY_TIMEFRAMES[0]], unit="ns")
+            bars = bars[bars.index + width <= now]
+        book.update(bars)
+    except Exception as e:
+        logger.error(f"Error downloading intraday bars for {t}: {e}")
+    return book
+
+@st.cache_resource(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+def load_daily_book(t, version=None) -> TimeframeBook:
+    book = TimeframeBook(DAILY_TIMEFRAMES)
+    try:
+        book.update(load_ohlcv(t))
+    except Exception as e:
+        logger.error(f"Error aggregating daily bars for {t}: {e}")
+    return book
+
+def sync_stream_bars(t, book: TimeframeBook) -> int:
+    """Folds the stream's closed 1-minute bars into an intraday book."""
+    if not config.TRADE_STREAM_ENABLED:
+        return 0
+    bars = get_trade_stream().minute_bars(t)
+    if bars.empty:
+        return 0
+    # The current minute is still open
+    bars = bars[bars.index < pd.Timestamp.now(tz="UTC").tz_localize(None).floor("min")]
+    bars.index = bars.index.tz_localize("UTC").tz_convert(exchange_timezone(t)).tz_localize(None)
+    return book.update(bars)
+
+def load_bars(t, timeframe="1d") -> pd.DataFrame:
+    """OHLCV bars of any supported timeframe, without a download per timeframe."""
+    if timeframe in INTRADAY_TIMEFRAMES:
+        book = load_intraday_book(t, market_version(t))
+        sync_stream_bars(t, book)
+        return book.bars(timeframe)
+    if timeframe in DAILY_TIMEFRAMES:
+        return load_daily_book(t, market_version(t)).bars(timeframe)
+    raise ValueError(f"Unsupported timeframe '{timeframe}'")
+
+def load_timeframe_data(t, timeframe="1d") -> pd.DataFrame:
+    """Prices plus indicator columns (like load_market_data) for a timeframe."""
+    if timeframe == "1d":
+        return load_market_data(t)
+    try:
+        df = to_price_frame(load_bars(t, timeframe))
+        return add_all_indicators(df) if not df.empty else df
+    except Exception as e:
+        logger.error(f"Error loading {timeframe} data for {t}: {e}")
+        return pd.DataFrame(columns=["ds", "y"])
+
+@st.cache_resource(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+@cached("forecast", ttl=_forecast_ttl)
+def load_forecast_series(t, days, mode, scale, daily, weekly, yearly, version=None) -> PriceSeries:
+    try:
+        if config.API_BASE_URL:
+            return get_api_client().forecast(t, days, mode, scale, daily, weekly, yearly)
+        engine = ForecastEngine(
+            days=days,
+            seasonality_mode=mode,
+            changepoint_prior_scale=scale,
+            daily_seasonality=daily,
+            weekly_seasonality=weekly,
+            yearly_seasonality=yearly
+        )
+        return PriceSeries.from_frame(engine.predict(load_market_data(t)))
+    except Exception as e:
+        logger.error(f"Forecast generation error: {e}")
+        return PriceSeries.empty()
+
+def generate_forecast(t, days, mode, scale, daily, weekly, yearly) -> pd.DataFrame:
+    """Prophet forecast (ds, yhat, yhat_lower, yhat_upper) for a ticker."""
+    version = data_version(t, config.FORECAST_REFRESH_SECONDS)
+    return load_forecast_series(t, days, mode, scale, daily, weekly, yearly, version).to_frame()
+
+def get_tuned_params(t) -> dict:
+    """
+    Best ForecastEngine params for a ticker. Served from the tuning cache
+    while fresh, otherwise found by a bounded-time cross-validated search.
+    A search that finds nothing is cached too, as {} (use the defaults),
+    so it is not rerun before TUNING_TTL_HOURS.
+    """
+    try:
+        params = db.get_tuned_params(t, max_age_hours=config.TUNING_TTL_HOURS)
+        if params is not None:
+            return params
+    except Exception as e:
+        logger.error(f"Could not read tuned params for {t}: {e}")
+
+    result = ForecastTuner(time_budget=config.TUNING_TIME_BUDGET).tune(load_market_data(t))
+    params, score = (result['params'], result['score']) if result else ({}, None)
+    try:
+        db.save_tuned_params(t, params, score)
+    except Exception as e:
+        logger.error(f"Could not save tuned params for {t}: {e}")
+    return params
+
+def generate_tuned_forecast(t, days) -> pd.DataFrame:
+    """Forecast with auto-tuned params (falls back to the defaults)."""
+    params = get_tuned_params(t)
+    s = DEFAULT_FORECAST_SETTINGS
+    return generate_forecast(
+        t, days,
+        params.get("seasonality_mode", s["mode"]),
+        params.get("changepoint_prior_scale", s["scale"]),
+        params.get("daily_seasonality", s["daily"]),
+        params.get("weekly_seasonality", s["weekly"]),
+        params.get("yearly_seasonality", s["yearly"]),
+    )
+
+def generate_monte_carlo(t, days, method="gbm", n_paths=20000, touch_pct=(0.05, 0.10)) -> dict:
+    """
+    Monte Carlo fan chart and touch probabilities for a ticker.
+    Touch levels sit at +/- each percentage of the latest close.
+    """
+    return load_monte_carlo(t, days, method, n_paths, tuple(touch_pct), market_version(t))
+
+@st.cache_data(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+def load_monte_carlo(t, days, method, n_paths, touch_pct, version=None) -> dict:
+    try:
+        engine = MonteCarloEngine(days=days, n_paths=n_paths, method=method)
+        return engine.simulate_many({t: load_market_data(t)}, touch_pct=touch_pct).get(t, {})
+    except Exception as e:
+        logger.error(f"Monte Carlo error for {t}: {e}")
+        return {}
+
+@st.cache_data(ttl=3600)
+def load_sentiment(ticker):
+    """
+    Cached wrapper around SentimentEngine.analyze.
+    Returns (score, label, detailed).
+    News is published around the clock, so this keeps a flat TTL.
+    """
+    if config.API_BASE_URL:
+        try:
+            return get_api_client().sentiment(ticker)
+        except Exception as e:
+            logger.error(f"Sentiment API error for {ticker}: {e}")
+            return 0, f"Error: {e}", []
+    return SentimentEngine().analyze(ticker)
+
+def run_sma_backtest(t) -> dict:
+    """
+    SMA crossover backtest over the cached price history.
+    Adds the buy-and-hold return over the same period for comparison.
+    """
+    return load_sma_backtest(t, market_version(t))
+
+@st.cache_data(ttl=LOCAL_CACHE_SECONDS, max_entries=LOCAL_CACHE_ENTRIES)
+def load_sma_backtest(t, version=None) -> dict:
+    try:
+        if config.API_BASE_URL:
+            return get_api_client().backtest(t)
+        # The backtest aligns signals positionally, so hand it a plain RangeIndex
+        ohlcv = load_ohlcv(t).reset_index(drop=True)
+        result = backtest_sma_strategy(ohlcv)
+        if result:
+            close = ohlcv['Close']
+            result['buy_hold_return'] = float(close.iloc[-1] / close.iloc[0] - 1)
+        return result
+    except Exception as e:
+        logger.error(f"Backtest error for {t}: {e}")
+        return {}
+
+def warm_ticker(ticker: str, sentiment: bool = True):
+    """
+    Runs the default Analysis page workload for a ticker so the next
+    user request is served from cache.
+    """
+    df = load_market_data(ticker)
+    if df is None or df.empty:
+        logger.warning(f"Prefetch skipped {ticker}: no market data")
+        return
+
+    s = DEFAULT_FORECAST_SETTINGS
+    generate_forecast(ticker, s["days"], s["mode"], s["scale"], s["daily"], s["weekly"], s["yearly"])
+
+    if sentiment and config.FINNHUB_API_KEY:
+        load_sentiment(ticker)
+
+def refresh_universe(tickers: list, force: bool = False):
+    """
+    Rebuilds the shared memory-mapped universe matrix from fresh downloads.
+    Runs once per host: other processes skip while one holds the build lock,
+    and the build is skipped when the current matrix already has every
+    ticker and the latest settled session (unless `force`).
+    """
+    with build_lock(config.UNIVERSE_DIR) as acquired:
+        if not acquired:
+            logger.info("Universe build already running in another process")
+            return
+        universe = load_universe()
+        if (not force and universe is not None and set(tickers) <= set(universe.tickers)
+                and universe.is_current(refresh_seconds=config.MARKET_DATA_REFRESH_SECONDS)):
+            logger.info(f"Universe {universe.version} is current, skipping rebuild")
+            return
+
+        started = time.time()
+        frames = {}
+        with ThreadPoolExecutor(max_workers=config.UNIVERSE_DOWNLOAD_WORKERS) as pool:
+            futures = {pool.submit(fetch_ohlcv, t, period=UNIVERSE_PERIOD): t for t in tickers}
+            for future in as_completed(futures):
+                t = futures[future]
+                try:
+                    frames[t] = future.result()
+                except Exception as e:
+                    logger.error(f"Universe download failed for {t}: {e}")
+        try:
+            build_universe_matrix(frames, root=config.UNIVERSE_DIR, as_of=started)
+        except Exception as e:
+            logger.error(f"Universe build failed: {e}")
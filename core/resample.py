@@ -0,0 +1,163 @@
+"""
+Bar Resampling
+Multi-timeframe OHLCV bars derived from one stored granularity.
+A TimeframeBook keeps one aggregator per timeframe; new finer bars (e.g. 1m
+bars from the trade stream or a fresh 5m download) are folded into every
+timeframe incrementally, merging into the still-open last bucket instead of
+re-aggregating history. Charts and indicators can then ask for any timeframe
+without another download.
+Framework independent.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+MINUTE_NS = 60 * 1_000_000_000
+DAY_NS = 24 * 60 * MINUTE_NS
+
+# Bucket width in nanoseconds, finest first
+TIMEFRAMES = {
+    "1m": MINUTE_NS,
+    "5m": 5 * MINUTE_NS,
+    "15m": 15 * MINUTE_NS,
+    "1h": 60 * MINUTE_NS,
+    "1d": DAY_NS,
+    "1w": 7 * DAY_NS,
+}
+
+OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+# 1970-01-01 was a Thursday; shift so weekly buckets start on Monday
+_WEEK_OFFSET_NS = 3 * DAY_NS
+
+
+def bucket_start(dates_ns: np.ndarray, timeframe: str) -> np.ndarray:
+    """Start of the bucket each timestamp falls in (int64 epoch ns, naive wall time)."""
+    width = TIMEFRAMES[timeframe]
+    if timeframe == "1w":
+        return (dates_ns + _WEEK_OFFSET_NS) // width * width - _WEEK_OFFSET_NS
+    return dates_ns // width * width
+
+
+class BarAggregator:
+    """
+    Bars of one timeframe in growable arrays. `update` accepts finer bars in
+    time order; a bar that lands in the last (open) bucket is merged into it.
+    """
+
+    def __init__(self, timeframe: str, capacity: int = 1024):
+        self.timeframe = timeframe
+        self.dates = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity, 5), dtype=np.float64)
+        self.size = 0
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        if needed <= len(self.dates):
+            return
+        capacity = max(needed, 2 * len(self.dates))
+        dates = np.empty(capacity, dtype=np.int64)
+        values = np.empty((capacity, 5), dtype=np.float64)
+        dates[:self.size] = self.dates[:self.size]
+        values[:self.size] = self.values[:self.size]
+        self.dates, self.values = dates, values
+
+    def update(self, dates_ns: np.ndarray, values: np.ndarray):
+        """
+        dates_ns: sorted int64 bar start times of the finer input bars.
+        values: (n x 5) open, high, low, close, volume.
+        """
+        if len(dates_ns) == 0:
+            return
+        keys = bucket_start(dates_ns, self.timeframe)
+
+        # Rows that still belong to the currently open bucket
+        if self.size:
+            last_key = self.dates[self.size - 1]
+            same = int(np.searchsorted(keys, last_key, side="right"))
+            if same:
+                chunk = values[:same]
+                bar = self.values[self.size - 1]
+                bar[1] = max(bar[1], chunk[:, 1].max())
+                bar[2] = min(bar[2], chunk[:, 2].min())
+                bar[3] = chunk[-1, 3]
+                bar[4] += chunk[:, 4].sum()
+                keys, values = keys[same:], values[same:]
+            if len(keys) == 0:
+                return
+
+        # New buckets, aggregated in one vectorized pass
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)] - 1
+        n = len(starts)
+        self._reserve(n)
+        out = self.values[self.size:self.size + n]
+        out[:, 0] = values[starts, 0]
+        out[:, 1] = np.maximum.reduceat(values[:, 1], starts)
+        out[:, 2] = np.minimum.reduceat(values[:, 2], starts)
+        out[:, 3] = values[ends, 3]
+        out[:, 4] = np.add.reduceat(values[:, 4], starts)
+        self.dates[self.size:self.size + n] = keys[starts]
+        self.size += n
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(
+            self.values[:self.size].copy(), columns=list(OHLCV),
+            index=pd.DatetimeIndex(self.dates[:self.size].view("datetime64[ns]"), name="Date"),
+        )
+        return df
+
+
+class TimeframeBook:
+    def __init__(self, timeframes=("5m", "15m", "1h", "1d", "1w")):
+        """
+        timeframes: the timeframes to maintain. Input bars must be at least
+        as fine as the finest of them.
+        """
+        self.timeframes = tuple(sorted(timeframes, key=TIMEFRAMES.get))
+        self._aggregators = {tf: BarAggregator(tf) for tf in self.timeframes}
+        self.last_time = None  # Start of the newest input bar (epoch ns)
+        self._lock = threading.Lock()
+
+    def update(self, bars: pd.DataFrame) -> int:
+        """
+        Folds OHLCV bars (DatetimeIndex) into every timeframe. Bars at or
+        before the newest one already seen are skipped, so feeding
+        overlapping batches is safe. Only pass closed bars: a bar is merged
+        once and never revised. Returns the number of bars added.
+        """
+        if bars is None or bars.empty:
+            return 0
+        dates = bars.index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        values = bars[list(OHLCV)].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values[:, 3])
+        dates, values = dates[valid], values[valid]
+        values[:, 4] = np.nan_to_num(values[:, 4])
+
+        with self._lock:
+            if self.last_time is not None:
+                fresh = dates > self.last_time
+                dates, values = dates[fresh], values[fresh]
+            if len(dates) == 0:
+                return 0
+            for aggregator in self._aggregators.values():
+                aggregator.update(dates, values)
+            self.last_time = int(dates[-1])
+        return len(dates)
+
+    def bars(self, timeframe: str) -> pd.DataFrame:
+        if timeframe not in self._aggregators:
+            raise ValueError(f"Timeframe '{timeframe}' is not kept by this book ({', '.join(self.timeframes)})")
+        with self._lock:
+            return self._aggregators[timeframe].to_frame()
+
+    def __len__(self) -> int:
+        return self._aggregators[self.timeframes[0]].size
+
+
+def resample_ohlcv(bars: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """One-off resample of OHLCV bars to a coarser timeframe."""
+    book = TimeframeBook((timeframe,))
+    book.update(bars)
+    return book.bars(timeframe)
@@ -0,0 +1,124 @@
+"""
+Response Cache
+Caches assistant answers to standalone questions so repeated prompts
+("What's AAPL's price?", "Explain RSI") skip the LLM round trip.
+Entries are keyed on the normalized prompt; answers that used live-data
+tools expire quickly, general explanations live much longer. Near-duplicate
+prompts can be matched with a small local hashed n-gram embedding, but only
+when their tickers and numbers are identical.
+Framework independent.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Tools whose output goes stale quickly
+LIVE_DATA_TOOLS = {
+    "get_stock_price", "duckduckgo_search", "search_tool",
+    "analyze_technicals", "forecast_price", "news_sentiment", "backtest_sma",
+    "optimize_portfolio",
+}
+
+LIVE_TTL_SECONDS = 60
+STATIC_TTL_SECONDS = 24 * 3600
+EMBEDDING_DIM = 512
+SIMILARITY_THRESHOLD = 0.92
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercases, strips punctuation (but keeps tickers like BTC-USD) and collapses whitespace."""
+    text = prompt.lower().strip()
+    text = re.sub(r"[^\w\s\-\.$%]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def embed(text: str) -> np.ndarray:
+    """
+    Hashed character-trigram + word embedding, L2-normalised.
+    Cheap, deterministic and good enough to catch rephrasings and typos.
+    """
+    vec = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    padded = f"  {text}  "
+    features = [padded[i:i + 3] for i in range(len(padded) - 2)] + text.split()
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        vec[h % EMBEDDING_DIM] += 1.0 if (h >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _tickers(text: str) -> set:
+    """
+    Symbol-like tokens (AAPL, $aapl, btc-usd), upper-cased; answers about
+    different tickers never match.
+    """
+    symbols = re.findall(r"\b[A-Z]{1,5}(?:-[A-Z]{3})?\b", text)
+    symbols += re.findall(r"\$([A-Za-z]{1,5})\b", text)
+    symbols += re.findall(r"\b([A-Za-z]{1,5}-[A-Za-z]{3})\b", text)
+    return {symbol.upper() for symbol in symbols}
+
+
+def _numbers(text: str) -> tuple:
+    """Numeric tokens in order ("1,000 at 5%" -> ("1000", "5")); they must match exactly."""
+    return tuple(re.findall(r"\d+(?:\.\d+)?", text.replace(",", "")))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1000, similarity: bool = True):
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries = OrderedDict()  # key -> dict(answer, expires, vector, tickers, numbers)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ttl_for(tools_used) -> int:
+        return LIVE_TTL_SECONDS if LIVE_DATA_TOOLS & set(tools_used or []) else STATIC_TTL_SECONDS
+
+    def get(self, prompt: str):
+        """Returns a cached answer or None."""
+        key = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires"] > now:
+                self._entries.move_to_end(key)
+                return entry["answer"]
+            if entry:
+                del self._entries[key]
+
+            if not self.similarity or not self._entries:
+                return None
+
+            # Nearest neighbour over live entries with the same tickers and
+            # numbers: "$1000 at 5% for 20 years" embeds almost exactly like
+            # "... for 10 years" but needs a different answer
+            tickers = _tickers(prompt)
+            numbers = _numbers(prompt)
+            vector = embed(key)
+            best, best_score = None, SIMILARITY_THRESHOLD
+            for k, e in self._entries.items():
+                if e["expires"] <= now or e["tickers"] != tickers or e["numbers"] != numbers:
+                    continue
+                score = float(vector @ e["vector"])
+                if score >= best_score:
+                    best, best_score = k, score
+            return self._entries[best]["answer"] if best else None
+
+    def put(self, prompt: str, answer: str, tools_used=None):
+        key = normalize_prompt(prompt)
+        with self._lock:
+            self._entries[key] = {
+                "answer": answer,
+                "expires": time.time() + self.ttl_for(tools_used),
+                "vector": embed(key),
+                "tickers": _tickers(prompt),
+                "numbers": _numbers(prompt),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,201 @@
+"""
+Prefetch Scheduler
+Background thread that warms the shared caches for the most requested tickers
+ahead of market open, so the 9:30 rush is served from cache. The other
+periodic jobs (universe rebuilds, chat maintenance) share its thread
+lifecycle through BackgroundScheduler.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from core.logger import get_logger
+from core.market_calendar import EXCHANGE_TZ, is_trading_day, next_settle
+import config
+
+logger = get_logger(__name__)
+
+
+def rank_tickers(top_n: int = None, lookback_days: int = None) -> list:
+    """
+    Ranks tickers by recent search frequency from `user_searches`,
+    then fills up with the quick-select list. Duplicates are removed.
+    """
+    top_n = top_n or config.PREFETCH_TOP_N
+    lookback_days = lookback_days or config.PREFETCH_LOOKBACK_DAYS
+
+    ranked = []
+    try:
+        from db.sqlite import get_popular_tickers
+        ranked = get_popular_tickers(days=lookback_days, limit=top_n)
+    except Exception as e:
+        logger.error(f"Could not read search history: {e}")
+
+    for t in config.TOP_STOCKS:
+        if t not in ranked:
+            ranked.append(t)
+
+    return ranked[:max(top_n, len(config.TOP_STOCKS))]
+
+
+def parse_tickers(text: str) -> list:
+    """Tickers from one-per-line or comma separated text; '#' starts a comment. Order kept, duplicates dropped."""
+    tickers = []
+    for line in text.splitlines():
+        tickers.extend(line.split("#", 1)[0].replace(",", " ").split())
+    return list(dict.fromkeys(t.upper() for t in tickers))
+
+
+def universe_tickers() -> list:
+    """
+    Every ticker the shared universe matrix (and so the screener) covers:
+    config.UNIVERSE_TICKERS_FILE and config.UNIVERSE_TICKERS, then any
+    ranked prefetch ticker not listed there.
+    """
+    text = config.UNIVERSE_TICKERS
+    if config.UNIVERSE_TICKERS_FILE:
+        try:
+            with open(config.UNIVERSE_TICKERS_FILE, encoding="utf-8") as f:
+                text = f.read() + "\n" + text
+        except OSError as e:
+            logger.error(f"Could not read universe tickers from {config.UNIVERSE_TICKERS_FILE}: {e}")
+    return list(dict.fromkeys(parse_tickers(text) + rank_tickers()))
+
+
+def next_run_time(now: datetime = None, run_at: str = None) -> datetime:
+    """
+    Next trading-day occurrence of `run_at` (HH:MM, exchange local time).
+    """
+    run_at = run_at or config.PREFETCH_TIME
+    hour, minute = (int(x) for x in run_at.split(":"))
+    now = now or datetime.now(EXCHANGE_TZ)
+
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while not is_trading_day(candidate.date()):  # Skip weekends and exchange holidays
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class BackgroundScheduler:
+    """
+    Daemon thread that calls `run_once()` at each time `next_run()` returns,
+    and once on start when `run_on_start` is set. Failures are logged and
+    the next run happens as scheduled. Subclasses implement both hooks.
+    """
+
+    def __init__(self, name: str, run_on_start: bool = False):
+        self.name = name
+        self.run_on_start = run_on_start
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_run(self) -> datetime:
+        raise NotImplementedError
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"{self.name} started.")
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            logger.error(f"{self.name} run failed: {e}")
+
+    def _loop(self):
+        if self.run_on_start:
+            self._run()
+
+        while not self._stop.is_set():
+            wait = (self.next_run() - datetime.now(EXCHANGE_TZ)).total_seconds()
+            if self._stop.wait(max(wait, 0)):
+                break
+            self._run()
+
+
+class PrefetchScheduler(BackgroundScheduler):
+    def __init__(self, warm_fn, rank_fn=rank_tickers, prepare_fn=None, run_on_start: bool = True):
+        """
+        warm_fn: callable(ticker) that populates the caches for one ticker.
+        rank_fn: callable() returning the tickers to warm, most important first.
+        prepare_fn: optional callable(tickers) run once before the per-ticker warm-up.
+        """
+        super().__init__("prefetch-scheduler", run_on_start)
+        self.warm_fn = warm_fn
+        self.rank_fn = rank_fn
+        self.prepare_fn = prepare_fn
+
+    def next_run(self) -> datetime:
+        target = next_run_time()
+        logger.info(f"Next prefetch at {target.isoformat()}")
+        return target
+
+    def run_once(self):
+        """
+        Warms every ranked ticker sequentially. Failures never stop the run.
+        """
+        tickers = self.rank_fn()
+        logger.info(f"Prefetching {len(tickers)} tickers: {', '.join(tickers)}")
+        started = time.monotonic()
+
+        if self.prepare_fn:
+            try:
+                self.prepare_fn(tickers)
+            except Exception as e:
+                logger.error(f"Prefetch preparation failed: {e}")
+
+        for ticker in tickers:
+            if self._stop.is_set():
+                break
+            try:
+                self.warm_fn(ticker)
+            except Exception as e:
+                logger.error(f"Prefetch failed for {ticker}: {e}")
+
+        logger.info(f"Prefetch finished in {time.monotonic() - started:.1f}s")
+
+
+class SessionCloseScheduler(BackgroundScheduler):
+    def __init__(self, task_fn, name: str = "session-close-scheduler", run_on_start: bool = True):
+        """
+        Runs `task_fn()` once each session's final bar has settled
+        (market_calendar.next_settle), and on start unless `run_on_start` is False.
+        """
+        super().__init__(name, run_on_start)
+        self.task_fn = task_fn
+
+    def next_run(self) -> datetime:
+        target = next_settle()
+        logger.info(f"Next {self.name} run at {target.isoformat()}")
+        return target
+
+    def run_once(self):
+        self.task_fn()
+
+
+class IntervalScheduler(BackgroundScheduler):
+    def __init__(self, task_fn, interval_seconds: float, name: str = "interval-scheduler"):
+        """
+        Runs `task_fn()` every `interval_seconds`, first one interval after start.
+        """
+        super().__init__(name)
+        self.task_fn = task_fn
+        self.interval_seconds = interval_seconds
+
+    def next_run(self) -> datetime:
+        return datetime.now(EXCHANGE_TZ) + timedelta(seconds=self.interval_seconds)
+
+    def run_once(self):
+        self.task_fn()
@@ -0,0 +1,218 @@
+"""
+Screener Engine
+Evaluates rules such as
+    RSI_14 < 30 and SMA_20 > SMA_50 and MACDh_12_26_9 crosses above 0
+across the whole universe at once. A rule is parsed once, validated against a
+small grammar and compiled into NumPy operations over precomputed
+(dates x tickers) indicator matrices.
+Framework independent.
+"""
+
+import ast
+import operator
+import re
+import threading
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from core.indicators import compute_indicator_panel
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Each side of 'crosses' is a single indicator name or number (e.g. SMA_20 crosses above SMA_50)
+CROSS_PATTERN = re.compile(r"([\w.]+)\s+crosses\s+(above|below)\s+(-?[\w.]+)", re.IGNORECASE)
+CROSS_HELP = (
+    "Each side of 'crosses' must be a single indicator name or number, "
+    "e.g. 'SMA_20 crosses above SMA_50' or 'MACDh_12_26_9 crosses below 0'"
+)
+
+COMPARE_OPS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+ARITH_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+CROSS_FUNCS = {"__crosses_above__", "__crosses_below__"}
+
+
+class RuleError(ValueError):
+    """Raised for rules outside the screener grammar."""
+
+
+class CompiledRule:
+    def __init__(self, text: str, fn, fields: list):
+        self.text = text
+        self.fn = fn
+        self.fields = fields  # Indicator names referenced by the rule
+
+    def evaluate(self, panel: dict) -> np.ndarray:
+        """Boolean mask over tickers (latest bar)."""
+        missing = [f for f in self.fields if f not in panel]
+        if missing:
+            raise RuleError(f"Unknown indicator(s): {', '.join(missing)}")
+        mask = self.fn(panel, -1)
+        return np.asarray(mask, dtype=bool)
+
+
+@lru_cache(maxsize=256)
+def compile_rule(text: str) -> CompiledRule:
+    """
+    Parses and compiles a screener rule. Compiled rules are cached.
+    """
+    source = CROSS_PATTERN.sub(
+        lambda m: f"__crosses_{m.group(2).lower()}__({m.group(1)}, {m.group(3)})", text.strip()
+    )
+    if re.search(r"\bcrosses\b", source, re.IGNORECASE):
+        raise RuleError(CROSS_HELP)
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"Could not parse rule: {e.msg}") from None
+    _check_crosses(tree.body)
+
+    fields = []
+    fn = _compile_node(tree.body, fields)
+    return CompiledRule(text, fn, sorted(set(fields)))
+
+
+def _check_crosses(node, boolean: bool = True):
+    """
+    A cross is a whole condition. One that ended up inside arithmetic or a
+    comparison ("SMA_20 * 1.02 crosses above SMA_50" only captures 1.02)
+    had an operand the pattern could not take.
+    """
+    is_cross = isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in CROSS_FUNCS
+    if is_cross:
+        if not boolean:
+            raise RuleError(CROSS_HELP)
+        for arg in node.args:
+            _check_crosses(arg, boolean=False)
+        return
+    if isinstance(node, ast.BoolOp):
+        children, boolean = node.values, True
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        children, boolean = [node.operand], True
+    else:
+        children, boolean = list(ast.iter_child_nodes(node)), False
+    for child in children:
+        _check_crosses(child, boolean)
+
+
+def _compile_node(node, fields):
+    """
+    Returns fn(panel, offset) -> array over tickers, where offset selects the
+    bar (-1 latest, -2 previous) so cross conditions can look one bar back.
+    """
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, fields) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        def bool_op(panel, offset):
+            result = parts[0](panel, offset)
+            for part in parts[1:]:
+                result = combine(result, part(panel, offset))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        inner = _compile_node(node.operand, fields)
+        op = np.logical_not if isinstance(node.op, ast.Not) else np.negative
+        return lambda panel, offset: op(inner(panel, offset))
+
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(node.left, fields)] + [_compile_node(c, fields) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in COMPARE_OPS:
+                raise RuleError(f"Comparison '{type(op).__name__}' is not supported")
+            ops.append(COMPARE_OPS[type(op)])
+        def compare(panel, offset):
+            values = [o(panel, offset) for o in operands]
+            result = ops[0](values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                result = np.logical_and(result, op(values[i], values[i + 1]))
+            return result
+        return compare
+
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in ARITH_OPS:
+            raise RuleError(f"Operator '{type(node.op).__name__}' is not supported")
+        left, right = _compile_node(node.left, fields), _compile_node(node.right, fields)
+        op = ARITH_OPS[type(node.op)]
+        return lambda panel, offset: op(left(panel, offset), right(panel, offset))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in CROSS_FUNCS:
+        if len(node.args) != 2 or node.keywords:
+            raise RuleError("'crosses' needs exactly two operands")
+        a, b = (_compile_node(arg, fields) for arg in node.args)
+        above = node.func.id == "__crosses_above__"
+        def crosses(panel, offset):
+            prev_a, prev_b = a(panel, offset - 1), b(panel, offset - 1)
+            cur_a, cur_b = a(panel, offset), b(panel, offset)
+            if above:
+                return np.logical_and(prev_a <= prev_b, cur_a > cur_b)
+            return np.logical_and(prev_a >= prev_b, cur_a < cur_b)
+        return crosses
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        fields.append(name)
+        return lambda panel, offset: panel[name][offset]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda panel, offset: value
+
+    raise RuleError(f"'{ast.unparse(node)}' is not allowed in screener rules")
+
+
+_panel_cache = {}
+_panel_lock = threading.Lock()
+
+def get_indicator_panel(universe) -> dict:
+    """
+    Indicator matrices for a universe version, computed once per version.
+    """
+    with _panel_lock:
+        panel = _panel_cache.get(universe.version)
+        if panel is None:
+            panel = compute_indicator_panel(universe.close)
+            panel['Volume'] = np.asarray(universe.field('Volume'), dtype=np.float32)
+            _panel_cache.clear()  # Only the current version is worth keeping
+            _panel_cache[universe.version] = panel
+            logger.info(f"Indicator panel built for universe {universe.version}")
+        return panel
+
+
+def run_screen(universe, rule: str, sort_by: str = None, ascending: bool = True, limit: int = 100) -> pd.DataFrame:
+    """
+    Returns the tickers matching `rule` with the latest value of every
+    indicator the rule references, ranked by `sort_by`.
+    """
+    compiled = compile_rule(rule)
+    panel = get_indicator_panel(universe)
+
+    with np.errstate(invalid="ignore"):
+        mask = compiled.evaluate(panel)
+    hits = np.flatnonzero(mask)
+
+    columns = list(dict.fromkeys(['Close'] + compiled.fields + ([sort_by] if sort_by else [])))
+    result = pd.DataFrame({"Ticker": [universe.tickers[i] for i in hits]})
+    for name in columns:
+        if name not in panel:
+            raise RuleError(f"Unknown indicator: {name}")
+        result[name] = panel[name][-1, hits]
+
+    if sort_by:
+        result = result.sort_values(sort_by, ascending=ascending, na_position="last")
+    return result.head(limit).reset_index(drop=True)
@@ -4,7 +4,9 @@ import numpy as np
 import streamlit as st
 from transformers import pipeline
 from datetime import datetime, timedelta
+from core.cache import cached
 from core.logger import get_logger
+from services.finnhub_service import create_client
 import config
 
 logger = get_logger(__name__)
@@ -12,8 +14,8 @@ logger = get_logger(__name__)
 # Lazy load the pipeline to avoid slow startup
 @st.cache_resource(show_spinner="Loading AI Sentiment Model...")
 def load_sentiment_pipeline():
-    logger.info("Loading FinBERT model...")
-    return pipeline("sentiment-analysis", model="ProsusAI/finbert")
+    logger.info(f"Loading sentiment model {config.SENTIMENT_MODEL}...")
+    return pipeline("sentiment-analysis", model=config.SENTIMENT_MODEL)
 
 class SentimentEngine:
     def __init__(self):
@@ -24,7 +26,7 @@ class SentimentEngine:
             self.client = None
         else:
             try:
-                self.client = finnhub.Client(api_key=api_key)
+                self.client = create_client(api_key)
             except Exception as e:
                 logger.error(f"Finnhub Init Error: {e}")
                 self.client = None
@@ -59,6 +61,8 @@ class SentimentEngine:
             logger.error(f"Error fetching news: {e}")
             return []
 
+    # Keyed on the ticker only; failures and empty news come back with no detail and are retried
+    @cached("sentiment", key=lambda self, ticker: ticker.upper(), should_cache=lambda result: bool(result[2]))
     def analyze(self, ticker: str):
         """
         Orchestrates fetching and analyzing news.
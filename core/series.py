@@ -0,0 +1,85 @@
+"""
+Price Series
+Compact columnar container for cached price/indicator data.
+Dates are stored as int64 epoch nanoseconds and values as contiguous,
+read-only NumPy arrays (float32 by default), so a cached series can be
+shared between sessions without pickling or copying on every cache hit.
+Framework independent.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class PriceSeries:
+    __slots__ = ("dates", "columns")
+
+    def __init__(self, dates: np.ndarray, columns: dict):
+        # Takes ownership of the arrays: they are made read-only
+        self.dates = _freeze(np.ascontiguousarray(dates, dtype=np.int64))
+        self.columns = {name: _freeze(np.ascontiguousarray(values)) for name, values in columns.items()}
+        for name, values in self.columns.items():
+            if len(values) != len(self.dates):
+                raise ValueError(f"Column '{name}' has {len(values)} rows, expected {len(self.dates)}")
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(np.empty(0, dtype=np.int64), {})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_column: str = "ds", dtype=np.float32) -> "PriceSeries":
+        """
+        Builds a series from a DataFrame. Dates come from `date_column`
+        or, when it is missing, from a DatetimeIndex. Numeric columns are
+        cast to `dtype` (pass None to keep their original precision).
+        """
+        if df is None or df.empty:
+            return cls.empty()
+
+        if date_column in df.columns:
+            dates = pd.to_datetime(df[date_column])
+        elif isinstance(df.index, pd.DatetimeIndex):
+            dates = df.index.to_series()
+        else:
+            raise ValueError(f"No '{date_column}' column or DatetimeIndex to take dates from")
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_localize(None)
+
+        columns = {}
+        for name in df.columns:
+            if name == date_column or not pd.api.types.is_numeric_dtype(df[name]):
+                continue
+            values = df[name].to_numpy()
+            columns[name] = values.astype(dtype, copy=False) if dtype is not None else values
+        return cls(dates.to_numpy(dtype="datetime64[ns]").view(np.int64), columns)
+
+    def to_frame(self, date_column: str = "ds") -> pd.DataFrame:
+        """
+        Zero-copy pandas view. With `date_column=None` the dates become a
+        DatetimeIndex instead of a column. The frame shares (read-only)
+        memory with the cache, so assign new columns rather than writing in place.
+        """
+        dates = self.dates.view("datetime64[ns]")
+        if date_column is None:
+            return pd.DataFrame(dict(self.columns), index=pd.DatetimeIndex(dates, name="Date"), copy=False)
+        data = {date_column: dates}
+        data.update(self.columns)
+        return pd.DataFrame(data, copy=False)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, name) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(v.nbytes for v in self.columns.values())
+
+
+def _freeze(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
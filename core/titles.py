@@ -0,0 +1,96 @@
+"""
+Title Worker
+Generates chat titles off the request path. A heuristic title is written
+immediately; a background thread then batches every pending thread into a
+single LLM request and replaces the placeholders as results arrive.
+"""
+
+import json
+import queue
+import re
+import threading
+from langchain_core.messages import HumanMessage
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "what", "whats", "what's", "how", "why", "can", "could",
+    "you", "me", "my", "i", "please", "tell", "about", "of", "for", "to", "in", "on", "and", "do", "does",
+}
+
+
+def heuristic_title(text: str, max_words: int = 5) -> str:
+    """Instant local title: the first few meaningful words of the message."""
+    words = re.findall(r"[\w$%.\-']+", text)
+    keep = [w for w in words if w.lower() not in STOPWORDS] or words
+    title = " ".join(keep[:max_words]).strip(" .")
+    if not title:
+        return "New Chat"
+    return title[0].upper() + title[1:]
+
+
+class TitleWorker:
+    def __init__(self, llm, writer, batch_size: int = 10, batch_window: float = 1.0):
+        """
+        llm: chat model with .invoke(messages)
+        writer: callable(thread_id, title) that persists a title
+        batch_window: seconds to wait for more threads before sending a batch
+        """
+        self.llm = llm
+        self.writer = writer
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, thread_id: str, first_message: str):
+        """Writes a heuristic title now and queues the LLM title."""
+        self.writer(thread_id, heuristic_title(first_message))
+        self._ensure_started()
+        self._queue.put((thread_id, first_message))
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="title-worker", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives within the window
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.batch_window))
+            except queue.Empty:
+                pass
+
+            try:
+                titles = self._generate(batch)
+                for thread_id, title in titles.items():
+                    self.writer(thread_id, title)
+            except Exception as e:
+                # Heuristic titles are already in place
+                logger.error(f"Batched title generation failed: {e}")
+
+    def _generate(self, batch: list) -> dict:
+        """One LLM call for the whole batch. Returns {thread_id: title}."""
+        numbered = "\n".join(f"{i}. {msg[:500]}" for i, (_, msg) in enumerate(batch, start=1))
+        prompt = (
+            "Summarize each query below into a very short 3-5 word title (no quotes). "
+            "Reply only with a JSON object mapping each query number to its title.\n\n" + numbered
+        )
+        response = self.llm.invoke([HumanMessage(content=prompt)])
+        content = response.content if isinstance(response.content, str) else str(response.content)
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        parsed = json.loads(match.group(0)) if match else {}
+
+        titles = {}
+        for i, (thread_id, _) in enumerate(batch, start=1):
+            title = str(parsed.get(str(i), "")).strip().replace('"', '')
+            if title:
+                titles[thread_id] = title
+        logger.info(f"Generated {len(titles)} chat titles in one request")
+        return titles
@@ -0,0 +1,189 @@
+"""
+Forecast Tuner
+Automatic ForecastEngine hyperparameter search with rolling-origin
+cross-validation. Configurations are evaluated in parallel processes and
+pruned by successive halving: every round scores the survivors on one more
+fold and keeps the better half, and the whole search stops at a wall-time budget.
+All tunes share one process pool, one tune at a time; fits still running at
+the deadline are killed with their workers so they stop using the CPU.
+Framework independent.
+"""
+
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+from core.forecast import ForecastEngine
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PARAM_GRID = {
+    "seasonality_mode": ["additive", "multiplicative"],
+    "changepoint_prior_scale": [0.01, 0.05, 0.1, 0.3],
+    "daily_seasonality": [False],
+    "weekly_seasonality": [True, False],
+    "yearly_seasonality": [True, False],
+}
+
+
+def _evaluate_fold(params: dict, train: pd.DataFrame, test: pd.DataFrame) -> float:
+    """
+    Fits on `train` and returns the MAPE over `test`. Runs in a worker process.
+    """
+    horizon_days = int((test['ds'].iloc[-1] - train['ds'].iloc[-1]).days)
+    engine = ForecastEngine(days=horizon_days, **params)
+    forecast = engine.predict(train)
+    if forecast.empty:
+        return float("inf")
+    merged = test.merge(forecast[['ds', 'yhat']], on='ds', how='inner')
+    if merged.empty:
+        return float("inf")
+    return float(np.mean(np.abs((merged['y'] - merged['yhat']) / merged['y'])))
+
+
+# -------------------------------------------------
+# SHARED WORKER POOL
+# -------------------------------------------------
+
+_pool = None
+_pool_workers = 0
+# Held for a whole tune: each tune already uses every core, and killing
+# workers at the deadline must not break another tune's fits
+_pool_lock = threading.Lock()
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """The shared pool, (re)started when missing, broken or resized. Call with _pool_lock held."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != max_workers or getattr(_pool, "_broken", False):
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        ctx = multiprocessing.get_context("spawn")  # fork is unsafe in the threaded Streamlit server
+        _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx)
+        _pool_workers = max_workers
+    return _pool
+
+def _kill_pool():
+    """
+    Terminates the pool's workers, abandoning the fits they are running.
+    The next tune spawns fresh ones. Call with _pool_lock held.
+    """
+    global _pool
+    pool, _pool = _pool, None
+    if pool is None:
+        return
+    if hasattr(pool, "terminate_workers"):  # Python 3.14+
+        pool.terminate_workers()
+        return
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ForecastTuner:
+    def __init__(
+        self,
+        param_grid: dict = None,
+        horizon: int = 14,
+        n_folds: int = 3,
+        max_workers: int = None,
+        time_budget: float = 60.0,
+    ):
+        """
+        horizon: trading days held out per fold.
+        time_budget: seconds after which the search stops and returns the
+                     best configuration evaluated so far.
+        """
+        self.param_grid = param_grid or DEFAULT_PARAM_GRID
+        self.horizon = horizon
+        self.n_folds = n_folds
+        self.max_workers = max_workers or max(multiprocessing.cpu_count() - 1, 1)
+        self.time_budget = time_budget
+
+    def candidates(self) -> list:
+        keys = list(self.param_grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.param_grid[k] for k in keys))]
+
+    def folds(self, df: pd.DataFrame) -> list:
+        """
+        Rolling-origin splits, most recent first: each fold trains on all
+        data before its cutoff and tests on the next `horizon` rows.
+        """
+        splits = []
+        for k in range(1, self.n_folds + 1):
+            cutoff = len(df) - k * self.horizon
+            if cutoff < 60:
+                break
+            splits.append((df.iloc[:cutoff], df.iloc[cutoff:cutoff + self.horizon]))
+        return splits
+
+    def tune(self, df: pd.DataFrame) -> dict:
+        """
+        Returns {'params': best params, 'score': mean MAPE, 'evaluated': n fits}
+        or {} if there is not enough data.
+        """
+        data = ForecastEngine()._prepare(df)
+        folds = self.folds(data)
+        if not folds:
+            logger.warning("Not enough data to tune the forecast model.")
+            return {}
+
+        survivors = self.candidates()
+        scores = {i: [] for i in range(len(survivors))}
+        alive = list(range(len(survivors)))
+
+        with _pool_lock:
+            deadline = time.monotonic() + self.time_budget
+            pool = _get_pool(self.max_workers)
+            pending = {}
+            try:
+                evaluated = self._search(pool, folds, survivors, scores, alive, deadline, pending)
+            finally:
+                if pending:
+                    # Fits still running past the budget (or after an error) would keep
+                    # their workers busy for minutes; kill them instead of waiting
+                    _kill_pool()
+
+        # Prefer configurations that survived the most folds, then the lowest error
+        scored = [i for i in scores if scores[i]]
+        if not scored:
+            return {}
+        best = min(scored, key=lambda i: (-len(scores[i]), np.mean(scores[i])))
+        logger.info(f"Best forecast params {survivors[best]} (MAPE {np.mean(scores[best]):.4f}, {evaluated} fits)")
+        return {'params': survivors[best], 'score': float(np.mean(scores[best])), 'evaluated': evaluated}
+
+    def _search(self, pool, folds, survivors, scores, alive, deadline, pending) -> int:
+        """
+        Successive halving over `folds`; fills `scores` and returns the number
+        of fits. Futures left in `pending` are still running at the deadline.
+        """
+        evaluated = 0
+        for fold_no, (train, test) in enumerate(folds):
+            pending.update({pool.submit(_evaluate_fold, survivors[i], train, test): i for i in alive})
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                finished, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = pending.pop(future)
+                    try:
+                        scores[i].append(future.result())
+                    except Exception as e:
+                        logger.error(f"Tuning fit failed for {survivors[i]}: {e}")
+                        scores[i].append(float("inf"))
+                    evaluated += 1
+
+            if pending:
+                logger.warning(f"Tuning hit its {self.time_budget:.0f}s budget during fold {fold_no + 1}")
+                break
+
+            # Successive halving: keep the better half for the next fold
+            alive = sorted(alive, key=lambda i: np.mean(scores[i]))
+            alive = alive[:max(len(alive) // 2, 1)]
+            if len(alive) == 1:
+                break
+        return evaluated
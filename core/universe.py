@@ -0,0 +1,224 @@
+"""
+Universe Matrix
+Packs aligned OHLCV history for the whole tracked universe into one
+memory-mapped file (fields x tickers x dates) that every process on the host
+reads zero-copy. Refreshes write a new version and atomically swap the
+CURRENT pointer, so readers never see a half-written matrix. A matrix is
+current only while no newer bars can exist (market_calendar.data_version),
+and builds take a host-wide file lock so only one process downloads.
+Framework independent.
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from core.market import OHLCV_COLUMNS
+from core.market_calendar import UTC, data_version
+from core.series import PriceSeries
+from core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+DEFAULT_UNIVERSE_DIR = os.path.join("data", "universe")
+POINTER_FILE = "CURRENT"
+LOCK_FILE = ".build.lock"
+
+
+def build_universe_matrix(frames: dict, root: str = DEFAULT_UNIVERSE_DIR, keep_versions: int = 2,
+                          as_of: float = None) -> str:
+    """
+    Writes a new universe version from {ticker: OHLCV frame on a DatetimeIndex}
+    and makes it current. Returns the version name.
+
+    Dates are the union of all tickers' dates; missing bars are NaN.
+    `as_of` is when the downloads started (default: now); freshness is
+    judged from it, since bars published during the downloads may be missing.
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        raise ValueError("No price data to build the universe from")
+
+    tickers = sorted(frames)
+    dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values()))))
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:6]}"
+    tmp_dir = os.path.join(root, f".{version}.tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    matrix = np.lib.format.open_memmap(
+        os.path.join(tmp_dir, "ohlcv.npy"), mode="w+", dtype=np.float32,
+        shape=(len(OHLCV_COLUMNS), len(tickers), len(dates))
+    )
+    matrix[:] = np.nan
+    for row, ticker in enumerate(tickers):
+        df = frames[ticker].reindex(dates)
+        for f, field in enumerate(OHLCV_COLUMNS):
+            if field in df.columns:
+                matrix[f, row, :] = df[field].to_numpy(dtype=np.float32)
+    matrix.flush()
+    del matrix
+
+    np.save(os.path.join(tmp_dir, "dates.npy"), dates.to_numpy(dtype="datetime64[ns]").view(np.int64))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"tickers": tickers, "fields": OHLCV_COLUMNS, "version": version,
+                   "built_at": as_of or time.time()}, f)
+
+    os.replace(tmp_dir, os.path.join(root, version))
+    _swap_pointer(root, version)
+    _remove_old_versions(root, keep=keep_versions)
+
+    logger.info(f"Universe {version} built: {len(tickers)} tickers x {len(dates)} dates")
+    return version
+
+
+def _swap_pointer(root: str, version: str):
+    tmp = os.path.join(root, f".{POINTER_FILE}.{uuid.uuid4().hex}")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, POINTER_FILE))
+
+
+def _remove_old_versions(root: str, keep: int):
+    # Open memmaps keep working after unlink on POSIX; on Windows removal may fail and is retried next build
+    current = read_current_version(root)
+    versions = sorted(d for d in os.listdir(root) if not d.startswith(".") and d != POINTER_FILE)
+    for old in versions[:-keep]:
+        if old == current:
+            continue
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+@contextlib.contextmanager
+def build_lock(root: str = DEFAULT_UNIVERSE_DIR):
+    """
+    Non-blocking host-wide lock around a universe build. Yields True in the
+    process that holds it and False in every other one, so the schedulers
+    of several server processes on one host build the matrix once.
+    The OS drops the lock if the holder dies.
+    """
+    os.makedirs(root, exist_ok=True)
+    fd = os.open(os.path.join(root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def read_current_version(root: str = DEFAULT_UNIVERSE_DIR):
+    try:
+        with open(os.path.join(root, POINTER_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class UniverseMatrix:
+    """
+    Read-only view of one universe version.
+    `ohlcv` has shape (fields, tickers, dates) and is memory-mapped, so each
+    ticker's history is contiguous and cross-sections are cheap transposed views.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.tickers = meta["tickers"]
+        self.fields = meta["fields"]
+        self.built_at = meta.get("built_at", 0.0)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.dates = np.load(os.path.join(path, "dates.npy"))
+        self.ohlcv = np.load(os.path.join(path, "ohlcv.npy"), mmap_mode="r")
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self.index
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.built_at
+
+    def is_current(self, ticker: str = "", refresh_seconds: float = 300) -> bool:
+        """
+        True while no bars newer than the build can exist for `ticker`
+        (an equity when empty): the build and now share a data version.
+        A pre-open build goes stale at the open; a post-close build holds
+        until the next one.
+        """
+        built = datetime.fromtimestamp(self.built_at, UTC)
+        return data_version(ticker, refresh_seconds, built) == data_version(ticker, refresh_seconds)
+
+    def field(self, name: str) -> np.ndarray:
+        """(dates x tickers) view for one field, e.g. 'Close'."""
+        return self.ohlcv[self.fields.index(name)].T
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.field("Close")
+
+    def series(self, ticker: str) -> PriceSeries:
+        """
+        One ticker's bars as zero-copy views into the map.
+        Dates where the ticker has no bar are dropped; a gap inside the
+        history (e.g. weekends for equities next to crypto) costs a copy.
+        """
+        row = self.index[ticker]
+        close = self.ohlcv[self.fields.index("Close"), row]
+        valid = np.flatnonzero(~np.isnan(close))
+        if len(valid) == 0:
+            return PriceSeries.empty()
+        if valid[-1] - valid[0] + 1 == len(valid):
+            rows = slice(valid[0], valid[-1] + 1)
+        else:
+            rows = valid
+        columns = {field: self.ohlcv[f, row, rows] for f, field in enumerate(self.fields)}
+        return PriceSeries(self.dates[rows], columns)
+
+
+_current = None
+_current_lock = threading.Lock()
+
+def open_universe(root: str = DEFAULT_UNIVERSE_DIR):
+    """
+    Returns the current UniverseMatrix, reopening it when another process
+    has swapped in a new version. Returns None if none was built yet.
+    """
+    global _current
+    version = read_current_version(root)
+    if version is None:
+        return None
+
+    with _current_lock:
+        if _current is None or _current.version != version:
+            try:
+                _current = UniverseMatrix(os.path.join(root, version))
+            except (FileNotFoundError, ValueError) as e:
+                logger.error(f"Could not open universe {version}: {e}")
+                return _current
+        return _current
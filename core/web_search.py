@@ -0,0 +1,169 @@
+"""
+Web Search
+Time-bounded, cached wrapper around DuckDuckGo search for the assistant.
+Every call has a hard deadline, concurrent searches are capped process-wide
+(so one slow provider cannot tie up every session), identical queries are
+served from a TTL cache, and results are trimmed to a token budget before
+they reach the model.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from core.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+CHARS_PER_TOKEN = 4  # Rough estimate, good enough for a budget
+BACKEND_RETRY_SECONDS = 300
+
+UNAVAILABLE_MESSAGE = "Web search is temporarily unavailable. Please answer without external search."
+TIMEOUT_MESSAGE = "Web search timed out. Please answer without external search or try a narrower query."
+BUSY_MESSAGE = "Web search is busy right now. Please answer without external search."
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` to roughly `max_tokens`, preferring a sentence or word boundary."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return cut[:boundary if boundary > 0 else limit].rstrip() + " ..."
+
+
+class WebSearch:
+    def __init__(
+        self,
+        timeout: float = None,
+        max_concurrency: int = None,
+        ttl_seconds: float = None,
+        max_tokens: int = None,
+        max_entries: int = 256,
+        backend_factory=None,
+    ):
+        """
+        backend_factory: callable() returning an object with .run(query) -> str.
+                         Defaults to langchain's DuckDuckGoSearchRun, created lazily.
+        """
+        self.timeout = timeout or config.SEARCH_TIMEOUT_SECONDS
+        self.max_concurrency = max_concurrency or config.SEARCH_MAX_CONCURRENCY
+        self.ttl_seconds = ttl_seconds or config.SEARCH_CACHE_TTL_MINUTES * 60
+        self.max_tokens = max_tokens or config.SEARCH_MAX_TOKENS
+        self.max_entries = max_entries
+        self.backend_factory = backend_factory or self._default_backend
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        # Extra workers so a few hung searches cannot starve new ones of threads
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2, thread_name_prefix="web-search")
+        self._cache = OrderedDict()  # key -> (expires, text)
+        self._lock = threading.Lock()
+        self._backend = None
+        self._backend_failed_at = None
+
+    @staticmethod
+    def _default_backend():
+        from langchain_community.tools import DuckDuckGoSearchRun
+        return DuckDuckGoSearchRun()
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return re.sub(r"\s+", " ", query.lower()).strip()
+
+    def _get_backend(self):
+        """Created on first use; a failed init is retried after a cool-down instead of never."""
+        with self._lock:
+            if self._backend is not None:
+                return self._backend
+            if self._backend_failed_at and time.monotonic() - self._backend_failed_at < BACKEND_RETRY_SECONDS:
+                return None
+            try:
+                self._backend = self.backend_factory()
+                self._backend_failed_at = None
+                logger.info("Web search backend initialized")
+            except Exception as e:
+                self._backend_failed_at = time.monotonic()
+                logger.warning(f"Web search backend unavailable: {e}")
+            return self._backend
+
+    def _cached(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key: str, text: str):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl_seconds, text)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _run(self, backend, query: str) -> str:
+        try:
+            return backend.run(query)
+        finally:
+            # The slot is held until the search really finishes, even past the caller's deadline
+            self._slots.release()
+
+    def search(self, query: str) -> str:
+        """Search results as text, or a short explanation the model can act on."""
+        key = self._key(query)
+        if not key:
+            return "Empty search query."
+
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        backend = self._get_backend()
+        if backend is None:
+            return UNAVAILABLE_MESSAGE
+
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            logger.warning(f"No free search slot within {self.timeout:g}s for '{query}'")
+            return BUSY_MESSAGE
+
+        try:
+            future = self._executor.submit(self._run, backend, query)
+        except Exception:
+            self._slots.release()
+            raise
+
+        try:
+            result = future.result(timeout=max(deadline - time.monotonic(), 0.1))
+        except FutureTimeout:
+            logger.warning(f"Web search for '{query}' exceeded {self.timeout:g}s")
+            return TIMEOUT_MESSAGE
+        except Exception as e:
+            logger.error(f"Web search failed for '{query}': {e}")
+            return UNAVAILABLE_MESSAGE
+
+        text = truncate_to_tokens(str(result).strip(), self.max_tokens)
+        if text:
+            self._store(key, text)
+        return text or "No results found."
+
+
+_web_search = None
+_web_search_lock = threading.Lock()
+
+
+def get_web_search() -> WebSearch:
+    """Process-wide instance, so the concurrency cap and cache are shared by all sessions."""
+    global _web_search
+    with _web_search_lock:
+        if _web_search is None:
+            _web_search = WebSearch()
+        return _web_search
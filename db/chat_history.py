@@ -0,0 +1,206 @@
+"""
+Chat history index for chatbot.db.
+Keeps a flat copy of every user / assistant message next to the LangGraph
+checkpoints so the sidebar can page through threads, search message text
+(SQLite FTS5, kept in sync by triggers) and open a thread by loading only
+its most recent messages.
+"""
+
+import re
+import sqlite3
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_fts_available = None
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def fts_available() -> bool:
+    """Whether this SQLite build ships FTS5; search falls back to LIKE otherwise."""
+    global _fts_available
+    if _fts_available is None:
+        try:
+            conn = sqlite3.connect(":memory:")
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+            conn.close()
+            _fts_available = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite FTS5 not available; chat search will use LIKE.")
+            _fts_available = False
+    return _fts_available
+
+
+def init_schema(conn: sqlite3.Connection):
+    """Creates the message table, listing index and FTS index (idempotent)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            thread_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_thread ON chat_messages(thread_id, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_titles_updated ON chat_titles(updated_at, thread_id)")
+
+    if not fts_available():
+        return
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts
+        USING fts5(content, content='chat_messages', content_rowid='id')
+    ''')
+    # External-content FTS: triggers keep the index in step with every write
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS chat_messages_ai AFTER INSERT ON chat_messages BEGIN
+            INSERT INTO chat_messages_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS chat_messages_ad AFTER DELETE ON chat_messages BEGIN
+            INSERT INTO chat_messages_fts(chat_messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    ''')
+
+
+def add_messages(db_path: str, thread_id: str, messages: list, touch: bool = True):
+    """
+    Appends [(role, content), ...] to a thread. With `touch`, the thread also
+    moves to the top of the listing.
+    """
+    rows = [(thread_id, role, content) for role, content in messages if content]
+    if not rows:
+        return
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany("INSERT INTO chat_messages (thread_id, role, content) VALUES (?, ?, ?)", rows)
+            if touch:
+                conn.execute("UPDATE chat_titles SET updated_at = CURRENT_TIMESTAMP WHERE thread_id = ?", (thread_id,))
+    finally:
+        conn.close()
+
+
+def has_messages(db_path: str, thread_id: str) -> bool:
+    conn = _connect(db_path)
+    try:
+        return conn.execute("SELECT 1 FROM chat_messages WHERE thread_id = ? LIMIT 1", (thread_id,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def delete_messages(conn: sqlite3.Connection, thread_id: str):
+    """Runs on the caller's connection so it can share the thread delete transaction."""
+    conn.execute("DELETE FROM chat_messages WHERE thread_id = ?", (thread_id,))
+
+
+def list_threads(db_path: str, limit: int = 20, cursor: tuple = None):
+    """
+    One page of threads, most recently active first. `cursor` is the
+    (updated_at, thread_id) of the last row of the previous page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    conn = _connect(db_path)
+    try:
+        if cursor:
+            rows = conn.execute('''
+                SELECT thread_id, title, updated_at FROM chat_titles
+                WHERE (updated_at, thread_id) < (?, ?)
+                ORDER BY updated_at DESC, thread_id DESC
+                LIMIT ?
+            ''', (cursor[0], cursor[1], limit + 1)).fetchall()
+        else:
+            rows = conn.execute('''
+                SELECT thread_id, title, updated_at FROM chat_titles
+                ORDER BY updated_at DESC, thread_id DESC
+                LIMIT ?
+            ''', (limit + 1,)).fetchall()
+    finally:
+        conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = (rows[-1][2], rows[-1][0]) if has_more else None
+    return [(thread_id, title) for thread_id, title, _ in rows], next_cursor
+
+
+def _fts_query(text: str) -> str:
+    """Every word as a quoted prefix term, so user input can't break FTS syntax."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search_threads(db_path: str, query: str, limit: int = 20) -> list:
+    """
+    Threads whose title or messages match `query`, best match first.
+    Returns [(thread_id, title), ...].
+    """
+    conn = _connect(db_path)
+    try:
+        like = f"%{query.strip()}%"
+        match = _fts_query(query)
+        if fts_available() and match:
+            rows = conn.execute('''
+                SELECT t.thread_id, t.title
+                FROM (
+                    SELECT m.thread_id, MIN(f.rank) AS rank
+                    FROM (
+                        SELECT rowid, rank
+                        FROM chat_messages_fts WHERE chat_messages_fts MATCH ?
+                    ) f
+                    JOIN chat_messages m ON m.id = f.rowid
+                    GROUP BY m.thread_id
+                ) hits
+                JOIN chat_titles t ON t.thread_id = hits.thread_id
+                ORDER BY hits.rank
+                LIMIT ?
+            ''', (match, limit)).fetchall()
+        else:
+            rows = conn.execute('''
+                SELECT DISTINCT t.thread_id, t.title
+                FROM chat_titles t
+                JOIN chat_messages m ON m.thread_id = t.thread_id
+                WHERE m.content LIKE ?
+                ORDER BY t.updated_at DESC
+                LIMIT ?
+            ''', (like, limit)).fetchall()
+        # Title matches come after message matches
+        rows += conn.execute(
+            "SELECT thread_id, title FROM chat_titles WHERE title LIKE ? ORDER BY updated_at DESC LIMIT ?",
+            (like, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    seen, results = set(), []
+    for thread_id, title in rows:
+        if thread_id not in seen:
+            seen.add(thread_id)
+            results.append((thread_id, title))
+    return results[:limit]
+
+
+def load_messages(db_path: str, thread_id: str, limit: int = 30, before_id: int = None):
+    """
+    The `limit` messages of a thread preceding `before_id` (newest page when
+    None), oldest first. Returns (messages, has_more) where each message is
+    {'id', 'role', 'content'}.
+    """
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute('''
+            SELECT id, role, content FROM chat_messages
+            WHERE thread_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (thread_id, before_id if before_id is not None else 2 ** 63 - 1, limit + 1)).fetchall()
+    finally:
+        conn.close()
+
+    has_more = len(rows) > limit
+    messages = [{'id': i, 'role': role, 'content': content} for i, role, content in reversed(rows[:limit])]
+    return messages, has_more
@@ -0,0 +1,157 @@
+"""
+Checkpoint maintenance for the LangGraph SqliteSaver tables in chatbot.db.
+Cascading thread deletes, per-thread retention, optional blob compression
+and incremental vacuum / WAL truncation.
+"""
+
+import sqlite3
+import time
+import zlib
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Tables created by langgraph's SqliteSaver
+CHECKPOINT_TABLES = ("checkpoints", "writes")
+
+ZLIB_PREFIX = "zlib+"
+COMPRESS_MIN_BYTES = 1024
+
+
+class ZlibSerializer:
+    """
+    Wraps a LangGraph serializer and zlib-compresses blobs above
+    `min_bytes`. The type tag is prefixed so uncompressed rows written
+    before compression was enabled still load.
+    """
+
+    def __init__(self, inner=None, level: int = 6, min_bytes: int = COMPRESS_MIN_BYTES):
+        if inner is None:
+            from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+            inner = JsonPlusSerializer()
+        self.inner = inner
+        self.level = level
+        self.min_bytes = min_bytes
+
+    def dumps_typed(self, obj):
+        type_, data = self.inner.dumps_typed(obj)
+        if data is not None and len(data) >= self.min_bytes:
+            return f"{ZLIB_PREFIX}{type_}", zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data):
+        type_, payload = data
+        if type_ and type_.startswith(ZLIB_PREFIX):
+            return self.inner.loads_typed((type_[len(ZLIB_PREFIX):], zlib.decompress(payload)))
+        return self.inner.loads_typed(data)
+
+    # Untyped API, still used for checkpoint metadata by some saver versions
+    def dumps(self, obj):
+        return self.inner.dumps(obj)
+
+    def loads(self, data):
+        return self.inner.loads(data)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # The chat graph holds its own connection; wait for its locks instead of failing
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def _existing_tables(conn: sqlite3.Connection) -> set:
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    return {row[0] for row in rows}
+
+
+def enable_incremental_vacuum(db_path: str):
+    """
+    Switches the database to auto_vacuum=INCREMENTAL. An existing file only
+    picks the mode up after a full VACUUM, which is done once here; call
+    this before the checkpointer opens its connection.
+    """
+    conn = _connect(db_path)
+    try:
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            logger.info(f"Enabled incremental vacuum on {db_path}")
+    finally:
+        conn.close()
+
+
+def delete_thread(conn: sqlite3.Connection, thread_id: str) -> int:
+    """
+    Deletes every checkpoint and pending write of a thread. Runs on the
+    caller's connection so it can share a transaction with other deletes.
+    """
+    deleted = 0
+    tables = _existing_tables(conn)
+    for table in CHECKPOINT_TABLES:
+        if table in tables:
+            deleted += conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)).rowcount
+    return deleted
+
+
+def prune_checkpoints(db_path: str, keep: int) -> int:
+    """
+    Keeps the latest `keep` checkpoints per thread and namespace (checkpoint
+    ids are time-ordered) and drops the writes that belonged to the rest.
+    Returns the number of checkpoints removed.
+    """
+    conn = _connect(db_path)
+    try:
+        if not set(CHECKPOINT_TABLES) <= _existing_tables(conn):
+            return 0
+        with conn:
+            removed = conn.execute('''
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                        ) AS rn
+                        FROM checkpoints
+                    ) WHERE rn > ?
+                )
+            ''', (keep,)).rowcount
+            conn.execute('''
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                      AND c.checkpoint_ns = writes.checkpoint_ns
+                      AND c.checkpoint_id = writes.checkpoint_id
+                )
+            ''')
+        return removed
+    finally:
+        conn.close()
+
+
+def compact_database(db_path: str, max_pages: int = 2000):
+    """
+    Returns up to `max_pages` free pages to the filesystem and truncates the
+    WAL. Both steps are incremental, so readers are never blocked for long.
+    """
+    conn = _connect(db_path)
+    try:
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})")
+        busy, wal_pages, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            logger.info("WAL checkpoint deferred: database busy")
+        return {'freed_pages': free_before - conn.execute("PRAGMA freelist_count").fetchone()[0], 'wal_pages': wal_pages}
+    finally:
+        conn.close()
+
+
+def run_maintenance(db_path: str, keep: int) -> dict:
+    """One maintenance pass: retention, then space reclamation."""
+    started = time.monotonic()
+    removed = prune_checkpoints(db_path, keep)
+    stats = compact_database(db_path)
+    stats['removed_checkpoints'] = removed
+    logger.info(
+        f"Checkpoint maintenance: removed {removed} checkpoints, freed {stats['freed_pages']} pages "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return stats
@@ -1,5 +1,6 @@
 import sqlite3
 import os
+import json
 
 DB_FILE = "tradeglance.db"
 
@@ -20,6 +21,14 @@ def init_db():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS forecast_params (
+            ticker TEXT PRIMARY KEY,
+            params TEXT NOT NULL,
+            score REAL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
     conn.commit()
     conn.close()
 
@@ -29,3 +38,46 @@ def log_search(ticker: str):
     c.execute("INSERT INTO user_searches (ticker) VALUES (?)", (ticker,))
     conn.commit()
     conn.close()
+
+def get_popular_tickers(days: int = 7, limit: int = 50) -> list:
+    """
+    Returns the most searched tickers over the last N days, most popular first.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT ticker, COUNT(*) AS hits
+        FROM user_searches
+        WHERE timestamp >= datetime('now', ?)
+        GROUP BY ticker
+        ORDER BY hits DESC
+        LIMIT ?
+    ''', (f"-{int(days)} days", limit))
+    rows = c.fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+def save_tuned_params(ticker: str, params: dict, score: float):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO forecast_params (ticker, params, score) VALUES (?, ?, ?)
+        ON CONFLICT(ticker) DO UPDATE SET params=excluded.params, score=excluded.score, updated_at=CURRENT_TIMESTAMP
+    ''', (ticker, json.dumps(params), score))
+    conn.commit()
+    conn.close()
+
+def get_tuned_params(ticker: str, max_age_hours: float = 24):
+    """
+    Returns the tuned forecast params for a ticker, or None if missing or expired.
+    {} means tuning found nothing better than the defaults.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT params FROM forecast_params
+        WHERE ticker = ? AND updated_at >= datetime('now', ?)
+    ''', (ticker, f"-{float(max_age_hours)} hours"))
+    row = c.fetchone()
+    conn.close()
+    return json.loads(row[0]) if row else None
@@ -0,0 +1,5 @@
+"""
+Offline load-testing harness: local stand-ins for Yahoo Finance, Finnhub,
+Alpha Vantage and Gemini, plus a runner that simulates concurrent sessions.
+See loadtest/run.py.
+"""
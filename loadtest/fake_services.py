@@ -0,0 +1,632 @@
+"""
+Local stand-ins for the external services TradeGlance calls:
+Yahoo Finance (chart API), Finnhub (company news, quote, trades websocket),
+Alpha Vantage (intraday series) and the Gemini REST API (generateContent),
+plus an in-memory Redis-protocol server for the shared result cache.
+Each service runs its own threaded server with configurable latency,
+error rate and rate limiting, and serves deterministic synthetic data.
+"""
+
+import base64
+import fnmatch
+import hashlib
+import json
+import math
+import random
+import re
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from zoneinfo import ZoneInfo
+
+RANGE_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "60d": 42, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "max": 2520}
+
+HEADLINES = [
+    "{t} beats quarterly earnings expectations on strong demand",
+    "{t} shares slide after analyst downgrade",
+    "{t} announces new product line at annual event",
+    "Regulators open inquiry into {t} business practices",
+    "{t} raises full-year guidance",
+    "{t} faces supply chain headwinds, warns on margins",
+    "Investors weigh {t} valuation after rally",
+    "{t} expands buyback program",
+]
+
+
+@dataclass
+class Behavior:
+    """How a fake service misbehaves. Rates are probabilities per request."""
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+
+def _seed(ticker: str) -> int:
+    return zlib.crc32(ticker.upper().encode())
+
+
+def synthetic_bars(ticker: str, days: int, end: datetime = None) -> dict:
+    """Deterministic random-walk daily bars for a ticker over the last `days` weekdays."""
+    rng = random.Random(_seed(ticker))
+    end = (end or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    dates = []
+    day = end
+    while len(dates) < days:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+    dates.reverse()
+
+    # Walk backwards from a fixed last close so every range agrees on recent prices
+    price = 20 + rng.random() * 480
+    open_, high, low, close, volume = [], [], [], [], []
+    for _ in dates:
+        o = price * math.exp(-rng.gauss(0.0004, 0.018))
+        open_.append(round(o, 4))
+        close.append(round(price, 4))
+        high.append(round(max(o, price) * (1 + abs(rng.gauss(0, 0.006))), 4))
+        low.append(round(min(o, price) * (1 - abs(rng.gauss(0, 0.006))), 4))
+        volume.append(rng.randint(1_000_000, 50_000_000))
+        price = o * (1 + rng.gauss(0, 0.004))
+    for column in (open_, high, low, close, volume):
+        column.reverse()
+    return {
+        "timestamp": [int(d.timestamp()) for d in dates],
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    }
+
+
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60}
+SESSION_MINUTES = 390  # 09:30-16:00 New York
+
+
+def synthetic_intraday_bars(ticker: str, days: int, minutes: int) -> dict:
+    """Regular-session bars that end on the daily series' closes (timestamps in UTC)."""
+    daily = synthetic_bars(ticker, days)
+    rng = random.Random(_seed(ticker) + minutes)
+    ny = ZoneInfo("America/New_York")
+    steps = SESSION_MINUTES // minutes
+    out = {key: [] for key in daily}
+    for day_ts, open_, close in zip(daily["timestamp"], daily["open"], daily["close"]):
+        day = datetime.utcfromtimestamp(day_ts)
+        session_open = datetime(day.year, day.month, day.day, 9, 30, tzinfo=ny)
+        drift = math.log(close / open_) / steps
+        price = open_
+        for k in range(steps):
+            prev = price
+            price = open_ * math.exp(drift * (k + 1) + rng.gauss(0, 0.0015)) if k < steps - 1 else close
+            out["timestamp"].append(int((session_open + timedelta(minutes=minutes * k)).timestamp()))
+            out["open"].append(round(prev, 4))
+            out["close"].append(round(price, 4))
+            out["high"].append(round(max(prev, price) * (1 + abs(rng.gauss(0, 0.0008))), 4))
+            out["low"].append(round(min(prev, price) * (1 - abs(rng.gauss(0, 0.0008))), 4))
+            out["volume"].append(rng.randint(10_000, 500_000))
+    return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set per server class
+
+    def log_message(self, format, *args):
+        pass  # keep load-test output readable
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str):
+        service = self.service
+        behavior = service.behavior
+        service.count()
+        delay = max(behavior.latency_ms + random.uniform(-behavior.jitter_ms, behavior.jitter_ms), 0)
+        time.sleep(delay / 1000)
+
+        roll = random.random()
+        if roll < behavior.rate_limit_rate:
+            return service.rate_limited(self)
+        if roll < behavior.rate_limit_rate + behavior.error_rate:
+            return self._send(500, {"error": "Injected server error"})
+
+        url = urlparse(self.path)
+        body = None
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        try:
+            service.route(self, url.path, {k: v[-1] for k, v in parse_qs(url.query).items()}, body)
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class FakeService:
+    name = "service"
+
+    def __init__(self, behavior: Behavior = None, host: str = "127.0.0.1", port: int = 0):
+        self.behavior = behavior or Behavior()
+        handler = type(f"{type(self).__name__}Handler", (_Handler,), {"service": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._requests
+
+    def count(self):
+        with self._lock:
+            self._requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def rate_limited(self, handler: _Handler):
+        handler._send(429, {"error": "Too Many Requests"})
+
+    def route(self, handler: _Handler, path: str, query: dict, body):
+        handler._send(404, {"error": f"Unknown path {path}"})
+
+
+class FakeYahoo(FakeService):
+    """GET /v8/finance/chart/{ticker}?range=1y&interval=1d"""
+    name = "yahoo"
+
+    def route(self, handler, path, query, body):
+        match = re.match(r"^/v8/finance/chart/([^/]+)$", path)
+        if not match:
+            return super().route(handler, path, query, body)
+        ticker = match.group(1).upper()
+        days = RANGE_DAYS.get(query.get("range", "1y"), 252)
+        interval = query.get("interval", "1d")
+        if interval in INTERVAL_MINUTES:
+            bars = synthetic_intraday_bars(ticker, min(days, 60), INTERVAL_MINUTES[interval])
+        else:
+            bars = synthetic_bars(ticker, days)
+        handler._send(200, {"chart": {"result": [{
+            "meta": {
+                "symbol": ticker, "currency": "USD", "regularMarketPrice": bars["close"][-1],
+                "exchangeTimezoneName": "America/New_York",
+            },
+            "timestamp": bars.pop("timestamp"),
+            "indicators": {"quote": [bars]},
+        }], "error": None}})
+
+
+class FakeFinnhub(FakeService):
+    """GET /company-news?symbol=..., GET /quote?symbol=... (base URL is the /api/v1 root)"""
+    name = "finnhub"
+
+    def route(self, handler, path, query, body):
+        ticker = query.get("symbol", "AAPL").upper()
+        if path.endswith("/company-news"):
+            rng = random.Random(_seed(ticker))
+            now = int(time.time())
+            news = [
+                {
+                    "category": "company", "datetime": now - i * 3600, "headline": rng.choice(HEADLINES).format(t=ticker),
+                    "id": _seed(ticker) + i, "related": ticker, "source": "Fake Wire", "summary": "", "url": "",
+                }
+                for i in range(15)
+            ]
+            return handler._send(200, news)
+        if path.endswith("/quote"):
+            close = synthetic_bars(ticker, 252)["close"]
+            return handler._send(200, {"c": close[-1], "pc": close[-2], "t": int(time.time())})
+        return super().route(handler, path, query, body)
+
+
+class FakeAlphaVantage(FakeService):
+    """GET /query?function=TIME_SERIES_INTRADAY&symbol=..."""
+    name = "alphavantage"
+
+    def rate_limited(self, handler):
+        # Alpha Vantage throttles with a 200 and a note instead of a 429
+        handler._send(200, {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."})
+
+    def route(self, handler, path, query, body):
+        if path != "/query":
+            return super().route(handler, path, query, body)
+        ticker = query.get("symbol", "AAPL").upper()
+        price = synthetic_bars(ticker, 252)["close"][-1]
+        stamp = datetime.utcnow().replace(second=0, microsecond=0)
+        series = {
+            (stamp - timedelta(minutes=5 * i)).strftime("%Y-%m-%d %H:%M:%S"): {
+                "1. open": f"{price:.4f}", "2. high": f"{price:.4f}", "3. low": f"{price:.4f}",
+                "4. close": f"{price * (1 - 0.001 * i):.4f}", "5. volume": "10000",
+            }
+            for i in range(12)
+        }
+        handler._send(200, {"Meta Data": {"2. Symbol": ticker}, "Time Series (5min)": series})
+
+
+class FakeGemini(FakeService):
+    """
+    POST /v1beta/models/{model}:generateContent. Asks for get_stock_price when
+    the user wants a price (so the agent's tool loop is exercised), answers in
+    text otherwise.
+    """
+    name = "gemini"
+
+    def rate_limited(self, handler):
+        handler._send(429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}})
+
+    @staticmethod
+    def _reply(body: dict) -> dict:
+        contents = body.get("contents") or [{}]
+        last_parts = contents[-1].get("parts") or [{}]
+        text = " ".join(p.get("text", "") for p in last_parts if "text" in p)
+        has_tool_result = any("functionResponse" in p for p in last_parts)
+
+        symbol = re.search(r"\b[A-Z]{1,5}(?:-[A-Z]{3})?\b", text)
+        if not has_tool_result and symbol and "price" in text.lower():
+            part = {"functionCall": {"name": "get_stock_price", "args": {"symbol": symbol.group(0)}}}
+        else:
+            part = {"text": "Here is a short synthetic answer from the local Gemini stand-in."}
+
+        prompt_tokens = sum(len(json.dumps(c)) for c in contents) // 4
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": 20, "totalTokenCount": prompt_tokens + 20},
+            "modelVersion": "gemini-2.5-flash",
+        }
+
+    def route(self, handler, path, query, body):
+        if path.endswith(":generateContent"):
+            return handler._send(200, self._reply(body or {}))
+        if path.endswith(":streamGenerateContent"):
+            reply = self._reply(body or {})
+            if query.get("alt") == "sse":
+                return handler._send(200, f"data: {json.dumps(reply)}\n\n".encode(), "text/event-stream")
+            return handler._send(200, [reply])
+        return super().route(handler, path, query, body)
+
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _ws_frame(text: str) -> bytes:
+    """Unmasked server-to-client text frame."""
+    payload = text.encode()
+    if len(payload) < 126:
+        header = struct.pack("!BB", 0x81, len(payload))
+    elif len(payload) < 65536:
+        header = struct.pack("!BBH", 0x81, 126, len(payload))
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, len(payload))
+    return header + payload
+
+
+def _read_ws_frame(sock_file):
+    """(opcode, payload) of one client frame (clients always mask)."""
+    head = sock_file.read(2)
+    if len(head) < 2:
+        return 8, b""
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", sock_file.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", sock_file.read(8))[0]
+    mask = sock_file.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+    data = sock_file.read(length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class _TradeStreamHandler(socketserver.StreamRequestHandler):
+    service = None
+
+    def handle(self):
+        headers = {}
+        self.rfile.readline()  # GET /?token=... HTTP/1.1
+        for line in iter(self.rfile.readline, b"\r\n"):
+            if not line:
+                return
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1((headers.get("sec-websocket-key", "") + WS_GUID).encode()).digest()).decode()
+        self.wfile.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        self.service.count()
+
+        symbols = set()
+        closed = threading.Event()
+        write_lock = threading.Lock()
+
+        def send(raw: bytes):
+            with write_lock:
+                self.wfile.write(raw)
+
+        def reader():
+            try:
+                while not closed.is_set():
+                    opcode, payload = _read_ws_frame(self.rfile)
+                    if opcode == 8:
+                        break
+                    if opcode == 9:
+                        send(struct.pack("!BB", 0x8A, len(payload)) + payload)
+                    elif opcode == 1:
+                        message = json.loads(payload or b"{}")
+                        if message.get("type") == "subscribe":
+                            symbols.add(message.get("symbol"))
+                        elif message.get("type") == "unsubscribe":
+                            symbols.discard(message.get("symbol"))
+            except (OSError, ValueError):
+                pass
+            closed.set()
+
+        threading.Thread(target=reader, daemon=True).start()
+        try:
+            while not closed.wait(self.service.interval):
+                trades = [self.service.next_trade(symbol) for symbol in list(symbols)]
+                if trades:
+                    send(_ws_frame(json.dumps({"type": "trade", "data": trades})))
+        except OSError:
+            closed.set()
+
+
+class FakeTradeStream:
+    """
+    Finnhub-style trades websocket. Every `interval` seconds each subscribed
+    symbol gets one random-walk trade: {"type": "trade", "data": [{s, p, t, v}]}.
+    """
+    name = "trades"
+
+    def __init__(self, behavior: Behavior = None, interval: float = 0.25, host: str = "127.0.0.1", port: int = 0):
+        self.behavior = behavior or Behavior()
+        self.interval = interval
+        handler = type("FakeTradeStreamHandler", (_TradeStreamHandler,), {"service": self})
+        self.server = socketserver.ThreadingTCPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._prices = {}
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"ws://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._requests
+
+    def count(self):
+        with self._lock:
+            self._requests += 1
+
+    def next_trade(self, symbol: str) -> dict:
+        with self._lock:
+            price = self._prices.get(symbol)
+            if price is None:
+                ticker = symbol.split(":")[-1]
+                price = synthetic_bars(ticker, 252)["close"][-1]
+            price *= math.exp(random.gauss(0, 0.0005))
+            self._prices[symbol] = price
+        return {"s": symbol, "p": round(price, 4), "t": int(time.time() * 1000), "v": random.randint(1, 500), "c": None}
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-trades", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    service = None
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # Inline command (e.g. typed into telnet)
+        parts = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    @staticmethod
+    def _encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, Exception):
+            return f"-ERR {reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return f"*{len(reply)}\r\n".encode() + b"".join(_RedisHandler._encode(item) for item in reply)
+
+    def handle(self):
+        try:
+            while True:
+                parts = self._read_command()
+                if parts is None:
+                    return
+                if not parts:
+                    continue
+                try:
+                    reply = self.service.execute(parts[0].decode().upper(), parts[1:])
+                except Exception as e:
+                    reply = e
+                self.wfile.write(self._encode(reply))
+        except (OSError, ValueError):
+            pass
+
+
+class FakeRedis:
+    """
+    In-memory Redis-protocol server with the commands the result cache uses
+    (PING, AUTH, SELECT, GET, SET [EX|PX], DEL, SCAN, DBSIZE, FLUSHDB) and
+    allkeys-lru eviction above `max_bytes`.
+    """
+    name = "redis"
+
+    def __init__(self, latency_ms: float = 1.0, max_bytes: int = 256 * 1024 * 1024, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms  # Stands in for the network round trip to a shared cache
+        self.max_bytes = max_bytes
+        handler = type("FakeRedisHandler", (_RedisHandler,), {"service": self})
+        self.server = socketserver.ThreadingTCPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._data = OrderedDict()  # key -> (expires or None, value)
+        self._size = 0
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    @property
+    def requests(self) -> int:
+        return self._requests
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.time():
+            self._pop(key)
+            return None
+        return entry
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._size -= len(key) + len(entry[1])
+        return entry
+
+    def execute(self, command: str, args: list):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self._requests += 1
+            if command == "PING":
+                return "PONG"
+            if command in ("AUTH", "SELECT"):
+                return "OK"
+            if command == "GET":
+                entry = self._live(args[0])
+                if entry is None:
+                    return None
+                self._data.move_to_end(args[0])
+                return entry[1]
+            if command == "SET":
+                key, value, expires = args[0], args[1], None
+                options = [a.decode().upper() for a in args[2:]]
+                if "PX" in options:
+                    expires = time.time() + int(options[options.index("PX") + 1]) / 1000
+                elif "EX" in options:
+                    expires = time.time() + int(options[options.index("EX") + 1])
+                self._pop(key)
+                self._data[key] = (expires, value)
+                self._size += len(key) + len(value)
+                while self._size > self.max_bytes and self._data:
+                    self._pop(next(iter(self._data)))
+                return "OK"
+            if command == "DEL":
+                return sum(1 for key in args if self._pop(key) is not None)
+            if command == "SCAN":
+                options = [a.decode() for a in args[1:]]
+                pattern = options[options.index("MATCH") + 1] if "MATCH" in options else "*"
+                keys = [k for k in list(self._data) if self._live(k) and fnmatch.fnmatchcase(k.decode(), pattern)]
+                return [b"0", keys]  # Everything in one page
+            if command == "DBSIZE":
+                return len(self._data)
+            if command == "FLUSHDB":
+                self._data.clear()
+                self._size = 0
+                return "OK"
+        raise ValueError(f"unknown command '{command}'")
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-redis", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeServices:
+    """All stand-ins, started together."""
+
+    def __init__(self, yahoo: Behavior = None, finnhub: Behavior = None, alphavantage: Behavior = None, gemini: Behavior = None):
+        self.yahoo = FakeYahoo(yahoo)
+        self.finnhub = FakeFinnhub(finnhub)
+        self.alphavantage = FakeAlphaVantage(alphavantage)
+        self.gemini = FakeGemini(gemini)
+        self.trades = FakeTradeStream(finnhub)
+        self.redis = FakeRedis()
+        self.all = [self.yahoo, self.finnhub, self.alphavantage, self.gemini, self.trades, self.redis]
+
+    def start(self):
+        for service in self.all:
+            service.start()
+        return self
+
+    def stop(self):
+        for service in self.all:
+            service.stop()
+
+    def env(self) -> dict:
+        """Settings that point the app at these servers (read by config at import)."""
+        return {
+            "YAHOO_BASE_URL": self.yahoo.url,
+            "FINNHUB_BASE_URL": f"{self.finnhub.url}/api/v1",
+            "ALPHAVANTAGE_BASE_URL": self.alphavantage.url,
+            "GEMINI_BASE_URL": self.gemini.url,
+            "TRADE_STREAM_URL": self.trades.url,
+            "CACHE_REDIS_URL": self.redis.url,
+            "FINNHUB_API_KEY": "loadtest",
+            "ALPHAVANTAGE_API_KEY": "loadtest",
+            "GOOGLE_API_KEY": "loadtest",
+        }
+
+    def request_counts(self) -> dict:
+        return {service.name: service.requests for service in self.all}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,171 @@
+"""
+Concurrent-user load test, fully offline.
+
+Starts the fake external services, points the app at them and drives N
+simulated sessions through the Analysis, Sentiment and Agent pages.
+Reports latency percentiles per page and overall throughput.
+
+    python -m loadtest --users 20 --duration 60
+    python -m loadtest --users 50 --duration 120 --latency-ms 300 --rate-limit-rate 0.05
+    python -m loadtest --users 20 --cache redis
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+from loadtest.fake_services import Behavior, FakeServices
+
+
+def parse_mix(text: str) -> dict:
+    """'analysis=0.5,sentiment=0.3,agent=0.2' -> normalized weights."""
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items()}
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)  # page -> [(latency_seconds, ok)]
+
+    def add(self, page: str, latency: float, ok: bool):
+        with self._lock:
+            self.samples[page].append((latency, ok))
+
+    def report(self, elapsed: float) -> dict:
+        rows = {}
+        everything = []
+        for page, samples in sorted(self.samples.items()):
+            everything.extend(samples)
+            rows[page] = self._summarize(samples, elapsed)
+        rows["total"] = self._summarize(everything, elapsed)
+        return rows
+
+    @staticmethod
+    def _summarize(samples: list, elapsed: float) -> dict:
+        if not samples:
+            return {"requests": 0}
+        latencies = np.array([s[0] for s in samples]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s[1]),
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(latencies.max()), 1),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+        }
+
+
+def simulate_user(user_id: int, scenarios: dict, mix: dict, tickers: list, deadline: float,
+                  think_time: float, recorder: Recorder):
+    rng = random.Random(user_id)
+    pages, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        page = rng.choices(pages, weights)[0]
+        ticker = rng.choice(tickers)
+        started = time.perf_counter()
+        try:
+            ok = scenarios[page](ticker)
+        except Exception:
+            ok = False
+        recorder.add(page, time.perf_counter() - started, ok)
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+
+def print_report(report: dict, counts: dict, elapsed: float):
+    header = f"{'page':<10} {'reqs':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>7}"
+    print(f"\nLoad test finished in {elapsed:.1f}s")
+    print(header)
+    print("-" * len(header))
+    for page, row in report.items():
+        if not row.get("requests"):
+            continue
+        print(
+            f"{page:<10} {row['requests']:>6} {row['errors']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['max_ms']:>9} {row['throughput_rps']:>7}"
+        )
+    print("\nUpstream requests: " + ", ".join(f"{name}={n}" for name, n in counts.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline concurrent-user load test for TradeGlance.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated sessions")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+    parser.add_argument("--mix", default="analysis=0.5,sentiment=0.3,agent=0.2", help="Page weights")
+    parser.add_argument("--tickers", default="AAPL,MSFT,GOOGL,TSLA,AMZN,NVDA,META,SPY",
+                        help="Ticker pool; a larger pool means fewer cache hits")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between page views (s)")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Fake service latency")
+    parser.add_argument("--jitter-ms", type=float, default=40, help="Fake service latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of upstream 429s / throttle notes")
+    parser.add_argument("--gemini-latency-ms", type=float, default=None, help="Override latency for the LLM stand-in")
+    parser.add_argument("--real-sentiment-model", action="store_true",
+                        help="Use the configured FinBERT model instead of the offline keyword classifier")
+    parser.add_argument("--cache", choices=["memory", "disk", "redis", "none"], default="memory",
+                        help="Result cache backend; redis uses the bundled Redis-protocol stand-in")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    behavior = Behavior(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+    gemini = Behavior(args.gemini_latency_ms if args.gemini_latency_ms is not None else args.latency_ms * 5,
+                      args.jitter_ms, args.error_rate, args.rate_limit_rate)
+
+    with FakeServices(yahoo=behavior, finnhub=behavior, alphavantage=behavior, gemini=gemini) as services:
+        # Must happen before any app module (and so config) is imported
+        os.environ.update(services.env())
+        os.environ.setdefault("PREFETCH_ENABLED", "false")
+        os.environ["CACHE_BACKEND"] = args.cache
+
+        from loadtest import scenarios
+        if not args.real_sentiment_model:
+            import core.sentiment
+            core.sentiment.load_sentiment_pipeline = scenarios.KeywordClassifier
+
+        mix = parse_mix(args.mix)
+        unknown = set(mix) - set(scenarios.SCENARIOS)
+        if unknown:
+            parser.error(f"Unknown pages in --mix: {', '.join(sorted(unknown))}")
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = [
+            threading.Thread(
+                target=simulate_user,
+                args=(i, scenarios.SCENARIOS, mix, tickers, deadline, args.think_time, recorder),
+                name=f"user-{i}", daemon=True,
+            )
+            for i in range(args.users)
+        ]
+        print(f"Simulating {args.users} users for {args.duration:.0f}s (mix: {args.mix})")
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time.monotonic() - started
+
+        report = recorder.report(elapsed)
+        counts = services.request_counts()
+
+    print_report(report, counts, elapsed)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"config": vars(args), "elapsed_s": elapsed, "pages": report, "upstream_requests": counts}, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Page workloads of a simulated user. Each scenario makes the same calls the
+corresponding Streamlit page makes, through the same cached entry points,
+and reports whether the page would have rendered real content.
+App modules are imported lazily so the runner can point config at the fake
+services first.
+"""
+
+import random
+import re
+import uuid
+
+
+def analysis_page(ticker: str) -> bool:
+    """Market Analysis with the default sidebar settings: prices, indicators, forecast."""
+    from core import pipeline
+
+    df = pipeline.load_market_data(ticker)
+    if df.empty:
+        return False
+    s = pipeline.DEFAULT_FORECAST_SETTINGS
+    forecast = pipeline.generate_forecast(ticker, s["days"], s["mode"], s["scale"], s["daily"], s["weekly"], s["yearly"])
+    return not forecast.empty
+
+
+def sentiment_page(ticker: str) -> bool:
+    """Sentiment Hub: news fetch plus sentiment classification."""
+    from core import pipeline
+
+    score, label, detailed = pipeline.load_sentiment(ticker)
+    return bool(detailed) and not label.startswith("Error")
+
+
+AGENT_PROMPTS = [
+    "What's the price of {t} right now?",
+    "Is {t} overbought?",
+    "Explain what RSI means for {t}.",
+]
+
+
+def agent_page(ticker: str) -> bool:
+    """AI Agent: one turn of a fresh conversation through the LangGraph agent."""
+    from langchain_core.messages import HumanMessage
+    from core.assistant import chatbot
+
+    prompt = random.choice(AGENT_PROMPTS).format(t=ticker)
+    result = chatbot.invoke(
+        {'messages': [HumanMessage(content=prompt)]},
+        config={'configurable': {'thread_id': f"loadtest-{uuid.uuid4()}"}},
+    )
+    answer = result['messages'][-1].content
+    return bool(answer) and not re.match(r"^(Error|⚠️)", str(answer))
+
+
+SCENARIOS = {
+    "analysis": analysis_page,
+    "sentiment": sentiment_page,
+    "agent": agent_page,
+}
+
+
+class KeywordClassifier:
+    """
+    Offline replacement for the FinBERT pipeline (same call signature and
+    output shape) so the harness never downloads a model.
+    """
+    POSITIVE = ("beats", "raises", "expands", "new", "strong")
+    NEGATIVE = ("slide", "downgrade", "inquiry", "headwinds", "warns")
+
+    def __call__(self, headlines):
+        results = []
+        for h in headlines:
+            text = h.lower()
+            if any(w in text for w in self.NEGATIVE):
+                label = "negative"
+            elif any(w in text for w in self.POSITIVE):
+                label = "positive"
+            else:
+                label = "neutral"
+            results.append({"label": label, "score": 0.9})
+        return results
@@ -0,0 +1,74 @@
+"""
+Thin client for the analysis API (api/server.py). The pipeline's cached
+loaders call it instead of the local engines when config.API_BASE_URL is set,
+so Streamlit replicas only render while compute nodes fit models. Errors
+raise; callers log them and fall back to empty results as they do for local
+failures.
+"""
+
+import threading
+import pandas as pd
+import requests
+from core.codec import decode_series
+from core.series import PriceSeries
+import config
+
+
+class ApiClient:
+    def __init__(self, base_url: str = None, timeout: float = None):
+        self.base_url = (base_url or config.API_BASE_URL).rstrip("/")
+        self.timeout = timeout or config.API_TIMEOUT_SECONDS
+        # One pooled session per process; requests.Session is safe for concurrent GETs
+        self.session = requests.Session()
+
+    def _get(self, path: str, **params):
+        r = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return r.json()
+
+    def _series(self, path: str, **params) -> PriceSeries:
+        payload = self._get(path, **params)
+        return decode_series(payload) if payload else PriceSeries.empty()
+
+    def ohlcv(self, ticker: str, period: str = "1y") -> PriceSeries:
+        return self._series(f"/v1/ohlcv/{ticker}", period=period)
+
+    def market_data(self, ticker: str) -> PriceSeries:
+        return self._series(f"/v1/market/{ticker}")
+
+    def forecast(self, ticker, days, mode, scale, daily, weekly, yearly) -> PriceSeries:
+        return self._series(
+            f"/v1/forecast/{ticker}",
+            days=days, mode=mode, scale=scale, daily=str(daily).lower(),
+            weekly=str(weekly).lower(), yearly=str(yearly).lower(),
+        )
+
+    def sentiment(self, ticker: str):
+        """(score, label, detailed) like SentimentEngine.analyze."""
+        payload = self._get(f"/v1/sentiment/{ticker}") or {}
+        detailed = [tuple(item) for item in payload.get("detailed") or []]
+        return payload.get("score", 0), payload.get("label", "Neutral 😐"), detailed
+
+    def backtest(self, ticker: str) -> dict:
+        result = self._get(f"/v1/backtest/{ticker}") or {}
+        if result:
+            result['equity_curve'] = pd.Series(result['equity_curve'])
+        return result
+
+    def health(self) -> dict:
+        return self._get("/health")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_api_client() -> ApiClient:
+    """Shared client for this process."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
@@ -1,9 +1,17 @@
 import finnhub
 from datetime import datetime, timedelta
 from core.logger import get_logger
+import config
 
 logger = get_logger(__name__)
 
+def create_client(api_key: str) -> finnhub.Client:
+    """Finnhub client, pointed at config.FINNHUB_BASE_URL when one is set."""
+    client = finnhub.Client(api_key=api_key)
+    if config.FINNHUB_BASE_URL:
+        client.API_URL = config.FINNHUB_BASE_URL.rstrip("/")
+    return client
+
 def fetch_company_news(ticker: str, api_key: str, days: int = 7) -> list:
     """
     Fetches company news from Finnhub for the last N days.
@@ -17,7 +25,7 @@ def fetch_company_news(ticker: str, api_key: str, days: int = 7) -> list:
         return []
     
     try:
-        finnhub_client = finnhub.Client(api_key=api_key)
+        finnhub_client = create_client(api_key)
         
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
@@ -0,0 +1,267 @@
+"""
+Streaming trade ingestion.
+Consumes a trades websocket in Finnhub's message format
+({"type": "trade", "data": [{"s", "p", "t", "v"}]}) on a background thread
+and keeps, per symbol, a fixed-size ring buffer of raw trades plus live
+1-minute bars. Last price and intraday bars are then served from memory.
+The endpoint is configurable, so a local stand-in (loadtest.fake_services)
+can replace Finnhub.
+"""
+
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from core.logger import get_logger
+from core.market_calendar import is_crypto
+import config
+
+logger = get_logger(__name__)
+
+TRADE_CAPACITY = 4096  # Raw trades kept per symbol
+BAR_CAPACITY = 1440  # One day of 1-minute bars per symbol
+MINUTE_MS = 60_000
+
+
+def to_stream_symbol(ticker: str) -> str:
+    """App ticker -> Finnhub stream symbol (crypto pairs trade on Binance in USDT)."""
+    ticker = ticker.upper()
+    if is_crypto(ticker):
+        return f"BINANCE:{ticker[:-4]}USDT"
+    return ticker
+
+
+class SymbolBuffer:
+    """
+    Ring buffers for one symbol. Appends are O(1) and never allocate;
+    reads return copies in chronological order.
+    """
+
+    def __init__(self, trade_capacity: int = TRADE_CAPACITY, bar_capacity: int = BAR_CAPACITY):
+        self.trade_time = np.zeros(trade_capacity, dtype=np.int64)  # epoch ms
+        self.trade_price = np.zeros(trade_capacity, dtype=np.float64)
+        self.trade_volume = np.zeros(trade_capacity, dtype=np.float64)
+        self.trade_count = 0
+
+        # Columns: open, high, low, close, volume; bar_time holds the minute start (epoch ms)
+        self.bar_time = np.zeros(bar_capacity, dtype=np.int64)
+        self.bars = np.zeros((bar_capacity, 5), dtype=np.float64)
+        self.bar_count = 0
+
+        self.last_price = None
+        self.last_time = None
+        self.lock = threading.Lock()
+
+    def add(self, price: float, ts_ms: int, volume: float):
+        with self.lock:
+            i = self.trade_count % len(self.trade_time)
+            self.trade_time[i] = ts_ms
+            self.trade_price[i] = price
+            self.trade_volume[i] = volume
+            self.trade_count += 1
+
+            minute = ts_ms - ts_ms % MINUTE_MS
+            current = (self.bar_count - 1) % len(self.bar_time)
+            if self.bar_count and self.bar_time[current] == minute:
+                bar = self.bars[current]
+                bar[1] = max(bar[1], price)
+                bar[2] = min(bar[2], price)
+                bar[3] = price
+                bar[4] += volume
+            elif self.bar_count and minute < self.bar_time[current]:
+                pass  # Late trade for a closed bar: kept as a trade, bars stay final
+            else:
+                j = self.bar_count % len(self.bar_time)
+                self.bar_time[j] = minute
+                self.bars[j] = (price, price, price, price, volume)
+                self.bar_count += 1
+
+            if self.last_time is None or ts_ms >= self.last_time:
+                self.last_price, self.last_time = price, ts_ms
+
+    @staticmethod
+    def _ordered(count: int, *arrays):
+        capacity = len(arrays[0])
+        if count <= capacity:
+            return [a[:count].copy() for a in arrays]
+        start = count % capacity
+        return [np.concatenate([a[start:], a[:start]]) for a in arrays]
+
+    def trades(self) -> pd.DataFrame:
+        with self.lock:
+            t, p, v = self._ordered(self.trade_count, self.trade_time, self.trade_price, self.trade_volume)
+        return pd.DataFrame({"Price": p, "Volume": v}, index=pd.to_datetime(t, unit="ms"))
+
+    def minute_bars(self) -> pd.DataFrame:
+        with self.lock:
+            t, bars = self._ordered(self.bar_count, self.bar_time, self.bars)
+        df = pd.DataFrame(bars, columns=["Open", "High", "Low", "Close", "Volume"], index=pd.to_datetime(t, unit="ms"))
+        df.index.name = "Date"
+        return df
+
+
+class TradeStore:
+    def __init__(self, trade_capacity: int = TRADE_CAPACITY, bar_capacity: int = BAR_CAPACITY):
+        self.trade_capacity = trade_capacity
+        self.bar_capacity = bar_capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, symbol: str) -> SymbolBuffer:
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(symbol, SymbolBuffer(self.trade_capacity, self.bar_capacity))
+        return buffer
+
+    def add_trades(self, trades: list):
+        for trade in trades:
+            try:
+                self._buffer(trade["s"]).add(float(trade["p"]), int(trade["t"]), float(trade.get("v") or 0))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Skipping malformed trade {trade}: {e}")
+
+    def last_price(self, symbol: str, max_age_seconds: float = None):
+        """(price, epoch ms) of the latest trade, or None if unknown or older than max_age_seconds."""
+        buffer = self._buffers.get(symbol)
+        if buffer is None or buffer.last_price is None:
+            return None
+        price, ts = buffer.last_price, buffer.last_time
+        if max_age_seconds is not None and time.time() * 1000 - ts > max_age_seconds * 1000:
+            return None
+        return price, ts
+
+    def minute_bars(self, symbol: str) -> pd.DataFrame:
+        buffer = self._buffers.get(symbol)
+        return buffer.minute_bars() if buffer else pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+
+    def trades(self, symbol: str) -> pd.DataFrame:
+        buffer = self._buffers.get(symbol)
+        return buffer.trades() if buffer else pd.DataFrame(columns=["Price", "Volume"])
+
+    def symbols(self) -> list:
+        return list(self._buffers)
+
+
+class TradeStream:
+    def __init__(self, url: str = None, token: str = None, store: TradeStore = None):
+        """
+        url: websocket endpoint (config.TRADE_STREAM_URL, Finnhub by default).
+        token: API token appended as ?token=... when given.
+        """
+        self.url = url or config.TRADE_STREAM_URL
+        self.token = token if token is not None else config.FINNHUB_API_KEY
+        self.store = store or TradeStore()
+        self._symbols = set()
+        self._ws = None
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ---- subscriptions -------------------------------------------------
+
+    def subscribe(self, tickers):
+        """Adds symbols; sent immediately when connected, otherwise on (re)connect."""
+        symbols = {to_stream_symbol(t) for t in ([tickers] if isinstance(tickers, str) else tickers)}
+        with self._lock:
+            new = symbols - self._symbols
+            self._symbols |= new
+        if self._connected.is_set():
+            for symbol in new:
+                self._send({"type": "subscribe", "symbol": symbol})
+        return self
+
+    def _send(self, message: dict):
+        try:
+            self._ws.send(json.dumps(message))
+        except Exception as e:
+            logger.warning(f"Trade stream send failed: {e}")
+
+    # ---- lifecycle -----------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self._loop, name="trade-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._ws:
+            self._ws.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def _loop(self):
+        import websocket  # websocket-client; only needed when streaming is enabled
+
+        url = f"{self.url}?token={self.token}" if self.token else self.url
+        backoff = 1.0
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=lambda ws, e: logger.warning(f"Trade stream error: {e}"),
+                on_close=lambda ws, code, msg: self._connected.clear(),
+            )
+            started = time.monotonic()
+            self._ws.run_forever(ping_interval=20, ping_timeout=10)
+            self._connected.clear()
+            if self._stop.is_set():
+                break
+            # Reset the backoff after a connection that lived a while
+            backoff = 1.0 if time.monotonic() - started > 60 else min(backoff * 2, 60)
+            logger.info(f"Trade stream disconnected; reconnecting in {backoff:.0f}s")
+            self._stop.wait(backoff)
+
+    def _on_open(self, ws):
+        self._connected.set()
+        with self._lock:
+            symbols = sorted(self._symbols)
+        for symbol in symbols:
+            self._send({"type": "subscribe", "symbol": symbol})
+        logger.info(f"Trade stream connected, subscribed to {len(symbols)} symbols")
+
+    def _on_message(self, ws, message):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+        if payload.get("type") == "trade":
+            self.store.add_trades(payload.get("data") or [])
+
+    # ---- reads ---------------------------------------------------------
+
+    def last_price(self, ticker: str, max_age_seconds: float = None):
+        return self.store.last_price(to_stream_symbol(ticker), max_age_seconds)
+
+    def minute_bars(self, ticker: str) -> pd.DataFrame:
+        return self.store.minute_bars(to_stream_symbol(ticker))
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def get_trade_stream() -> TradeStream:
+    """Process-wide stream shared by every session (not started until start())."""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = TradeStream()
+        return _stream
+
+
+def get_live_price(ticker: str, max_age_seconds: float = None):
+    """Latest streamed price, or None when the stream has no fresh trade for the ticker."""
+    if _stream is None:
+        return None
+    max_age = config.TRADE_STREAM_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    hit = _stream.last_price(ticker, max_age)
+    return hit[0] if hit else None
@@ -1,6 +1,10 @@
-import yfinance as yf
 import pandas as pd
 from core.logger import get_logger
+from core.market import fetch_ohlcv
+from core.cache import cached
+from core.market_calendar import expires_in, history_period
+from services.trade_stream import get_live_price
+import config
 
 logger = get_logger(__name__)
 
@@ -14,20 +18,13 @@ def fetch_historical_data(ticker: str, period: str = "1y") -> pd.DataFrame:
         return pd.DataFrame()
 
     try:
-        stock = yf.Ticker(ticker)
-        
-        # Add basic validation that ticker exists by checking info property lightly?
-        # yfinance can be slow with .info, so we skip that and just try history.
-        
-        df = stock.history(period=period)
+        # Shares the single download path with the Analysis page
+        df = fetch_ohlcv(ticker, period=period)
         
         if df.empty:
             logger.warning(f"No data returned for ticker: {ticker} (period={period})")
             return pd.DataFrame()
         
-        # Remove timezone to simplify downstream processing
-        df.index = df.index.tz_localize(None)
-        
         logger.info(f"Successfully fetched {len(df)} rows for {ticker}")
         return df
         
@@ -37,22 +34,34 @@ def fetch_historical_data(ticker: str, period: str = "1y") -> pd.DataFrame:
 
 def fetch_current_price(ticker: str) -> float:
     """
-    Fetches the latest available close price.
+    Latest price: from the in-memory trade stream when it has a fresh trade,
+    otherwise the last close of a single short history request.
     Returns 0.0 on failure.
     """
     if not ticker:
         return 0.0
 
+    live = get_live_price(ticker)
+    if live is not None:
+        return float(live)
+    return fetch_last_close(ticker)
+
+@cached(
+    "quotes",
+    key=lambda ticker: ("last_close", ticker.upper()),
+    ttl=lambda ticker: expires_in(ticker, config.QUOTE_REFRESH_SECONDS),
+    should_cache=lambda price: price > 0,
+)
+def fetch_last_close(ticker: str) -> float:
+    """
+    Last close from one history request sized by the market calendar:
+    '1d' once today's session has opened, '5d' before the open, on
+    weekends and on holidays. Goes through core.market.fetch_ohlcv, so it
+    uses the configured endpoint (YAHOO_BASE_URL) like every other price
+    download. Cached until the next price can exist.
+    """
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="1d") # 5d is safer for weekends/holidays? 1d usually works if market open or data exists. 
-        # Actually 1d might be empty if called on Sunday morning before pre-market? 
-        # safe choice: try fetching slightly more and take last.
-        
-        if df.empty:
-            # try 5d just in case of long weekend
-            df = stock.history(period="5d")
-            
+        df = fetch_ohlcv(ticker, period=history_period(ticker))
         if not df.empty:
             price = df['Close'].iloc[-1]
             return float(price)
@@ -1,54 +1,43 @@
+from concurrent.futures import wait
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from core.forecast import ForecastEngine
-from core.market import fetch_price_data
-from core.indicators import add_all_indicators
-from ui.charts import render_candlestick_chart, render_forecast_chart
+import config
+from core.pipeline import (
+    load_market_data, load_timeframe_data, generate_forecast, generate_tuned_forecast, generate_monte_carlo,
+    INTRADAY_TIMEFRAMES, DAILY_TIMEFRAMES,
+)
+from core.jobs import get_job_runner
+from db.sqlite import log_search
+from services.trade_stream import get_trade_stream
+from ui.charts import (
+    MAX_POINTS,
+    render_candlestick_chart,
+    render_forecast_chart,
+    render_rsi_chart,
+    render_macd_chart,
+    render_sma_chart,
+)
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
-@st.cache_data(ttl=3600)
-def load_market_data(t):
-    try:
-        df = fetch_price_data(t)
-        if not df.empty:
-            df = add_all_indicators(df)
-        return df
-    except Exception as e:
-        logger.error(f"Error loading market data for {t}: {e}")
-        return pd.DataFrame()
-
-@st.cache_data(ttl=3600)
-def generate_forecast(df, days, mode, scale, daily, weekly, yearly):
-    try:
-        engine = ForecastEngine(
-            days=days,
-            seasonality_mode=mode,
-            changepoint_prior_scale=scale,
-            daily_seasonality=daily,
-            weekly_seasonality=weekly,
-            yearly_seasonality=yearly
-        )
-        return engine.predict(df)
-    except Exception as e:
-        logger.error(f"Forecast generation error: {e}")
-        return pd.DataFrame()
+FORECAST_POLL_SECONDS = 0.5
 
 def render_analysis_page():
     # -------------------------------------------------
     # SIDEBAR CONTROLS
     # -------------------------------------------------
     st.sidebar.markdown("### Forecast Settings")
-    forecast_days = st.sidebar.slider("Horizon (Days)", 7, 90, 30)
+    forecast_days = st.sidebar.slider("Horizon (Days)", 7, 90, 30, help="Calendar days ahead, for both the Prophet forecast and the Monte Carlo simulation.")
     
     with st.sidebar.expander("Advanced Tuning"):
-        seasonality_mode = st.selectbox("Seasonality Mode", ["additive", "multiplicative"])
-        prior_scale = st.slider("Trend Flexibility", 0.01, 0.5, 0.05, 0.01)
-        daily_season = st.checkbox("Daily Seasonality", True)
-        weekly_season = st.checkbox("Weekly Seasonality", True)
-        yearly_season = st.checkbox("Yearly Seasonality", True)
+        auto_tune = st.checkbox("Auto-tune (cross-validated)", False,
+                                help="Searches the settings below per ticker in the background. Results are reused for a day.")
+        seasonality_mode = st.selectbox("Seasonality Mode", ["additive", "multiplicative"], disabled=auto_tune)
+        prior_scale = st.slider("Trend Flexibility", 0.01, 0.5, 0.05, 0.01, disabled=auto_tune)
+        daily_season = st.checkbox("Daily Seasonality", True, disabled=auto_tune)
+        weekly_season = st.checkbox("Weekly Seasonality", True, disabled=auto_tune)
+        yearly_season = st.checkbox("Yearly Seasonality", True, disabled=auto_tune)
 
     # -------------------------------------------------
     # MAIN CONTENT
@@ -65,8 +54,7 @@ def render_analysis_page():
     
     with col_input:
         if selection_mode == "Quick Select":
-            TOP_STOCKS = ["AAPL", "MSFT", "GOOGL", "TSLA", "AMZN", "NVDA", "META", "SPY", "BTC-USD", "ETH-USD"]
-            ticker = st.selectbox("Select Asset", options=TOP_STOCKS, index=0, label_visibility="collapsed")
+            ticker = st.selectbox("Select Asset", options=config.TOP_STOCKS, index=0, label_visibility="collapsed")
         else:
             ticker = st.text_input("Ticker Symbol", "AAPL", label_visibility="collapsed").upper()
             st.caption("Don't know the ticker? [Search on Yahoo Finance](https://finance.yahoo.com/lookup)")
@@ -79,98 +67,201 @@ def render_analysis_page():
     
     if run_btn:
         st.session_state.analysis_ticker = ticker
+        try:
+            log_search(ticker)
+        except Exception as e:
+            logger.error(f"Could not log search for {ticker}: {e}")
+        if config.TRADE_STREAM_ENABLED:
+            get_trade_stream().subscribe(ticker)
     
     if st.session_state.analysis_ticker == ticker:
-        with st.spinner(f"Analyzing {ticker}..."):
-            try:
-                df = load_market_data(ticker)
-                
-                if df is None or df.empty:
-                    st.error(f"❌ Could not fetch data for '{ticker}'.")
-                    st.warning("Possible causes:\n1. Invalid Ticker Symbol.\n2. Internet Connection Issue.\n3. API Rate Limit (wait a moment).")
-                    return
-
-                # Calculate Metrics
-                latest_price = df['y'].iloc[-1]
-                prev_price = df['y'].iloc[-2]
-                change = latest_price - prev_price
-                pct_change = (change / prev_price) * 100
-                
-                # Metrics Row
-                col1, col2, col3 = st.columns(3)
-                col1.metric("Latest Closing Price", f"${latest_price:,.2f}", f"{change:+.2f} ({pct_change:+.2f}%)")
-                col2.metric("Historical Samples", len(df))
-                col3.metric("Forecast Range", f"{forecast_days} Days")
-                
-                st.markdown("---")
-                
-                # Tabs
-                tab_overview, tab_forecast, tab_tech, tab_raw = st.tabs(["Overview", "AI Forecast", "Technical Indicators", "Raw Data"])
-                
-                with tab_overview:
-                    st.subheader("Price Action")
-                    fig_price = render_candlestick_chart(df, f"{ticker} Price History")
-                    st.plotly_chart(fig_price, use_container_width=True)
-                
-                with tab_forecast:
-                    st.subheader("Prophet Model Projection")
-                    
-                    forecast = generate_forecast(
-                        df, forecast_days, seasonality_mode, prior_scale, 
-                        daily_season, weekly_season, yearly_season
-                    )
-                    
-                    if forecast.empty:
-                        st.warning("⚠️ Not enough data to generate a reliable forecast.")
-                    else:
-                        last_pred = forecast['yhat'].iloc[-1]
-                        expected_change = last_pred - latest_price
-                        expected_pct = (expected_change / latest_price) * 100
-                        direction = "Bullish" if expected_change > 0 else "Bearish"
-                        
-                        m1, m2 = st.columns(2)
-                        m1.metric("Target Price (Forecast)", f"${last_pred:,.2f}")
-                        m2.metric("Expected Return", f"{direction} {expected_pct:+.2f}%")
-                        
-                        fig_forecast = render_forecast_chart(df, forecast)
-                        st.plotly_chart(fig_forecast, use_container_width=True)
-
-                with tab_tech:
-                    st.subheader("Technical Indicators")
-                    
-                    # RSI Chart
-                    if 'RSI_14' in df.columns:
-                        fig_rsi = go.Figure()
-                        fig_rsi.add_trace(go.Scatter(x=df['ds'], y=df['RSI_14'], name='RSI', line=dict(color='purple')))
-                        fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
-                        fig_rsi.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
-                        fig_rsi.update_layout(title="Relative Strength Index (RSI)", template="plotly_dark", height=300)
-                        st.plotly_chart(fig_rsi, use_container_width=True)
-                    
-                    # MACD Chart
-                    if 'MACD_12_26_9' in df.columns:
-                        fig_macd = go.Figure()
-                        fig_macd.add_trace(go.Scatter(x=df['ds'], y=df['MACD_12_26_9'], name='MACD', line=dict(color='blue')))
-                        fig_macd.add_trace(go.Scatter(x=df['ds'], y=df['MACDs_12_26_9'], name='Signal', line=dict(color='orange')))
-                        fig_macd.add_bar(x=df['ds'], y=df['MACDh_12_26_9'], name='Hist')
-                        fig_macd.update_layout(title="MACD", template="plotly_dark", height=300)
-                        st.plotly_chart(fig_macd, use_container_width=True)
-                    
-                    # SMA Chart (New)
-                    if 'SMA_20' in df.columns or 'SMA_50' in df.columns:
-                        fig_sma = go.Figure()
-                        fig_sma.add_trace(go.Scatter(x=df['ds'], y=df['y'], name='Price', line=dict(color='white', width=1)))
-                        if 'SMA_20' in df.columns:
-                            fig_sma.add_trace(go.Scatter(x=df['ds'], y=df['SMA_20'], name='SMA 20', line=dict(color='cyan')))
-                        if 'SMA_50' in df.columns:
-                            fig_sma.add_trace(go.Scatter(x=df['ds'], y=df['SMA_50'], name='SMA 50', line=dict(color='magenta')))
-                        fig_sma.update_layout(title="Simple Moving Averages (SMA)", template="plotly_dark", height=300)
-                        st.plotly_chart(fig_sma, use_container_width=True)
-
-                with tab_raw:
-                    st.dataframe(df.tail(100), use_container_width=True)
-                    
-            except Exception as e:
-                logger.error(f"Analysis Page Error: {e}")
-                st.error(f"An unexpected error occurred: {e}")
+        try:
+            jobs = get_job_runner()
+            with st.spinner(f"Loading {ticker} prices..."):
+                df = jobs.submit(("market", ticker), load_market_data, ticker).result()
+            
+            if df is None or df.empty:
+                st.error(f"❌ Could not fetch data for '{ticker}'.")
+                st.warning("Possible causes:\n1. Invalid Ticker Symbol.\n2. Internet Connection Issue.\n3. API Rate Limit (wait a moment).")
+                return
+
+            # Start the forecast right away so it is ready (or close) when its view is opened
+            forecast_args = (forecast_days, seasonality_mode, prior_scale, daily_season, weekly_season, yearly_season)
+            submit_forecast(ticker, forecast_args, auto_tune)
+
+            # Calculate Metrics
+            latest_price = df['y'].iloc[-1]
+            prev_price = df['y'].iloc[-2]
+            change = latest_price - prev_price
+            pct_change = (change / prev_price) * 100
+            
+            # Metrics Row
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Latest Closing Price", f"${latest_price:,.2f}", f"{change:+.2f} ({pct_change:+.2f}%)")
+            col2.metric("Historical Samples", len(df))
+            col3.metric("Forecast Range", f"{forecast_days} Days")
+            
+            st.markdown("---")
+            
+            # Views: only the selected one builds its figures (st.tabs would run all four)
+            view = st.radio(
+                "View", ["Overview", "AI Forecast", "Technical Indicators", "Raw Data"],
+                horizontal=True, label_visibility="collapsed", key="analysis_view"
+            )
+            
+            if view in ("Overview", "Technical Indicators"):
+                chart_df = select_timeframe(ticker, df)
+                chart_df = select_visible_window(chart_df, st.session_state.analysis_timeframe)
+
+            if view == "Overview":
+                st.subheader("Price Action")
+                fig_price = render_candlestick_chart(chart_df, f"{ticker} Price History")
+                st.plotly_chart(fig_price, use_container_width=True)
+            
+            elif view == "AI Forecast":
+                st.subheader("Prophet Model Projection")
+                render_forecast_view(ticker, df, forecast_args, auto_tune)
+
+            elif view == "Technical Indicators":
+                st.subheader("Technical Indicators")
+                render_technical_view(chart_df)
+
+            elif view == "Raw Data":
+                st.dataframe(df.tail(100), use_container_width=True)
                 
+        except Exception as e:
+            logger.error(f"Analysis Page Error: {e}")
+            st.error(f"An unexpected error occurred: {e}")
+
+
+def forecast_job_key(ticker, forecast_args, auto_tune=False) -> tuple:
+    if auto_tune:
+        return ("forecast", ticker, forecast_args[0], "auto")
+    return ("forecast", ticker) + tuple(forecast_args)
+
+
+def submit_forecast(ticker, forecast_args, auto_tune=False):
+    """Starts (or joins) the forecast job for these settings."""
+    jobs = get_job_runner()
+    key = forecast_job_key(ticker, forecast_args, auto_tune)
+    if auto_tune:
+        return jobs.submit(key, generate_tuned_forecast, ticker, forecast_args[0])
+    return jobs.submit(key, generate_forecast, ticker, *forecast_args)
+
+
+@st.fragment
+def render_forecast_view(ticker, df, forecast_args, auto_tune=False):
+    """
+    Polls the background forecast job and fills in the view when it finishes.
+    Only this fragment reruns while waiting; the rest of the page stays put.
+    """
+    # The session keeps the job it is polling, so polls never resubmit it.
+    # A finished job is dropped once shown: the next page run submits again
+    # and is answered from the forecast and tuning caches.
+    key = forecast_job_key(ticker, forecast_args, auto_tune)
+    pending = st.session_state.setdefault("forecast_jobs", {})
+    future = pending.get(key)
+    if future is None:
+        future = submit_forecast(ticker, forecast_args, auto_tune)
+        pending.clear()  # Only the current settings are worth waiting for
+        pending[key] = future
+    wait([future], timeout=FORECAST_POLL_SECONDS)
+    
+    if not future.done():
+        if auto_tune:
+            st.info("⏳ Auto-tuning and fitting the forecast model in the background...")
+        else:
+            st.info("⏳ Fitting the forecast model in the background...")
+        st.rerun(scope="fragment")
+        return
+
+    pending.pop(key, None)
+    forecast = future.result() if future.exception() is None else pd.DataFrame()
+    
+    if forecast.empty:
+        st.warning("⚠️ Not enough data to generate a reliable forecast.")
+        return
+
+    latest_price = df['y'].iloc[-1]
+    last_pred = forecast['yhat'].iloc[-1]
+    expected_change = last_pred - latest_price
+    expected_pct = (expected_change / latest_price) * 100
+    direction = "Bullish" if expected_change > 0 else "Bearish"
+    
+    m1, m2 = st.columns(2)
+    m1.metric("Target Price (Forecast)", f"${last_pred:,.2f}")
+    m2.metric("Expected Return", f"{direction} {expected_pct:+.2f}%")
+    
+    fig_forecast = render_forecast_chart(df, forecast)
+    st.plotly_chart(fig_forecast, use_container_width=True)
+
+    with st.expander("Monte Carlo Simulation"):
+        render_monte_carlo(ticker, df, forecast_args[0])
+
+
+def render_monte_carlo(ticker, df, days):
+    c1, c2 = st.columns(2)
+    method = c1.selectbox("Model", ["gbm", "bootstrap"], format_func=lambda m: "Geometric Brownian Motion" if m == "gbm" else "Bootstrapped Returns")
+    n_paths = c2.select_slider("Paths", options=[5000, 10000, 20000, 50000, 100000], value=20000)
+
+    result = generate_monte_carlo(ticker, days, method, n_paths)
+    mc_forecast = result.get('forecast') if result else None
+    if mc_forecast is None or mc_forecast.empty:
+        st.warning("⚠️ Not enough data to run the simulation.")
+        return
+
+    fig_mc = render_forecast_chart(df, mc_forecast)
+    fig_mc.update_layout(title=dict(text=f"Monte Carlo Fan ({result['paths']:,} paths, 5-95%)"))
+    st.plotly_chart(fig_mc, use_container_width=True)
+
+    latest_price = df['y'].iloc[-1]
+    cols = st.columns(len(result['touch']))
+    for col, (level, prob) in zip(cols, sorted(result['touch'].items())):
+        move = (level / latest_price - 1) * 100
+        col.metric(f"Touch {move:+.0f}% (${level:,.2f})", f"{prob:.1%}")
+
+
+def render_technical_view(df):
+    if 'RSI_14' in df.columns:
+        st.plotly_chart(render_rsi_chart(df), use_container_width=True)
+    
+    if 'MACD_12_26_9' in df.columns:
+        st.plotly_chart(render_macd_chart(df), use_container_width=True)
+    
+    if 'SMA_20' in df.columns or 'SMA_50' in df.columns:
+        st.plotly_chart(render_sma_chart(df), use_container_width=True)
+
+
+def select_timeframe(ticker, df):
+    """
+    Bar size control for the charts. Every timeframe is aggregated from the
+    same cached downloads, so switching does not refetch.
+    """
+    timeframe = st.radio(
+        "Timeframe", INTRADAY_TIMEFRAMES + DAILY_TIMEFRAMES, index=len(INTRADAY_TIMEFRAMES),
+        horizontal=True, key="analysis_timeframe"
+    )
+    if timeframe == "1d":
+        return df
+    tf_df = load_timeframe_data(ticker, timeframe)
+    if tf_df.empty:
+        st.warning(f"No {timeframe} bars available for {ticker}; showing daily bars.")
+        return df
+    return tf_df
+
+
+def select_visible_window(df, timeframe="1d"):
+    """
+    Date range control for long histories. Charts are decimated to a few
+    thousand points, so narrowing the window brings back full resolution.
+    """
+    if len(df) <= MAX_POINTS:
+        return df
+    dates = pd.to_datetime(df['ds']).dt.to_pydatetime()
+    start, end = st.slider(
+        "Visible Range", min_value=dates[0], max_value=dates[-1],
+        value=(dates[0], dates[-1]), key=f"analysis_window_{timeframe}",
+        format="YYYY-MM-DD" if timeframe in DAILY_TIMEFRAMES else "YYYY-MM-DD HH:mm",
+    )
+    mask = (pd.to_datetime(df['ds']) >= start) & (pd.to_datetime(df['ds']) <= end)
+    return df.loc[mask]
@@ -1,58 +1,121 @@
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+from core.downsample import downsample_indices
+
+# Above this many points per chart we decimate on the server
+MAX_POINTS = 2000
+# Above this many rendered points a trace switches to WebGL
+WEBGL_THRESHOLD = 1000
+
+def decimate(df: pd.DataFrame, column: str = 'y', max_points: int = MAX_POINTS, method: str = "lttb") -> pd.DataFrame:
+    """
+    Returns the rows of df that preserve the shape of `column`.
+    All other columns (overlays) are sampled at the same rows so x stays aligned.
+    """
+    if df is None or len(df) <= max_points or column not in df.columns:
+        return df
+    idx = downsample_indices(df[column].to_numpy(), max_points, method=method)
+    return df.iloc[idx]
+
+def line_trace(x, y, **kwargs):
+    """go.Scatter for short series, go.Scattergl (WebGL) for long ones."""
+    trace_cls = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace_cls(x=x, y=y, **kwargs)
+
+def aggregate_ohlcv(df: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """
+    Merges consecutive bars into wider candles so at most `max_points` remain.
+    Unlike point sampling this keeps every high and low visible.
+    """
+    if df is None or len(df) <= max_points:
+        return df
+    width = -(-len(df) // max_points)  # ceil division
+    agg = {col: 'last' for col in df.columns}
+    agg.update({'ds': 'first', 'Open': 'first', 'High': 'max', 'Low': 'min', 'y': 'last'})
+    if 'Volume' in df.columns:
+        agg['Volume'] = 'sum'
+    groups = np.arange(len(df)) // width
+    return df.groupby(groups).agg(agg).reset_index(drop=True)
 
 def render_candlestick_chart(df: pd.DataFrame, title: str = "Price Action"):
     """
     Renders an interactive candlestick chart.
     Assuming df has 'ds' (Date), 'Open', 'High', 'Low', 'y' (Close/Price).
-    If 'y' is close, and we don't have OHL, we fallback to Line.
+    With 'Volume' a volume panel is added; without OHL we fallback to an area line.
     """
-    fig = go.Figure()
-    
-    # Check if we have OHL data. core/market.py fetches everything but might strictly return ds, y.
-    # Let's check the user's market.py. It returns df[["ds", "y"]].
-    # So we only have Close price. We can only do a Line chart for now unless we change market.py.
-    # But user said "dont write code for new things".
-    # I will stick to Line chart but make it pretty (Area chart).
-    
-    fig.add_trace(go.Scatter(
-        x=df['ds'], 
-        y=df['y'],
-        mode='lines',
-        name='Price',
-        line=dict(color='#2962FF', width=2),
-        fill='tozeroy',
-        fillcolor='rgba(41, 98, 255, 0.1)'
-    ))
+    has_ohlc = all(col in df.columns for col in ('Open', 'High', 'Low'))
+    has_volume = has_ohlc and 'Volume' in df.columns
+
+    if has_volume:
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    else:
+        fig = go.Figure()
+    price_pos = dict(row=1, col=1) if has_volume else {}
+
+    if has_ohlc:
+        df = aggregate_ohlcv(df)
+        fig.add_trace(go.Candlestick(
+            x=df['ds'],
+            open=df['Open'],
+            high=df['High'],
+            low=df['Low'],
+            close=df['y'],
+            name='Price',
+            increasing_line_color='#26A69A',
+            decreasing_line_color='#EF5350'
+        ), **price_pos)
+    else:
+        df = decimate(df)
+        fig.add_trace(line_trace(
+            df['ds'], 
+            df['y'],
+            mode='lines',
+            name='Price',
+            line=dict(color='#2962FF', width=2),
+            fill='tozeroy',
+            fillcolor='rgba(41, 98, 255, 0.1)'
+        ))
     
     # Add SMA Overlays if present
     if 'SMA_20' in df.columns:
-        fig.add_trace(go.Scatter(
-            x=df['ds'], 
-            y=df['SMA_20'],
+        fig.add_trace(line_trace(
+            df['ds'], 
+            df['SMA_20'],
             mode='lines',
             name='SMA 20',
             line=dict(color='#FFA726', width=1.5)
-        ))
+        ), **price_pos)
         
     if 'SMA_50' in df.columns:
-        fig.add_trace(go.Scatter(
-            x=df['ds'], 
-            y=df['SMA_50'],
+        fig.add_trace(line_trace(
+            df['ds'], 
+            df['SMA_50'],
             mode='lines',
             name='SMA 50',
             line=dict(color='#EF5350', width=1.5)
-        ))
+        ), **price_pos)
+
+    if has_volume:
+        up = df['y'] >= df['Open']
+        fig.add_trace(go.Bar(
+            x=df['ds'],
+            y=df['Volume'],
+            name='Volume',
+            marker_color=np.where(up, 'rgba(38, 166, 154, 0.5)', 'rgba(239, 83, 80, 0.5)'),
+            showlegend=False
+        ), row=2, col=1)
     
     fig.update_layout(
         title=dict(text=title, font=dict(size=20, color='white')),
         template="plotly_dark",
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=False),
+        xaxis=dict(showgrid=False, rangeslider=dict(visible=False)),
         yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)'),
         margin=dict(l=0, r=0, t=40, b=0),
-        height=400,
+        height=500 if has_volume else 400,
         hovermode="x unified"
     )
     return fig
@@ -62,36 +125,38 @@ def render_forecast_chart(history_df, forecast_df):
     Combines historical data with Prophet forecast.
     """
     fig = go.Figure()
+    history_df = decimate(history_df)
+    forecast_df = decimate(forecast_df, 'yhat')
 
     # Historical
-    fig.add_trace(go.Scatter(
-        x=history_df['ds'],
-        y=history_df['y'],
+    fig.add_trace(line_trace(
+        history_df['ds'],
+        history_df['y'],
         name="Historical",
         line=dict(color='rgba(255, 255, 255, 0.5)', width=1.5)
     ))
 
     # Forecast
-    fig.add_trace(go.Scatter(
-        x=forecast_df['ds'],
-        y=forecast_df['yhat'],
+    fig.add_trace(line_trace(
+        forecast_df['ds'],
+        forecast_df['yhat'],
         name="Forecast",
         line=dict(color='#00E676', width=2)
     ))
 
     # Confidence Interval
-    fig.add_trace(go.Scatter(
-        x=forecast_df['ds'],
-        y=forecast_df['yhat_upper'],
+    fig.add_trace(line_trace(
+        forecast_df['ds'],
+        forecast_df['yhat_upper'],
         mode='lines',
         line=dict(width=0),
         showlegend=False,
         hoverinfo='skip'
     ))
     
-    fig.add_trace(go.Scatter(
-        x=forecast_df['ds'],
-        y=forecast_df['yhat_lower'],
+    fig.add_trace(line_trace(
+        forecast_df['ds'],
+        forecast_df['yhat_lower'],
         mode='lines',
         line=dict(width=0),
         fill='tonexty',
@@ -114,3 +179,34 @@ def render_forecast_chart(history_df, forecast_df):
     )
     
     return fig
+
+
+def render_rsi_chart(df: pd.DataFrame):
+    df = decimate(df, 'RSI_14')
+    fig = go.Figure()
+    fig.add_trace(line_trace(df['ds'], df['RSI_14'], name='RSI', line=dict(color='purple')))
+    fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
+    fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
+    fig.update_layout(title="Relative Strength Index (RSI)", template="plotly_dark", height=300)
+    return fig
+
+def render_macd_chart(df: pd.DataFrame):
+    # Min-max keeps histogram spikes that LTTB could smooth away
+    df = decimate(df, 'MACDh_12_26_9', method="minmax")
+    fig = go.Figure()
+    fig.add_trace(line_trace(df['ds'], df['MACD_12_26_9'], name='MACD', line=dict(color='blue')))
+    fig.add_trace(line_trace(df['ds'], df['MACDs_12_26_9'], name='Signal', line=dict(color='orange')))
+    fig.add_bar(x=df['ds'], y=df['MACDh_12_26_9'], name='Hist')
+    fig.update_layout(title="MACD", template="plotly_dark", height=300)
+    return fig
+
+def render_sma_chart(df: pd.DataFrame):
+    df = decimate(df)
+    fig = go.Figure()
+    fig.add_trace(line_trace(df['ds'], df['y'], name='Price', line=dict(color='white', width=1)))
+    if 'SMA_20' in df.columns:
+        fig.add_trace(line_trace(df['ds'], df['SMA_20'], name='SMA 20', line=dict(color='cyan')))
+    if 'SMA_50' in df.columns:
+        fig.add_trace(line_trace(df['ds'], df['SMA_50'], name='SMA 50', line=dict(color='magenta')))
+    fig.update_layout(title="Simple Moving Averages (SMA)", template="plotly_dark", height=300)
+    return fig
@@ -4,16 +4,24 @@ import time
 from langchain_core.messages import HumanMessage, AIMessage
 from core.assistant import (
     chatbot, 
-    get_all_chats, 
+    list_chats,
+    search_chats,
+    load_chat_messages,
+    save_chat_turn,
     delete_chat,
-    get_chat_title, 
-    generate_chat_title, 
-    update_chat_title
+    queue_chat_title, 
+    update_chat_title,
+    get_cached_response,
+    cache_response,
+    record_cached_turn
 )
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
+CHATS_PAGE_SIZE = 20
+MESSAGES_PAGE_SIZE = 30
+
 # -------------------------------------------------
 # UTILS
 # -------------------------------------------------
@@ -33,12 +41,154 @@ def load_conversation(thread_id):
         logger.error(f"Error loading conversation {thread_id}: {e}")
         return []
 
+def open_thread(thread_id):
+    """Loads only the newest page of a thread; older messages load on demand."""
+    st.session_state['thread_id'] = thread_id
+    messages, has_more = load_chat_messages(thread_id, limit=MESSAGES_PAGE_SIZE)
+    st.session_state['message_history'] = messages
+    st.session_state['history_has_more'] = has_more
+
+def load_earlier_messages():
+    history = st.session_state['message_history']
+    oldest_id = next((m['id'] for m in history if m.get('id') is not None), None)
+    older, has_more = load_chat_messages(st.session_state['thread_id'], limit=MESSAGES_PAGE_SIZE, before_id=oldest_id)
+    st.session_state['message_history'] = older + history
+    st.session_state['history_has_more'] = has_more
+
 def reset_chat():
     new_id = generate_thread_id()
     st.session_state['thread_id'] = new_id
     st.session_state['message_history'] = []
+    st.session_state['history_has_more'] = False
     # Create entry in DB so it shows up
     update_chat_title(new_id, "New Chat")
+    reset_thread_list()
+
+def load_more_threads():
+    """Appends the next page of the thread list; each page is an indexed range scan."""
+    chat_list = st.session_state.setdefault('chat_list', {'threads': [], 'cursor': None})
+    page, cursor = list_chats(limit=CHATS_PAGE_SIZE, cursor=chat_list['cursor'])
+    chat_list['threads'].extend(page)
+    chat_list['cursor'] = cursor
+
+def reset_thread_list():
+    """Drops the loaded pages so the list reloads in its new order."""
+    st.session_state.pop('chat_list', None)
+
+def stream_response(user_input, config, message_placeholder, is_first_turn=False):
+    """
+    Runs one agent turn, streaming the latest AI message into the placeholder.
+    Returns the final text.
+    """
+    full_response = ""
+    last_messages = []
+    got_response = False
+    
+    try:
+        # Use invoke for robustness
+        # Show a thinking spinner
+        with st.spinner("Thinking..."):
+             response_generator = chatbot.stream(
+                {'messages': [HumanMessage(content=user_input)]},
+                config=config,
+                stream_mode='values'
+            )
+        
+        for event in response_generator:
+            if 'messages' in event:
+                last_messages = event['messages']
+                last_msg = event['messages'][-1]
+                if isinstance(last_msg, AIMessage):
+                    # Extract text from content (handle both string and list formats)
+                    content = last_msg.content
+                    if isinstance(content, list):
+                        # Extract text from list of content blocks
+                        full_response = ""
+                        for block in content:
+                            if isinstance(block, dict) and block.get('type') == 'text':
+                                full_response += block.get('text', '')
+                            elif isinstance(block, str):
+                                full_response += block
+                    else:
+                        full_response = str(content)
+                    
+                    message_placeholder.markdown(full_response)
+                    got_response = True
+        
+        if not got_response:
+             full_response = "I apologize, but I couldn't generate a response. Please check the logs or API keys."
+             message_placeholder.markdown(full_response)
+             
+    except Exception as e:
+        logger.error(f"Chat Error: {e}")
+        got_response = False
+        err_str = str(e)
+        if "API_KEY" in err_str or "400" in err_str:
+             full_response = """
+             ⚠️ **Configuration Error**: 
+             Google API Key is invalid or missing. 
+             
+             **How to fix:**
+             1. Get a key from [Google AI Studio](https://aistudio.google.com/).
+             2. Open `.env` file.
+             3. Add `GOOGLE_API_KEY=your_key`.
+             4. Restart the App.
+             """
+        else:
+             full_response = f"⚠️ I encountered an error: {e}"
+        message_placeholder.error(full_response)
+
+    if got_response:
+        cache_response(user_input, full_response, last_messages, is_first_turn)
+    return full_response
+
+@st.fragment
+def render_thread_list():
+    """
+    Searchable, paginated thread list. Runs as a fragment so searching and
+    "Load more" only rerun the sidebar, not the chat.
+    """
+    query = st.text_input("Search chats", key="chat_search", placeholder="🔍 Search chats", label_visibility="collapsed")
+
+    if query.strip():
+        threads, has_more = search_chats(query), False
+    else:
+        if 'chat_list' not in st.session_state:
+            load_more_threads()
+        threads = st.session_state['chat_list']['threads']
+        has_more = st.session_state['chat_list']['cursor'] is not None
+
+    if not threads:
+        st.caption("No matching chats." if query.strip() else "No history yet.")
+
+    for thread_id, title in threads:
+        # Highlight active
+        is_active = (thread_id == st.session_state.get('thread_id'))
+        
+        # Layout for button + delete
+        col_chat, col_del = st.columns([4, 1])
+        
+        with col_chat:
+            # Truncate title
+            title = title or "New Chat"
+            display_title = (title[:20] + '..') if len(title) > 20 else title
+            btn_type = "primary" if is_active else "secondary"
+            
+            if st.button(f"{display_title}", key=f"sel_{thread_id}", use_container_width=True, type=btn_type, help=title):
+                open_thread(thread_id)
+                st.rerun()
+        
+        with col_del:
+            if st.button("🗑️", key=f"del_{thread_id}", help="Delete Chat"):
+                if delete_chat(thread_id):
+                    reset_thread_list()
+                    if is_active:
+                        reset_chat()
+                    st.rerun()
+
+    if has_more and st.button("Load more", key="chat_load_more", use_container_width=True):
+        load_more_threads()
+        st.rerun(scope="fragment")
 
 # -------------------------------------------------
 # RENDER FUNCTION
@@ -61,44 +211,7 @@ def render_chatbot_page():
             st.rerun()
             
         st.markdown("---")
-        
-        # Fetch latest chats from DB
-        threads = get_all_chats() # [(id, title), ...]
-        
-        if not threads:
-            st.caption("No history yet.")
-        
-        for thread_id, title in threads:
-            # Highlight active
-            is_active = (thread_id == st.session_state.get('thread_id'))
-            
-            # Layout for button + delete
-            col_chat, col_del = st.columns([4, 1])
-            
-            with col_chat:
-                # Truncate title
-                display_title = (title[:20] + '..') if len(title) > 20 else title
-                btn_type = "primary" if is_active else "secondary"
-                
-                if st.button(f"{display_title}", key=f"sel_{thread_id}", use_container_width=True, type=btn_type, help=title):
-                    st.session_state['thread_id'] = thread_id
-                    # Load messages
-                    raw_msgs = load_conversation(thread_id)
-                    formatted_msgs = []
-                    for msg in raw_msgs:
-                        role = "user" if isinstance(msg, HumanMessage) else "assistant"
-                        if isinstance(msg, (HumanMessage, AIMessage)):
-                            formatted_msgs.append({'role': role, 'content': msg.content})
-                    
-                    st.session_state['message_history'] = formatted_msgs
-                    st.rerun()
-            
-            with col_del:
-                if st.button("🗑️", key=f"del_{thread_id}", help="Delete Chat"):
-                    if delete_chat(thread_id):
-                        if is_active:
-                            reset_chat()
-                        st.rerun()
+        render_thread_list()
 
 
     # -------------------------------------------------
@@ -112,6 +225,11 @@ def render_chatbot_page():
         st.warning("⚠️ Don't use unnecessarily", icon="💡")
     
     # Display History
+    if st.session_state.get('history_has_more'):
+        if st.button("⬆️ Load earlier messages"):
+            load_earlier_messages()
+            st.rerun()
+
     for message in st.session_state['message_history']:
         role = message['role']
         avatar = "👤" if role == "user" else "🤖"
@@ -122,6 +240,8 @@ def render_chatbot_page():
     user_input = st.chat_input("Ask about market trends, specific stocks, or calculations...")
     
     if user_input:
+        is_first_turn = not st.session_state['message_history']
+        
         # Add User Message to History
         st.session_state['message_history'].append({'role': 'user', 'content': user_input})
         with st.chat_message('user', avatar="👤"):
@@ -136,67 +256,19 @@ def render_chatbot_page():
         with st.chat_message('assistant', avatar="🤖"):
             message_placeholder = st.empty()
             full_response = ""
+            cached_response = get_cached_response(user_input, is_first_turn)
             
-            try:
-                # Use invoke for robustness
-                # Show a thinking spinner
-                with st.spinner("Thinking..."):
-                     response_generator = chatbot.stream(
-                        {'messages': [HumanMessage(content=user_input)]},
-                        config=config,
-                        stream_mode='values'
-                    )
-                
-                got_response = False
-                
-                for event in response_generator:
-                    if 'messages' in event:
-                        last_msg = event['messages'][-1]
-                        if isinstance(last_msg, AIMessage):
-                            # Extract text from content (handle both string and list formats)
-                            content = last_msg.content
-                            if isinstance(content, list):
-                                # Extract text from list of content blocks
-                                full_response = ""
-                                for block in content:
-                                    if isinstance(block, dict) and block.get('type') == 'text':
-                                        full_response += block.get('text', '')
-                                    elif isinstance(block, str):
-                                        full_response += block
-                            else:
-                                full_response = str(content)
-                            
-                            message_placeholder.markdown(full_response)
-                            got_response = True
-                
-                if not got_response:
-                     full_response = "I apologize, but I couldn't generate a response. Please check the logs or API keys."
-                     message_placeholder.markdown(full_response)
-                     
-            except Exception as e:
-                logger.error(f"Chat Error: {e}")
-                err_str = str(e)
-                if "API_KEY" in err_str or "400" in err_str:
-                     full_response = """
-                     ⚠️ **Configuration Error**: 
-                     Google API Key is invalid or missing. 
-                     
-                     **How to fix:**
-                     1. Get a key from [Google AI Studio](https://aistudio.google.com/).
-                     2. Open `.env` file.
-                     3. Add `GOOGLE_API_KEY=your_key`.
-                     4. Restart the App.
-                     """
-                else:
-                     full_response = f"⚠️ I encountered an error: {e}"
-                message_placeholder.error(full_response)
+            if cached_response:
+                full_response = cached_response
+                message_placeholder.markdown(full_response)
+                record_cached_turn(st.session_state['thread_id'], user_input, full_response)
+            else:
+                full_response = stream_response(user_input, config, message_placeholder, is_first_turn)
 
         st.session_state['message_history'].append({'role': 'assistant', 'content': full_response})
+        save_chat_turn(st.session_state['thread_id'], user_input, full_response)
+        reset_thread_list()
         
-        # Generate Title lazy load check
-        current_title = get_chat_title(st.session_state['thread_id'])
-        if current_title == "New Chat" or not current_title:
-             msgs = [HumanMessage(content=m['content']) if m['role']=='user' else AIMessage(content=m['content']) 
-                     for m in st.session_state['message_history']]
-             # We assume generate_chat_title handles errors internally (it does)
-             generate_chat_title(st.session_state['thread_id'], msgs)
+        # Title the thread after its first message (generated in the background)
+        if is_first_turn:
+             queue_chat_title(st.session_state['thread_id'], user_input)
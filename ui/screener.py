@@ -0,0 +1,69 @@
+import time
+import streamlit as st
+from core.market import load_universe
+from core.screener import run_screen, RuleError
+from core.pipeline import refresh_universe
+from core.scheduler import universe_tickers
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SORT_OPTIONS = ["RSI_14", "SMA_20", "SMA_50", "MACD_12_26_9", "MACDh_12_26_9", "Close", "Volume"]
+
+EXAMPLE_RULES = [
+    "RSI_14 < 30 and SMA_20 > SMA_50",
+    "MACDh_12_26_9 crosses above 0",
+    "Close > SMA_50 and RSI_14 > 50 and RSI_14 < 70",
+]
+
+def render_screener_page():
+    st.header("Stock Screener")
+    st.caption("Screen the whole tracked universe with indicator rules.")
+
+    universe = load_universe()
+    if universe is None:
+        st.info("The universe price matrix has not been built yet. It is rebuilt after each market close.")
+        if st.button("Build Universe Now", type="primary"):
+            with st.spinner("Downloading the tracked universe..."):
+                refresh_universe(universe_tickers())
+            st.rerun()
+        return
+
+    with st.container(border=True):
+        rule = st.text_area("Rule", EXAMPLE_RULES[0], height=80,
+                            help="Combine indicators with and / or / not, comparisons, + - * /, and 'X crosses above|below Y'.")
+        st.caption("Examples: " + " • ".join(f"`{r}`" for r in EXAMPLE_RULES))
+
+        col_sort, col_dir, col_btn = st.columns([2, 1, 1])
+        with col_sort:
+            sort_by = st.selectbox("Rank By", SORT_OPTIONS)
+        with col_dir:
+            ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+        with col_btn:
+            st.write("")
+            run_btn = st.button("Run Screen", type="primary", use_container_width=True)
+
+    if not run_btn:
+        st.caption(f"Universe: {len(universe.tickers)} tickers • version {universe.version}")
+        return
+
+    try:
+        started = time.perf_counter()
+        matches = run_screen(universe, rule, sort_by=sort_by, ascending=ascending)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except RuleError as e:
+        st.error(f"❌ {e}")
+        return
+    except Exception as e:
+        logger.error(f"Screener Error: {e}")
+        st.error(f"An unexpected error occurred: {e}")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Matches", len(matches))
+    col2.metric("Screen Time", f"{elapsed_ms:.0f} ms")
+
+    if matches.empty:
+        st.warning("No tickers match this rule right now.")
+    else:
+        st.dataframe(matches, use_container_width=True, hide_index=True)
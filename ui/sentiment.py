@@ -1,6 +1,7 @@
 import streamlit as st
 import time
 from core.sentiment import SentimentEngine
+from core.pipeline import load_sentiment
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -48,7 +49,7 @@ def render_sentiment_page():
 
         with st.spinner(f"🔍 Scanning news headlines for {ticker}..."):
             try:
-                score, label, detailed = engine.analyze(ticker)
+                score, label, detailed = load_sentiment(ticker)
                 
                 # Display Results
                 st.divider()